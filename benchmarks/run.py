@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# indexlib lives in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic import SyntheticConfig, generate, write_csv
+from indexlib import PointInTime, apply_adjustments, chain_link, process_dividends, select_top_n
+from indexlib.datastore import read_price_matrix, read_shareholding
+from indexlib.sweep import rebalance_dates
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+REGRESSION_THRESHOLD = 0.20
+
+
+# -------------------------------------------------------
+# Stages
+# -------------------------------------------------------
+# Each stage reads its inputs from ctx and returns the values it adds, so
+# a stage can be re-run in isolation once the pipeline has run once.
+def stage_load(ctx):
+    paths = ctx["paths"]
+    return {
+        "price_w": read_price_matrix(paths["prices"]),
+        "shares": read_shareholding(paths["shareholding"]),
+        "corp": pd.read_csv(paths["corp"], parse_dates=["ex_date"]),
+        "divs": pd.read_csv(paths["dividends"], parse_dates=["ex_date"])
+    }
+
+
+def stage_pivot(ctx):
+    price_w, shares = ctx["price_w"], ctx["shares"]
+    return {
+        "total_shares": PointInTime.from_long(shares, "total_shares").as_of(price_w.index, price_w.columns),
+        "float_factor": PointInTime.from_long(shares, "free_float_factor")
+                                   .as_of(price_w.index, price_w.columns).fillna(1.0),
+        "rebal": rebalance_dates(price_w.index, "quarterly")
+    }
+
+
+def stage_adjust(ctx):
+    price_adj, shares_adj = apply_adjustments(ctx["price_w"], ctx["total_shares"], ctx["corp"])
+    float_shares = shares_adj * ctx["float_factor"]
+    return {"price_adj": price_adj, "float_shares": float_shares, "mcap": float_shares * price_adj}
+
+
+def stage_select(ctx):
+    caps = ctx["mcap"].reindex(ctx["rebal"], method="ffill")
+    weights, _ = select_top_n(caps, ctx["n"])
+    return {"weights": weights}
+
+
+def stage_dividends(ctx):
+    mcap, cash = process_dividends(ctx["divs"], ctx["price_adj"], ctx["float_shares"], ctx["mcap"])
+    return {"mcap_div": mcap, "div_cash": cash}
+
+
+def stage_link(ctx):
+    return {"index": chain_link(ctx["price_adj"], ctx["weights"])}
+
+
+STAGES = {
+    "load": stage_load,
+    "pivot": stage_pivot,
+    "adjust": stage_adjust,
+    "select": stage_select,
+    "dividends": stage_dividends,
+    "link": stage_link
+}
+
+
+# -------------------------------------------------------
+# Measurement
+# -------------------------------------------------------
+def measure(stage, ctx, repeat: int = 5) -> dict:
+    """
+    Wall time over repeat runs, then one separate run under tracemalloc
+    for peak Python-heap memory (tracing slows the code, so it is kept
+    out of the timings).
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage(ctx)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        stage(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds_min": min(times),
+        "seconds_median": statistics.median(times),
+        "peak_mb": peak / 2 ** 20,
+        "repeat": repeat
+    }
+
+
+def run_benchmarks(config: SyntheticConfig, n: int = 20, repeat: int = 5, stages=None,
+                   data_dir: str = None) -> dict:
+    """
+    Generate a synthetic universe, run the pipeline once to build every
+    stage's inputs, then time each selected stage on its own.
+
+    Returns
+    -------
+    dict
+        {'config', 'environment', 'created', 'stages': {name: timings}},
+        ready for save_results.
+    """
+    stages = list(stages or STAGES)
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = {"paths": write_csv(generate(config), data_dir or tmp), "n": n}
+        for stage in STAGES.values():
+            ctx.update(stage(ctx))
+        results = {name: measure(STAGES[name], ctx, repeat) for name in stages}
+
+    return {
+        "config": dict(config.as_dict(), n=n),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "system": platform.system()
+        },
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "stages": results
+    }
+
+
+# -------------------------------------------------------
+# Results and regression comparison
+# -------------------------------------------------------
+def results_file(config: SyntheticConfig, directory: str = RESULTS_DIR) -> str:
+    """
+    e.g. 'benchmarks/results/t500_y7-20260101T120000.json'.
+    """
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    return os.path.join(directory, f"t{config.tickers}_y{config.years}-{stamp}.json")
+
+
+def save_results(results: dict, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> pd.DataFrame:
+    """
+    Per-stage median time and peak memory against a baseline run; a stage
+    regressed when either grew by more than threshold.
+    """
+    rows = {}
+    for name, now in current["stages"].items():
+        before = baseline["stages"].get(name)
+        if before is None:
+            continue
+        time_ratio = now["seconds_median"] / before["seconds_median"]
+        mem_ratio = now["peak_mb"] / before["peak_mb"] if before["peak_mb"] else 1.0
+        rows[name] = {
+            "baseline_s": before["seconds_median"],
+            "current_s": now["seconds_median"],
+            "time_ratio": time_ratio,
+            "baseline_mb": before["peak_mb"],
+            "current_mb": now["peak_mb"],
+            "mem_ratio": mem_ratio,
+            "regressed": time_ratio > 1 + threshold or mem_ratio > 1 + threshold
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def summary(results: dict) -> pd.DataFrame:
+    table = pd.DataFrame.from_dict(results["stages"], orient="index")
+    table["share"] = table["seconds_median"] / table["seconds_median"].sum()
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the index-construction stages on synthetic data")
+    parser.add_argument("--tickers", type=int, default=70)
+    parser.add_argument("--years", type=int, default=7)
+    parser.add_argument("--events", type=float, default=0.1,
+                        help="splits/bonuses per ticker per year")
+    parser.add_argument("--dividends", type=float, default=2.0,
+                        help="dividends per ticker per year")
+    parser.add_argument("--n", type=int, default=20, help="index constituents")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stage", action="append", choices=list(STAGES),
+                        help="run only this stage (repeatable)")
+    parser.add_argument("--out", help="results JSON (default: benchmarks/results/<size>-<time>.json)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    config = SyntheticConfig(tickers=args.tickers, years=args.years, event_density=args.events,
+                             dividend_density=args.dividends, seed=args.seed)
+    results = run_benchmarks(config, n=args.n, repeat=args.repeat, stages=args.stage)
+    out = args.out or results_file(config)
+    save_results(results, out)
+
+    print(summary(results).to_string(float_format="{:.4f}".format))
+    print(f"\nSaved {out}")
+
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        diff = compare(results, baseline, args.threshold)
+        print(f"\nAgainst {args.baseline}:")
+        if baseline["config"] != results["config"]:
+            print(f"(baseline ran a different universe: {baseline['config']})")
+        print(diff.to_string(float_format="{:.3f}".format))
+        if diff["regressed"].any():
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+from dataclasses import asdict, dataclass
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class SyntheticConfig:
+    """
+    Size of a synthetic universe.
+
+    event_density and dividend_density are expected events per ticker per
+    year (splits/bonuses and dividends respectively).
+    """
+    tickers: int = 70
+    years: int = 7
+    start: str = "2018-01-01"
+    event_density: float = 0.1
+    dividend_density: float = 2.0
+    report_freq: str = "QE"
+    seed: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class SyntheticData(NamedTuple):
+    prices: pd.DataFrame        # long date/ticker/close
+    shareholding: pd.DataFrame  # long shareholding-pattern rows
+    corp: pd.DataFrame          # ticker/ex_date/event_type/ratio
+    dividends: pd.DataFrame     # ticker/ex_date/payout_per_share
+
+
+def _events(rng, tickers, dates, density, years):
+    """
+    Poisson number of events per ticker, each on a random trading day.
+    """
+    counts = rng.poisson(density * years, size=len(tickers))
+    ticker = np.repeat(tickers, counts)
+    ex_date = dates[rng.integers(0, len(dates), size=counts.sum())]
+    return ticker, ex_date
+
+
+def generate(config: SyntheticConfig = None) -> SyntheticData:
+    """
+    Random-walk closes, quarterly shareholding reports and corporate-action
+    and dividend events in the layouts the index scripts read.
+    """
+    config = config or SyntheticConfig()
+    rng = np.random.default_rng(config.seed)
+    tickers = np.array([f"T{i:04d}" for i in range(config.tickers)])
+    end = pd.Timestamp(config.start) + pd.DateOffset(years=config.years) - pd.Timedelta(days=1)
+    dates = pd.bdate_range(config.start, end, name="date")
+
+    # Geometric random walks with per-ticker drift and volatility
+    drift = rng.normal(0.0003, 0.0002, size=config.tickers)
+    vol = rng.uniform(0.01, 0.03, size=config.tickers)
+    steps = rng.standard_normal((len(dates), config.tickers)) * vol + drift
+    close = rng.uniform(50, 3000, size=config.tickers) * np.exp(np.cumsum(steps, axis=0))
+    prices = pd.DataFrame({
+        "date": np.repeat(dates.to_numpy(), config.tickers),
+        "ticker": np.tile(tickers, len(dates)),
+        "close": close.round(2).ravel()
+    })
+
+    # Share counts drift slowly between quarterly reports
+    reports = pd.Series(0, index=dates).resample(config.report_freq).last().index
+    base_shares = rng.lognormal(19, 1.2, size=config.tickers)
+    growth = np.cumprod(1 + rng.normal(0, 0.005, size=(len(reports), config.tickers)), axis=0)
+    total = (base_shares * growth).round()
+    promoter = (total * rng.uniform(0.3, 0.75, size=config.tickers)).round()
+    shareholding = pd.DataFrame({
+        "report_date": np.repeat(reports.to_numpy(), config.tickers),
+        "ticker": np.tile(tickers, len(reports)),
+        "promoter_shares": promoter.ravel(),
+        "public_shares": (total - promoter).ravel(),
+        "total_shares": total.ravel()
+    })
+    shareholding["free_float_factor"] = shareholding["public_shares"] / shareholding["total_shares"]
+
+    ticker, ex_date = _events(rng, tickers, dates, config.event_density, config.years)
+    split = rng.random(len(ticker)) < 0.5
+    corp = pd.DataFrame({
+        "ticker": ticker,
+        "ex_date": ex_date,
+        "event_type": np.where(split, "SPLIT", "BONUS"),
+        "ratio": np.where(split, "1:" + rng.choice(["2", "5", "10"], size=len(ticker)), "1:2")
+    })
+
+    ticker, ex_date = _events(rng, tickers, dates, config.dividend_density, config.years)
+    dividends = pd.DataFrame({
+        "ticker": ticker,
+        "ex_date": ex_date,
+        "payout_per_share": rng.lognormal(1.5, 1.0, size=len(ticker)).round(2)
+    })
+    return SyntheticData(prices, shareholding, corp, dividends)
+
+
+def write_csv(data: SyntheticData, directory: str) -> dict:
+    """
+    Write the synthetic tables as CSVs and return name -> path.
+
+    Layout::
+
+        <directory>/price_data.csv
+        <directory>/shareholiding_pattern.csv
+        <directory>/corporate_actions.csv
+        <directory>/dividends.csv
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        "prices": os.path.join(directory, "price_data.csv"),
+        "shareholding": os.path.join(directory, "shareholiding_pattern.csv"),
+        "corp": os.path.join(directory, "corporate_actions.csv"),
+        "dividends": os.path.join(directory, "dividends.csv")
+    }
+    for name, path in paths.items():
+        getattr(data, name).to_csv(path, index=False)
+    return paths
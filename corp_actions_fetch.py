@@ -0,0 +1,264 @@
+import csv
+import glob
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from filing_manifest import symbol_from_path
+from indexlib.corporate_events import load_corporate_events, write_event_store
+from xbrl_parse import HEADERS
+
+NSE_BASE = "https://www.nseindia.com"
+ACTIONS_PAGE = "/companies-listing/corporate-filings-actions"
+ACTIONS_API = "/api/corporates-corporateActions"
+
+# API field -> column of the "Download (.csv)" file on the actions page
+CSV_COLUMNS = {
+    "symbol": "SYMBOL",
+    "comp": "COMPANY NAME",
+    "series": "SERIES",
+    "subject": "PURPOSE",
+    "faceVal": "FACE VALUE",
+    "exDate": "EX-DATE",
+    "recDate": "RECORD DATE",
+    "bcStartDate": "BOOK CLOSURE START DATE",
+    "bcEndDate": "BOOK CLOSURE END DATE"
+}
+
+
+class CorpActionResult(NamedTuple):
+    symbol: str
+    path: Optional[str]
+    error: Optional[BaseException]
+
+
+class CorpActionsClient:
+    """
+    Pulls corporate actions from the JSON endpoint behind NSE's
+    corporate-actions page instead of driving a browser.
+
+    Each worker thread gets its own pooled requests.Session; the session
+    visits the actions page once to pick up NSE's cookies and does so
+    again if the API starts rejecting it.
+    """
+
+    def __init__(self, base_url: str = NSE_BASE, timeout: float = 30.0, retries: int = 3,
+                 backoff: float = 1.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        retry = Retry(total=self.retries, backoff_factor=self.backoff,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self._warm_up(session)
+        return session
+
+    def _warm_up(self, session: requests.Session):
+        session.get(self.base_url + ACTIONS_PAGE, timeout=self.timeout)
+
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._new_session()
+        return session
+
+    def actions(self, symbol: str) -> list:
+        """
+        All corporate actions for symbol as a list of API records.
+        """
+        params = {"index": "equities", "symbol": symbol}
+        url = self.base_url + ACTIONS_API
+        res = self.session.get(url, params=params, timeout=self.timeout)
+        if res.status_code in (401, 403):
+            # Cookies expired: refresh them once and try again
+            self._warm_up(self.session)
+            res = self.session.get(url, params=params, timeout=self.timeout)
+        res.raise_for_status()
+        return res.json()
+
+
+def actions_file(symbol: str, out_dir: str) -> str:
+    """
+    One file per symbol, e.g. 'corp_event/CF-CA-equities-INFY.csv'. The
+    path does not change between runs, so a re-fetch replaces the old
+    file instead of adding a second copy of every event.
+    """
+    return os.path.join(out_dir, f"CF-CA-equities-{symbol}.csv")
+
+
+def remove_stale_files(symbol: str, out_dir: str, keep: str):
+    """
+    Delete the symbol's other action files in out_dir, e.g. dated page
+    downloads ('CF-CA-equities-INFY-15-Nov-2025.csv') superseded by keep.
+    """
+    for path in glob.glob(os.path.join(out_dir, "CF-CA-equities-*.csv")):
+        if symbol_from_path(path) == symbol and os.path.abspath(path) != os.path.abspath(keep):
+            os.remove(path)
+
+
+def write_actions_csv(records: list, path: str):
+    """
+    Write API records in the layout of the page's CSV download so the
+    existing corp_event readers work unchanged.
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        writer.writerow(CSV_COLUMNS.values())
+        for record in records:
+            writer.writerow(record.get(field, "-") for field in CSV_COLUMNS)
+    os.replace(tmp, path)
+
+
+def fetch_corporate_actions(symbols, out_dir: str = "corp_event", client: CorpActionsClient = None,
+                            workers: int = 4, on_result=None) -> list:
+    """
+    Download corporate actions for every symbol with a pool of workers and
+    write one CSV per symbol into out_dir.
+
+    Parameters
+    ----------
+    symbols : iterable of str
+        Duplicates are fetched once.
+    out_dir : str
+    client : CorpActionsClient, optional
+        Defaults to one pointed at nseindia.com.
+    workers : int
+    on_result : callable(done, total, CorpActionResult), optional
+
+    Returns
+    -------
+    list of CorpActionResult, in completion order.
+    """
+    client = client or CorpActionsClient()
+    symbols = list(dict.fromkeys(symbols))
+    os.makedirs(out_dir, exist_ok=True)
+
+    def fetch_one(symbol):
+        path = actions_file(symbol, out_dir)
+        write_actions_csv(client.actions(symbol), path)
+        remove_stale_files(symbol, out_dir, keep=path)
+        return path
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch_one, s): s for s in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                result = CorpActionResult(symbol, future.result(), None)
+            except Exception as e:
+                result = CorpActionResult(symbol, None, e)
+            results.append(result)
+            if on_result:
+                on_result(len(results), len(symbols), result)
+    return results
+
+
+def update_event_store(symbols, out_dir: str = "corp_event", dividends_path: str = "dividends.csv",
+                       corp_path: str = "corporate_actions.csv", client: CorpActionsClient = None,
+                       workers: int = 4, on_result=None) -> list:
+    """
+    Fetch corporate actions for symbols into out_dir, then rebuild the
+    dividends / corporate-actions CSVs the index scripts read from every
+    file in out_dir (see write_event_store).
+
+    Returns
+    -------
+    list of CorpActionResult, as fetch_corporate_actions.
+    """
+    results = fetch_corporate_actions(symbols, out_dir, client=client, workers=workers, on_result=on_result)
+    events = load_corporate_events(os.path.join(out_dir, "*.csv"))
+    write_event_store(events, dividends_path, corp_path)
+    return results
+
+
+# -------------------------------------------------------
+# Local stand-in for the NSE endpoints (offline testing)
+# -------------------------------------------------------
+class LocalActionsServer:
+    """
+    Serves corporate actions over http.server the way NSE does: the
+    actions page sets a cookie and the API answers 401 without it.
+
+    Usage::
+
+        with LocalActionsServer.from_directory("corp_event") as server:
+            client = CorpActionsClient(base_url=server.base_url, retries=0)
+            fetch_corporate_actions(["INFY"], "tmp_out", client=client)
+    """
+
+    def __init__(self, data: dict, host: str = "127.0.0.1", port: int = 0):
+        self.data = data
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                parts = urlsplit(self.path)
+                if parts.path == ACTIONS_PAGE:
+                    self.send_response(200)
+                    self.send_header("Set-Cookie", "nsit=local; Path=/")
+                    self.end_headers()
+                    return
+                if parts.path != ACTIONS_API:
+                    self.send_error(404)
+                    return
+                if "nsit=" not in self.headers.get("Cookie", ""):
+                    self.send_error(401)
+                    return
+                symbol = parse_qs(parts.query).get("symbol", [""])[0]
+                body = json.dumps(server.data.get(symbol, [])).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @classmethod
+    def from_directory(cls, directory: str = "corp_event", **kwargs) -> "LocalActionsServer":
+        """
+        Serve previously downloaded page CSVs back as API records.
+        """
+        fields = {column: field for field, column in CSV_COLUMNS.items()}
+        data = {}
+        for path in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                data[symbol_from_path(path)] = [
+                    {fields[k]: v for k, v in row.items() if k in fields}
+                    for row in csv.DictReader(f)
+                ]
+        return cls(data, **kwargs)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,199 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+
+FILING_ID = re.compile(r"(SHP_\d+_\d+)")
+
+
+class FilingCache:
+    """
+    Content-addressed on-disk store for raw XBRL filings.
+
+    Published filings never change (revisions get new URLs), so a body is
+    fetched once and then served from disk. Bodies are gzip-compressed and
+    stored under their SHA-256; index.json maps each filing key to its blob
+    and access time. When the store grows past max_bytes the least recently
+    used filings are evicted down to low_water * max_bytes, so eviction runs
+    once per batch of new filings rather than on every put. The byte total
+    and per-blob reference counts are kept as running values.
+
+    A blob that cannot be read back (truncated, not gzip) is dropped and
+    reported as a miss, so the filing is simply downloaded again.
+
+    Layout::
+
+        <root>/index.json
+        <root>/blobs/ab/ab12...ef.xml.gz
+    """
+
+    def __init__(self, root="xbrl_cache", max_bytes=2 * 1024 ** 3, autosave_every=50, low_water=0.9):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.autosave_every = autosave_every
+        self.index_path = os.path.join(root, "index.json")
+        self._lock = threading.Lock()
+        self._pending = 0
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+        # Identical bodies share one blob: count references per digest and
+        # only the unique blobs towards the byte total
+        self._refs = Counter()
+        self._bytes = 0
+        for entry in self.index.values():
+            self._ref(entry)
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        """
+        Use the NSE filing ID (e.g. 'SHP_1544919_10102025115803') when the
+        URL has one, otherwise a hash of the URL.
+        """
+        match = FILING_ID.search(url)
+        if match:
+            return match.group(1)
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.xml.gz")
+
+    def __contains__(self, url) -> bool:
+        return self.key_for(url) in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def _ref(self, entry: dict):
+        if not self._refs[entry["sha256"]]:
+            self._bytes += entry["size"]
+        self._refs[entry["sha256"]] += 1
+
+    def _drop(self, key: str, remove_blob: bool = True):
+        """
+        Remove key from the index; delete its blob once nothing refers to it.
+        """
+        entry = self.index.pop(key)
+        digest = entry["sha256"]
+        self._refs[digest] -= 1
+        if self._refs[digest]:
+            return
+        del self._refs[digest]
+        self._bytes -= entry["size"]
+        if remove_blob:
+            try:
+                os.remove(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def get(self, url: str):
+        """
+        Return the cached body for url, or None on a miss.
+        """
+        key = self.key_for(url)
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            path = self._blob_path(entry["sha256"])
+            if not os.path.exists(path):
+                self._drop(key, remove_blob=False)
+                self._touch()
+                return None
+            entry["last_access"] = time.time()
+            self._touch()
+        try:
+            with gzip.open(path, "rb") as f:
+                return f.read()
+        except (OSError, EOFError, zlib.error):
+            # Corrupt blob: forget it and let the caller download again
+            with self._lock:
+                if self.index.get(key) is entry:
+                    self._drop(key)
+                    self._touch()
+            return None
+
+    def _write_tmp(self, path: str, content: bytes) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wb") as f:
+            f.write(content)
+        return tmp
+
+    def put(self, url: str, content: bytes):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(digest)
+        # Compress outside the lock but only move the blob into place under
+        # it, so an eviction in another thread cannot delete the blob between
+        # it being written and being indexed
+        tmp = None if os.path.exists(path) else self._write_tmp(path, content)
+
+        key = self.key_for(url)
+        with self._lock:
+            if tmp is None and not os.path.exists(path):
+                # Evicted since the check above
+                tmp = self._write_tmp(path, content)
+            if tmp is not None:
+                os.replace(tmp, path)
+            now = time.time()
+            entry = {
+                "url": url,
+                "sha256": digest,
+                "size": os.path.getsize(path),
+                "stored_at": now,
+                "last_access": now
+            }
+            # Take the new reference first so a replaced entry sharing the
+            # blob does not delete it
+            self._ref(entry)
+            if key in self.index:
+                self._drop(key)
+            self.index[key] = entry
+            self._evict()
+            self._touch()
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * self.low_water
+        for key, _ in sorted(self.index.items(), key=lambda kv: kv[1]["last_access"]):
+            if self._bytes <= target:
+                break
+            self._drop(key)
+
+    def _touch(self):
+        self._pending += 1
+        if self._pending >= self.autosave_every:
+            self._save()
+
+    def _save(self):
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_path)
+        self._pending = 0
+
+    def flush(self):
+        with self._lock:
+            self._save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
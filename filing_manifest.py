@@ -0,0 +1,254 @@
+import csv
+import glob
+import os
+import re
+from typing import Iterator, NamedTuple
+
+import pandas as pd
+
+MANIFEST_COLUMNS = ["symbol", "as_on_date", "submission_date", "revision_date", "url"]
+LINK_COLUMNS = {
+    "AS ON DATE": "as_on_date",
+    "SUBMISSION DATE": "submission_date",
+    "REVISION DATE": "revision_date",
+    "ACTION": "url"
+}
+LINK_FILE_SYMBOL = re.compile(r"equities-(.+?)(?:-\d{2}-[A-Za-z]{3}-\d{4})?\.csv$")
+LINK_DATE_FORMAT = "%d-%b-%Y"
+# Filing order, oldest first: originals (blank REVISION DATE) before their
+# revisions, ties broken by SUBMISSION DATE
+FILING_ORDER = ["revision_date", "submission_date"]
+
+
+def symbol_from_path(path: str) -> str:
+    """
+    'links/CF-Shareholding-Pattern-equities-BAJAJ-AUTO-08-Nov-2025.csv' -> 'BAJAJ-AUTO'
+    'corp_event/CF-CA-equities-BAJAJ-AUTO.csv' -> 'BAJAJ-AUTO'
+    """
+    match = LINK_FILE_SYMBOL.search(os.path.basename(path))
+    return match.group(1) if match else os.path.basename(path)
+
+
+def read_link_files(pattern: str) -> pd.DataFrame:
+    """
+    Load every NSE shareholding link CSV matching pattern into one frame
+    with the manifest columns plus COMPANY; rows without a filing URL are
+    dropped.
+    """
+    frames = []
+    for file in sorted(glob.glob(pattern)):
+        df = pd.read_csv(file, dtype=str, keep_default_na=False)
+        df = df.rename(columns=LINK_COLUMNS)
+        df["symbol"] = symbol_from_path(file)
+        frames.append(df[["COMPANY", *MANIFEST_COLUMNS]])
+
+    if not frames:
+        return pd.DataFrame(columns=["COMPANY", *MANIFEST_COLUMNS])
+    links = pd.concat(frames, ignore_index=True)
+    return links[~links["url"].str.contains("/null") & (links["url"] != "")]
+
+
+class LinkJob(NamedTuple):
+    symbol: str
+    as_on_date: str
+    url: str
+    company: str = ""
+    submission_date: str = ""
+    revision_date: str = ""
+
+    @property
+    def key(self) -> tuple:
+        """
+        Identity of the filing in MANIFEST_COLUMNS order.
+        """
+        return (self.symbol, self.as_on_date, self.submission_date, self.revision_date, self.url)
+
+
+def iter_link_jobs(pattern: str, skip=None) -> Iterator[LinkJob]:
+    """
+    Stream filings from the link CSVs matching pattern one row at a time,
+    without loading the files into a frame.
+
+    Rows without a filing URL are dropped, each URL is yielded once (first
+    occurrence wins) and rows whose key is in skip (e.g. a FilingManifest)
+    are left out.
+    """
+    seen = set()
+    for file in sorted(glob.glob(pattern)):
+        symbol = symbol_from_path(file)
+        with open(file, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                fields = {LINK_COLUMNS.get(k, k): v or "" for k, v in row.items() if k}
+                url = fields.get("url", "")
+                if not url or "/null" in url or url in seen:
+                    continue
+                seen.add(url)
+                job = LinkJob(symbol, fields.get("as_on_date", ""), url, fields.get("COMPANY", ""),
+                              fields.get("submission_date", ""), fields.get("revision_date", ""))
+                if skip is not None and job.key in skip:
+                    continue
+                yield job
+
+
+class FilingManifest:
+    """
+    Record of filings already ingested into a shareholding store.
+
+    A filing is identified by (symbol, AS ON DATE, SUBMISSION DATE,
+    REVISION DATE, ACTION URL); a revision shows up as a new row, so
+    pending() returns both brand-new and revised filings.
+    """
+
+    def __init__(self, path="filing_manifest.csv"):
+        self.path = path
+        if os.path.exists(path):
+            self.rows = pd.read_csv(path, dtype=str, keep_default_na=False)
+        else:
+            self.rows = pd.DataFrame(columns=MANIFEST_COLUMNS)
+        self._keys = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key: tuple) -> bool:
+        """
+        Whether a filing key (see LinkJob.key) is already recorded.
+        """
+        if self._keys is None:
+            self._keys = set(self.rows[MANIFEST_COLUMNS].itertuples(index=False, name=None))
+        return tuple(key) in self._keys
+
+    def pending(self, links: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return the rows of links not yet recorded in the manifest.
+        """
+        seen = pd.MultiIndex.from_frame(self.rows[MANIFEST_COLUMNS])
+        keys = pd.MultiIndex.from_frame(links[MANIFEST_COLUMNS])
+        return links[~keys.isin(seen)]
+
+    def record(self, links: pd.DataFrame):
+        """
+        Mark links as ingested and persist the manifest.
+        """
+        self.rows = (
+            pd.concat([self.rows, links[MANIFEST_COLUMNS]], ignore_index=True)
+            .drop_duplicates()
+        )
+        self.rows.to_csv(self.path, index=False)
+        self._keys = None
+
+    def append(self, jobs):
+        """
+        Record LinkJobs by appending them to the manifest file, so a run
+        can checkpoint as it goes without rewriting the whole manifest.
+        """
+        new = [job.key for job in jobs if job.key not in self]
+        if not new:
+            return
+        rows = pd.DataFrame(new, columns=MANIFEST_COLUMNS).drop_duplicates()
+        exists = os.path.exists(self.path)
+        rows.to_csv(self.path, mode="a" if exists else "w", header=not exists, index=False)
+        self.rows = pd.concat([self.rows, rows], ignore_index=True)
+        self._keys.update(rows.itertuples(index=False, name=None))
+
+
+def latest_rows(frame: pd.DataFrame, keys: list, order: list = None) -> pd.DataFrame:
+    """
+    Drop rows superseded by a later row with the same keys.
+
+    Without order the last row in the frame wins. With order (link date
+    columns such as FILING_ORDER) rows are ranked by those dates first, so
+    the latest filing wins whatever order the rows were written in; blank
+    or missing dates rank oldest and ties keep frame order. Survivors stay
+    in frame order.
+    """
+    frame = frame.reset_index(drop=True)
+    ranked = frame
+    if order:
+        dates = pd.DataFrame({
+            col: pd.to_datetime(frame[col].astype(str), format=LINK_DATE_FORMAT, errors="coerce")
+            if col in frame else pd.NaT
+            for col in order
+        }, index=frame.index)
+        ranked = frame.loc[dates.sort_values(order, kind="stable", na_position="first").index]
+    # Compare keys as text so dates/ints read back from CSV still match
+    key_text = ranked[keys].astype(str)
+    survivors = ranked.index[~key_text.duplicated(keep="last")]
+    return frame[frame.index.isin(survivors)].reset_index(drop=True)
+
+
+def upsert_csv(path: str, new_rows: pd.DataFrame, keys: list, index: bool = False, order: list = None):
+    """
+    Merge new_rows into the CSV at path, replacing rows with matching keys.
+
+    index mirrors how the file was originally written with DataFrame.to_csv.
+    By default new rows win; with order (e.g. FILING_ORDER) the latest
+    filing wins, among the new rows as well as against the file (see
+    latest_rows).
+    """
+    if os.path.exists(path):
+        existing = pd.read_csv(path, index_col=0 if index else None)
+        merged = latest_rows(pd.concat([existing, new_rows], ignore_index=True), keys, order)
+    elif order:
+        merged = latest_rows(new_rows, keys, order)
+    else:
+        merged = new_rows.reset_index(drop=True)
+    merged.to_csv(path, index=index)
+    return merged
+
+
+class BatchWriter:
+    """
+    Append result rows to a CSV in batches as they arrive, so finished
+    work is on disk if a run dies part way.
+
+    Rows are flushed every batch_size rows; with a manifest, the LinkJobs
+    behind each flushed batch are recorded right after it. close() does a
+    final flush and, when keys are given, drops rows superseded by a later
+    row with the same keys (see latest_rows). Rows arrive in completion
+    order, so pass order (e.g. FILING_ORDER, with those columns in columns)
+    to keep the latest filing rather than the last to finish. With fresh
+    the file is started over instead of extended.
+    """
+
+    def __init__(self, path: str, columns: list, keys: list = None, batch_size: int = 500,
+                 manifest: FilingManifest = None, fresh: bool = False, order: list = None):
+        self.path = path
+        self.columns = columns
+        self.keys = keys
+        self.order = order
+        self.batch_size = batch_size
+        self.manifest = manifest
+        self.written = 0
+        self._rows = []
+        self._jobs = []
+        if fresh and os.path.exists(path):
+            os.remove(path)
+
+    def add(self, row: dict, job: LinkJob = None):
+        self._rows.append(row)
+        if job is not None:
+            self._jobs.append(job)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        exists = os.path.exists(self.path)
+        batch = pd.DataFrame(self._rows, columns=self.columns)
+        batch.to_csv(self.path, mode="a" if exists else "w", header=not exists, index=False)
+        if self.manifest is not None:
+            self.manifest.append(self._jobs)
+        self.written += len(batch)
+        self._rows, self._jobs = [], []
+
+    def close(self) -> pd.DataFrame:
+        self.flush()
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=self.columns)
+        merged = pd.read_csv(self.path)
+        if self.keys:
+            merged = latest_rows(merged, self.keys, self.order)
+            merged.to_csv(self.path, index=False)
+        return merged
@@ -0,0 +1,10 @@
+from indexlib.corporate_actions import adjustment_factors, apply_adjustments, parse_ratios
+from indexlib.corporate_events import build_events, classify_purpose, load_corporate_events
+from indexlib.dividends import process_dividends
+from indexlib.engine import IndexEngine
+from indexlib.holdings import Holdings, mark_to_market, rebalance_holdings
+from indexlib.incremental import IndexState, state_from_history, update
+from indexlib.linking import chain_link
+from indexlib.pit import PointInTime
+from indexlib.selection import select_top_n, top_n_mask, top_n_sum
+from indexlib.sweep import Variant, load_inputs, rebalance_dates, run_sweep, sweep_frame
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+ADJUSTING_EVENTS = ("SPLIT", "BONUS")
+RATIO = r"^\s*([\d.]+)\s*:\s*([\d.]+)\s*$"
+
+
+def parse_ratios(ratio: pd.Series) -> np.ndarray:
+    """
+    Turn 'old:new' ratio strings (or plain numbers) into share
+    multipliers new/old in one vectorized pass; anything missing or
+    unparseable becomes 1.0.
+    """
+    text = ratio.astype("string")
+    parts = text.str.extract(RATIO).apply(pd.to_numeric, errors="coerce")
+    old, new = parts[0].to_numpy(dtype=float), parts[1].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(old > 0, new / old, np.nan)
+
+    plain = pd.to_numeric(ratio.where(~text.str.contains(":", regex=False).fillna(False)),
+                          errors="coerce").to_numpy(dtype=float)
+    factor = np.where(np.isnan(factor), plain, factor)
+    return np.where(np.isfinite(factor), factor, 1.0)
+
+
+def adjustment_factors(corp: pd.DataFrame, index: pd.DatetimeIndex, columns: pd.Index) -> pd.DataFrame:
+    """
+    Cumulative per-ticker share multipliers from split/bonus events.
+
+    Each event multiplies its ticker's factor from its ex-date onwards; an
+    ex-date off the calendar is applied from the last trading day before
+    it, and events after the calendar end are ignored. Factors are built
+    as a product over event rows and a single cumulative product down the
+    calendar.
+
+    Parameters
+    ----------
+    corp : pd.DataFrame
+        Events with 'ticker', 'ex_date', 'event_type' and 'ratio' columns.
+    index, columns
+        Calendar and tickers of the price/shares matrices.
+
+    Returns
+    -------
+    pd.DataFrame
+        index x columns cumulative factors (1.0 before any event).
+    """
+    events = corp.dropna(subset=["event_type", "ex_date"])
+    events = events[events["event_type"].astype(str).str.upper().isin(ADJUSTING_EVENTS)]
+    col = columns.get_indexer(events["ticker"].astype(str))
+    # Events going ex after the last day have not happened yet
+    live = (col >= 0) & (events["ex_date"] <= index[-1]).to_numpy()
+    events = events[live]
+    col = col[live]
+
+    row = np.searchsorted(index.to_numpy(), events["ex_date"].to_numpy(dtype="datetime64[ns]"),
+                          side="right") - 1
+    row = np.clip(row, 0, None)
+
+    step = np.ones((len(index), len(columns)))
+    np.multiply.at(step, (row, col), parse_ratios(events["ratio"]))
+    return pd.DataFrame(np.cumprod(step, axis=0), index=index, columns=columns)
+
+
+def apply_adjustments(price_w: pd.DataFrame, shares_w: pd.DataFrame, corp: pd.DataFrame):
+    """
+    Multiply shares and divide prices by the cumulative split/bonus
+    factors in one broadcast each.
+
+    Returns
+    -------
+    (price_adj, shares_adj)
+    """
+    factors = adjustment_factors(corp, price_w.index, price_w.columns)
+    price_adj = price_w / factors
+    shares_adj = shares_w * factors.reindex(index=shares_w.index, columns=shares_w.columns, fill_value=1.0)
+    return price_adj, shares_adj
@@ -0,0 +1,224 @@
+import glob
+import logging
+import re
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DIVIDEND_EVENTS = ("dividend", "interim", "special")
+
+# PURPOSE words that should have produced an event; rows mentioning one
+# without matching EVENT_PATTERN (e.g. an amount-less "Interim Dividend")
+# are logged as warnings rather than dropped silently
+EVENT_WORDS = re.compile(r"div|bonus|split|rights?\b|buy\s*-?\s*back", re.IGNORECASE)
+
+# NSE corporate-action CSV column -> normalized column
+NSE_COLUMNS = {
+    "SYMBOL": "ticker",
+    "COMPANY NAME": "company",
+    "SERIES": "series",
+    "PURPOSE": "purpose",
+    "FACE VALUE": "face_value",
+    "EX-DATE": "ex_date",
+    "RECORD DATE": "record_date"
+}
+
+_NUM = r"\d+(?:\.\d+)?"
+_RS = r"(?:r[se](?![a-z])\.?\s*-?\s*)"
+
+# One pattern for every event type NSE writes into PURPOSE. Alternatives are
+# tried left to right at each position, so a split's "Sub-Division" is
+# consumed before the dividend branch can see it; a PURPOSE holding several
+# events ("Bonus 1:1 / Face Value Split ...") yields one match per event.
+# A special dividend "Including" in another dividend is flagged as such: its
+# amount is already part of that dividend's.
+EVENT_PATTERN = re.compile(
+    rf"""
+    (?P<split>(?:face\s*value|fv)\s*(?:spl?i?t)?.*?{_RS}(?P<old_fv>{_NUM}).*?to\s*{_RS}(?P<new_fv>{_NUM}))
+    | (?P<bonus>bonus\W*(?P<bonus_new>\d+)\s*:\s*(?P<bonus_held>\d+))
+    | (?P<rights>(?:rights?|rhs)(?:\W*eq)?\W*(?P<rights_new>\d+)\s*:\s*(?P<rights_held>\d+)
+        (?:[^@/]*@\s*prem[a-z]*\s*{_RS}?(?P<premium>{_NUM}))?)
+    | (?P<buyback>buy\s*-?\s*back)
+    | (?P<dividend>
+        (?:(?:(?P<included>incl(?:uding|usive\s*of|\.)?)\W*)?(?P<special>special|spl)\W*(?:int(?:erim)?\W*)?(?:div[a-z]*)?
+          | (?P<interim>int(?:erim|erm)?\W*)?(?:final\W*|fin\W*)?\bdiv[a-z]*)
+        \W*(?:of\s*)?{_RS}?(?P<amount>{_NUM})(?P<percent>\s*%)?)
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+
+
+def classify_purpose(purpose: pd.Series) -> pd.DataFrame:
+    """
+    Tag every event in a PURPOSE column with one pass of EVENT_PATTERN.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per event found, indexed by the position of its source row,
+        with 'event_type' plus typed numeric fields: 'amount' (per share,
+        or percent of face value when 'percent' is set), 'old_face_value',
+        'new_face_value', 'new_shares'/'held_shares' for bonus and rights
+        entitlements, 'premium' and 'included' (a special dividend quoted as
+        part of another dividend's amount).
+    """
+    text = pd.Series(purpose.to_numpy(dtype=object), index=np.arange(len(purpose))).fillna("").astype(str)
+    found = text.str.extractall(EVENT_PATTERN)
+    if found.empty:
+        return pd.DataFrame(columns=["event_type", "amount", "percent", "old_face_value",
+                                     "new_face_value", "new_shares", "held_shares", "premium", "included"])
+
+    event_type = np.select(
+        [found["split"].notna(), found["bonus"].notna(), found["rights"].notna(),
+         found["buyback"].notna(), found["special"].notna(), found["interim"].notna()],
+        ["split", "bonus", "rights", "buyback", "special", "interim"],
+        default="dividend"
+    )
+
+    def number(*columns):
+        values = found[list(columns)].bfill(axis=1).iloc[:, 0]
+        return pd.to_numeric(values, errors="coerce")
+
+    events = pd.DataFrame({
+        "event_type": event_type,
+        "amount": number("amount"),
+        "percent": found["percent"].notna(),
+        "old_face_value": number("old_fv"),
+        "new_face_value": number("new_fv"),
+        "new_shares": number("bonus_new", "rights_new"),
+        "held_shares": number("bonus_held", "rights_held"),
+        "premium": number("premium"),
+        "included": found["included"].notna()
+    }, index=found.index)
+    return events.droplevel("match")
+
+
+def adjustment_ratio(events: pd.DataFrame) -> pd.Series:
+    """
+    'old:new' share ratio for splits and bonuses, as parse_ratios expects.
+
+    A split from face value 10 to 2 is '1:5'; a bonus of a new shares for
+    every b held leaves b + a shares for every b, i.e. 'b:(a+b)'.
+    """
+    ratio = pd.Series(pd.NA, index=events.index, dtype="string")
+
+    split = (events["event_type"] == "split") & (events["new_face_value"] > 0)
+    factor = events.loc[split, "old_face_value"] / events.loc[split, "new_face_value"]
+    ratio[split] = "1:" + factor.map("{:g}".format).astype(str)
+
+    bonus = (events["event_type"] == "bonus") & (events["held_shares"] > 0)
+    held = events.loc[bonus, "held_shares"]
+    total = held + events.loc[bonus, "new_shares"]
+    ratio[bonus] = held.map("{:g}".format).astype(str) + ":" + total.map("{:g}".format).astype(str)
+    return ratio
+
+
+def build_events(actions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize raw NSE corporate-action rows into one typed events table.
+
+    Parameters
+    ----------
+    actions : pd.DataFrame
+        Rows in the layout of NSE's corporate-actions CSV.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per event with the NSE_COLUMNS (renamed, dates parsed),
+        'event_type', 'payout_per_share', face values, entitlement counts,
+        'premium' and the adjustment 'ratio'. Rows repeated across
+        overlapping downloads (same ticker, ex-date and purpose) are kept
+        once. Rows with no recognised event (AGMs, schemes, e-voting ...)
+        are dropped; those that look like an event anyway are logged. A
+        special dividend included in a dividend's amount ("Rs.8.50 ...
+        Including Special Dividend Of Rs.2/-") is split out of it, so the
+        payouts sum to the quoted total. Ready for apply_adjustments and
+        process_dividends as is.
+    """
+    base = actions.rename(columns=NSE_COLUMNS)[list(NSE_COLUMNS.values())]
+    base["ticker"] = base["ticker"].astype(str).str.strip()
+    base["purpose"] = base["purpose"].astype(str).str.strip()
+    base["face_value"] = pd.to_numeric(base["face_value"], errors="coerce")
+    for col in ("ex_date", "record_date"):
+        base[col] = pd.to_datetime(base[col], format="%d-%b-%Y", errors="coerce")
+    base = base.drop_duplicates(subset=["ticker", "ex_date", "purpose"]).reset_index(drop=True)
+
+    found = classify_purpose(base["purpose"])
+    _log_unmatched(base.drop(index=found.index.unique()))
+    source = found.index.to_numpy()
+    events = pd.concat([base.loc[found.index].reset_index(drop=True),
+                        found.reset_index(drop=True)], axis=1)
+
+    # Dividends quoted as a percentage are a percentage of face value
+    payout = np.where(events["percent"], events["amount"] * events["face_value"] / 100, events["amount"])
+    dividend = events["event_type"].isin(DIVIDEND_EVENTS).to_numpy()
+    payout = np.where(dividend, payout, np.nan)
+
+    # Take included specials out of the first other dividend of their row
+    included = dividend & events["included"].to_numpy(dtype=bool)
+    parent = dividend & ~included
+    first_parent = parent & (pd.Series(parent).groupby(source).cumsum().to_numpy() == 1)
+    inside = pd.Series(np.where(included, payout, 0.0)).groupby(source).transform("sum").to_numpy()
+    split_out = first_parent & (payout > inside)
+    payout = np.where(split_out, payout - inside, payout)
+
+    events["payout_per_share"] = payout
+    events["ratio"] = adjustment_ratio(events)
+    events = events.drop(columns=["amount", "percent", "included"])
+    return events.reset_index(drop=True)
+
+
+def _log_unmatched(rows: pd.DataFrame):
+    suspect = rows["purpose"].str.contains(EVENT_WORDS)
+    for row in rows[suspect].itertuples():
+        logger.warning("no event recognised in PURPOSE %r (%s, ex-date %s)", row.purpose, row.ticker,
+                       row.ex_date.date() if pd.notna(row.ex_date) else "-")
+    if (~suspect).any():
+        logger.debug("%d rows without a corporate event (AGMs, schemes ...)", (~suspect).sum())
+
+
+def read_action_files(pattern: str) -> pd.DataFrame:
+    """
+    Concatenate the NSE corporate-action CSVs matching pattern, reading
+    each file once.
+    """
+    frames = []
+    for path in sorted(glob.glob(pattern)):
+        frames.append(pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig"))
+    if not frames:
+        return pd.DataFrame(columns=list(NSE_COLUMNS))
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_corporate_events(pattern: str = "corp_event/*.csv") -> pd.DataFrame:
+    """
+    Single-pass reader + classifier over a directory of NSE corporate-action
+    downloads; see build_events.
+    """
+    return build_events(read_action_files(pattern))
+
+
+def nse_layout(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rename the normalized columns back to NSE's headers, for writing the
+    dividends.csv / corporate_actions.csv files the index scripts read.
+    """
+    return events.rename(columns={v: k for k, v in NSE_COLUMNS.items()})
+
+
+def write_event_store(events: pd.DataFrame, dividends_path: str = "dividends.csv",
+                      corp_path: str = "corporate_actions.csv"):
+    """
+    Split build_events output into the dividends.csv (payouts) and
+    corporate_actions.csv (splits and bonuses) the index scripts load.
+    """
+    dividends = nse_layout(events[events["event_type"].isin(DIVIDEND_EVENTS)])
+    dividends = dividends.rename(columns={"payout_per_share": "payout_per_s"})
+    dividends.to_csv(dividends_path, date_format="%d-%b-%Y")
+
+    # Share ratios in old:new form (bonus 1:1 -> '1:2')
+    corporate_actions = nse_layout(events[events["event_type"].isin(["split", "bonus"])])
+    corporate_actions.to_csv(corp_path, date_format="%d-%b-%y")
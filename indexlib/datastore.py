@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = ".index_store"
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------
+# Raw columnar storage
+# -------------------------------------------------------
+def save_matrix(frame: pd.DataFrame, store_dir: str, name: str):
+    """
+    Write a dates x tickers float matrix as .npy arrays plus a ticker list.
+    """
+    path = os.path.join(store_dir, name)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "values.npy"), frame.to_numpy(dtype=float))
+    np.save(os.path.join(path, "dates.npy"), frame.index.to_numpy(dtype="datetime64[ns]"))
+    with open(os.path.join(path, "tickers.json"), "w", encoding="utf-8") as f:
+        json.dump([str(c) for c in frame.columns], f)
+
+
+def load_matrix(store_dir: str, name: str, mmap: bool = True) -> pd.DataFrame:
+    """
+    Load a matrix written by save_matrix. With mmap the values stay a
+    read-only memory map, so several processes share one copy in the
+    page cache.
+    """
+    path = os.path.join(store_dir, name)
+    values = np.load(os.path.join(path, "values.npy"), mmap_mode="r" if mmap else None)
+    dates = np.load(os.path.join(path, "dates.npy"))
+    with open(os.path.join(path, "tickers.json"), encoding="utf-8") as f:
+        tickers = json.load(f)
+    return pd.DataFrame(
+        values,
+        index=pd.DatetimeIndex(dates, name="date"),
+        columns=pd.Index(tickers, name="ticker"),
+        copy=False
+    )
+
+
+def _is_fresh(store_dir: str, name: str, sources) -> bool:
+    meta_path = os.path.join(store_dir, name, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    current = {src: os.path.getmtime(src) for src in sources}
+    return meta.get("sources") == current
+
+
+def _mark_fresh(store_dir: str, name: str, sources):
+    path = os.path.join(store_dir, name)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"sources": {src: os.path.getmtime(src) for src in sources}}, f)
+
+
+def cached_matrix(name: str, sources, build, store_dir: str = STORE_DIR, mmap: bool = True) -> pd.DataFrame:
+    """
+    Return the stored matrix `name`, rebuilding it with build() whenever
+    any of the source files has changed since it was written.
+    """
+    if not _is_fresh(store_dir, name, sources):
+        save_matrix(build(), store_dir, name)
+        _mark_fresh(store_dir, name, sources)
+    return load_matrix(store_dir, name, mmap=mmap)
+
+
+def cached_table(name: str, sources, build, store_dir: str = STORE_DIR) -> pd.DataFrame:
+    """
+    Same as cached_matrix for long tables (events), stored as pickles so
+    parsed dtypes survive.
+    """
+    path = os.path.join(store_dir, name, "table.pkl")
+    if not _is_fresh(store_dir, name, sources):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        build().to_pickle(path)
+        _mark_fresh(store_dir, name, sources)
+    return pd.read_pickle(path)
+
+
+def _store_name(prefix: str, path: str, *options) -> str:
+    """
+    Stable store entry name for a source file read with the given options.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    name = f"{prefix}-{parent}-{stem}"
+    if any(o is not None for o in options):
+        name += "-" + "".join(c if c.isalnum() else "_" for c in "-".join(map(str, options)))
+    return name
+
+
+# -------------------------------------------------------
+# Loaders shared by the index scripts
+# -------------------------------------------------------
+def _drop_bad_dates(frame: pd.DataFrame, raw: pd.Series, path: str) -> pd.DataFrame:
+    """
+    Drop rows whose 'date' did not parse, logging how many went and a few
+    of the offending values.
+    """
+    bad = frame['date'].isna()
+    if bad.any():
+        logger.warning("%s: dropped %d of %d rows with unparseable dates, e.g. %s", path, bad.sum(),
+                       len(frame), raw[bad].drop_duplicates().head(3).tolist())
+    return frame[~bad]
+
+
+def read_price_matrix(path: str, date_format: str = None, dayfirst: bool = False) -> pd.DataFrame:
+    """
+    Parse a long date/ticker/close CSV and pivot it to dates x tickers.
+    Rows whose date does not parse are dropped with a warning.
+    """
+    prices = pd.read_csv(path, usecols=['date', 'ticker', 'close'])
+    raw = prices['date']
+    prices['date'] = pd.to_datetime(raw, format=date_format, dayfirst=dayfirst, errors='coerce')
+    prices = _drop_bad_dates(prices, raw, path).drop_duplicates(subset=['date', 'ticker'])
+    return prices.pivot(index='date', columns='ticker', values='close').sort_index()
+
+
+def load_price_matrix(path: str = "price_data.csv", date_format: str = None, dayfirst: bool = False,
+                      store_dir: str = STORE_DIR, mmap: bool = True) -> pd.DataFrame:
+    name = _store_name("price", path, date_format, dayfirst)
+    return cached_matrix(name, [path], lambda: read_price_matrix(path, date_format, dayfirst),
+                         store_dir=store_dir, mmap=mmap)
+
+
+def read_shareholding(path: str, date_format: str = None) -> pd.DataFrame:
+    """
+    Long shareholding-pattern table with a parsed 'date' column, one row
+    per (date, ticker).
+    """
+    shares = pd.read_csv(
+        path,
+        usecols=['promoter_shares', 'public_shares', 'total_shares',
+                 'free_float_factor', 'ticker', 'report_date']
+    )
+    shares = shares.rename(columns={'report_date': 'date'})
+    raw = shares['date']
+    shares['date'] = pd.to_datetime(raw, format=date_format, errors='coerce')
+    shares = _drop_bad_dates(shares, raw, path)
+    return shares.drop_duplicates(subset=['date', 'ticker'], keep='last')
+
+
+def load_shareholding_matrices(path: str = "shareholiding_pattern.csv", date_format: str = None,
+                               store_dir: str = STORE_DIR, mmap: bool = True):
+    """
+    Return (total_shares_w, free_float_w) as report-date x tickers matrices.
+    """
+    name = _store_name("shares", path, date_format)
+    long = None
+
+    def build(column):
+        nonlocal long
+        if long is None:
+            long = read_shareholding(path, date_format)
+        return long.pivot(index='date', columns='ticker', values=column).sort_index()
+
+    total = cached_matrix(f"{name}-total", [path], lambda: build('total_shares'),
+                          store_dir=store_dir, mmap=mmap)
+    free_float = cached_matrix(f"{name}-float", [path], lambda: build('free_float_factor'),
+                               store_dir=store_dir, mmap=mmap)
+    return total, free_float
+
+
+def load_shareholding(path: str = "shareholiding_pattern.csv", date_format: str = None,
+                      store_dir: str = STORE_DIR) -> pd.DataFrame:
+    return cached_table(_store_name("shares-long", path, date_format), [path],
+                        lambda: read_shareholding(path, date_format), store_dir=store_dir)
+
+
+def read_events(path: str, date_columns=('EX-DATE', 'RECORD DATE'), date_format: str = None,
+                dayfirst: bool = True) -> pd.DataFrame:
+    """
+    Dividend / corporate-action CSV with ticker renamed and dates parsed.
+    """
+    events = pd.read_csv(path, index_col=0)
+    for col in date_columns:
+        events[col] = pd.to_datetime(events[col], format=date_format, dayfirst=dayfirst, errors='coerce')
+    events = events.rename(columns={'SYMBOL': 'ticker', 'EX-DATE': 'ex_date'})
+    return events.drop_duplicates()
+
+
+def load_events(path: str, date_columns=('EX-DATE', 'RECORD DATE'), date_format: str = None,
+                dayfirst: bool = True, store_dir: str = STORE_DIR) -> pd.DataFrame:
+    return cached_table(_store_name("events", path, date_format, dayfirst), [path],
+                        lambda: read_events(path, date_columns, date_format, dayfirst),
+                        store_dir=store_dir)
+
+
+def load_outstanding_shares(path: str = "outstanding_shares.csv", store_dir: str = STORE_DIR,
+                            mmap: bool = True) -> pd.DataFrame:
+    """
+    outstanding_shares.csv is already wide (date x tickers).
+    """
+    return cached_matrix(_store_name("outstanding", path), [path],
+                         lambda: pd.read_csv(path, parse_dates=['date'], index_col='date'),
+                         store_dir=store_dir, mmap=mmap)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+SPECIAL_THRESHOLD = 0.02
+PAYOUT_COLUMNS = ("payout_per_share", "payout_per_s")
+
+
+def _calendar_rows(index: pd.DatetimeIndex, dates) -> np.ndarray:
+    """
+    Row of each date in index, or of the last trading day before it
+    (first row if the date precedes the calendar).
+    """
+    rows = np.searchsorted(index.to_numpy(), np.asarray(dates, dtype="datetime64[ns]"), side="right") - 1
+    return np.clip(rows, 0, None)
+
+
+def process_dividends(divs: pd.DataFrame, price_adj: pd.DataFrame, float_shares: pd.DataFrame,
+                      mcap: pd.DataFrame, price_lookup: pd.Series = None,
+                      special_threshold: float = SPECIAL_THRESHOLD):
+    """
+    Classify and apply a whole dividend history in one batch.
+
+    A dividend is special when it is at least special_threshold of the
+    reference price (announcement-date price if available, otherwise the
+    adjusted price on the ex-date) or flagged short-notice. Special
+    dividends are removed from the ticker's market cap on the ex-date;
+    normal ones accumulate as index dividend cash on the ex-date.
+
+    Parameters
+    ----------
+    divs : pd.DataFrame
+        'ticker', 'ex_date' and a payout column (PAYOUT_COLUMNS, first
+        found); optional 'announcement_date' and 'short_notice_flag'.
+    price_adj, float_shares, mcap : pd.DataFrame
+        Calendar x tickers matrices sharing one index and columns.
+    price_lookup : pd.Series, optional
+        Raw close indexed by (date, ticker) for announcement prices.
+    special_threshold : float
+
+    Returns
+    -------
+    (mcap, indexed_div_cash) : adjusted copy of mcap and per-date cash.
+    """
+    payout_col = next((c for c in PAYOUT_COLUMNS if c in divs.columns), None)
+    cash = np.zeros(len(mcap.index))
+    mcap = mcap.copy()
+    if payout_col is None or divs.empty:
+        return mcap, pd.Series(cash, index=mcap.index)
+
+    payout = pd.to_numeric(divs[payout_col], errors="coerce").to_numpy(dtype=float)
+    col = float_shares.columns.get_indexer(divs["ticker"].astype(str))
+    ex = pd.to_datetime(divs["ex_date"], errors="coerce")
+    # Dividends going ex after the last day have not happened yet
+    keep = (col >= 0) & (ex <= mcap.index[-1]).to_numpy() & ~np.isnan(payout)
+
+    divs, payout, col, ex = divs[keep], payout[keep], col[keep], ex[keep]
+    tickers = float_shares.columns[col]
+
+    # Reference price: announcement-date close, else adjusted close on/before ex-date
+    ref_price = np.full(len(divs), np.nan)
+    if price_lookup is not None and "announcement_date" in divs.columns:
+        ann = pd.MultiIndex.from_arrays([pd.to_datetime(divs["announcement_date"], errors="coerce"), tickers])
+        ref_price = price_lookup.reindex(ann).to_numpy(dtype=float)
+
+    px_rows = np.searchsorted(price_adj.index.to_numpy(), ex.to_numpy(dtype="datetime64[ns]"), side="right") - 1
+    px_cols = price_adj.columns.get_indexer(tickers)
+    fallback = np.where(px_rows >= 0, price_adj.to_numpy(dtype=float)[np.clip(px_rows, 0, None), px_cols], 0.0)
+    ref_price = np.where(np.isnan(ref_price), fallback, ref_price)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.where(ref_price > 0, payout / ref_price, 0.0)
+    short_flag = (divs["short_notice_flag"].fillna(False).astype(bool).to_numpy()
+                  if "short_notice_flag" in divs.columns else np.zeros(len(divs), dtype=bool))
+    special = (percent >= special_threshold) | short_flag
+
+    rows = _calendar_rows(float_shares.index, ex)
+    float_sh = float_shares.to_numpy(dtype=float)[rows, col]
+    held = ~np.isnan(float_sh) & (float_sh != 0)
+    amount = payout * float_sh
+
+    # Normal dividends -> index dividend cash on the ex-date
+    normal = held & ~special
+    np.add.at(cash, rows[normal], amount[normal])
+
+    # Special dividends -> cut the ticker's market cap on the ex-date (floored at 0)
+    special &= held
+    removed = np.zeros(mcap.shape)
+    np.add.at(removed, (rows[special], col[special]), amount[special])
+    values = mcap.to_numpy(dtype=float, copy=True)
+    touched = removed > 0
+    values[touched] = np.fmax(0.0, values[touched] - removed[touched])
+    mcap = pd.DataFrame(values, index=mcap.index, columns=mcap.columns)
+
+    return mcap, pd.Series(cash, index=mcap.index)
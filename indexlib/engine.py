@@ -0,0 +1,449 @@
+import numpy as np
+import pandas as pd
+
+from indexlib.corporate_actions import adjustment_factors
+from indexlib.datastore import load_events, load_price_matrix, load_shareholding
+from indexlib.dividends import process_dividends
+from indexlib.holdings import Holdings, mark_to_market, rebalance_holdings
+from indexlib.incremental import IndexState, state_from_history
+from indexlib.linking import chain_link
+from indexlib.pit import PointInTime
+from indexlib.selection import select_top_n, top_n_sum
+from indexlib.sweep import WEIGHTINGS, rebalance_dates
+
+INPUTS = ("prices", "shares", "float_factors", "corp", "dividends")
+
+# Raw inputs each derived value is built from; a change to any of them
+# drops the cached value
+_PRICES = frozenset({"prices"})
+_ADJUSTED = _PRICES | {"corp"}
+_CAPS = _ADJUSTED | {"shares", "float_factors"}
+_INDEX = _CAPS | {"dividends"}
+
+
+def _aligned(source, dates: pd.DatetimeIndex, columns: pd.Index) -> pd.DataFrame:
+    """
+    dates x columns values in force on each date from a PointInTime or a
+    report-date x tickers matrix (last report on or before each date).
+    """
+    if isinstance(source, PointInTime):
+        return source.as_of(dates, columns)
+    frame = source.reindex(columns=columns)
+    return frame.reindex(frame.index.union(dates)).ffill().reindex(dates)
+
+
+class IndexEngine:
+    """
+    Aligned price, shares, free-float and split/bonus matrices built once
+    and shared by every index computed from them.
+
+    Each derived matrix (calendar prices, adjustment factors, market caps,
+    dividend-adjusted caps, holdings per (n, freq) ...) is built on first
+    use and cached. Replacing an input through update() drops exactly the
+    cached values that depend on it, so PRI, TRI and any number of
+    variants can be computed in one process without repeating the pivots.
+
+    Three index constructions share the matrices: held units re-struck on
+    each rebalance (holdings, pri, tri), weights chain-linked between
+    rebalances (chain_linked) and the daily top-n market cap (top_n_pri).
+
+    Parameters
+    ----------
+    prices : pd.DataFrame
+        Raw daily closes, dates x tickers.
+    shares, float_factors : PointInTime or pd.DataFrame, optional
+        Total shares and free-float factors, as change points or as
+        report-date x tickers matrices. Read as-of each calendar day; float
+        factors default to 1.0 where unknown.
+    corp : pd.DataFrame, optional
+        Split/bonus events for apply_adjustments.
+    dividends : pd.DataFrame, optional
+        Dividend events for process_dividends.
+    calendar : str, optional
+        Frequency of the trading calendar ('B' fills non-trading weekdays
+        forward); None keeps the price dates.
+    base_value : float
+    """
+
+    def __init__(self, prices: pd.DataFrame, shares=None, float_factors=None, corp: pd.DataFrame = None,
+                 dividends: pd.DataFrame = None, calendar: str = "B", base_value: float = 1000.0):
+        self.prices = prices
+        self.shares = shares
+        self.float_factors = float_factors
+        self.corp = corp
+        self.dividends = dividends
+        self.calendar_freq = calendar
+        self.base_value = base_value
+        self._cache = {}
+
+    @classmethod
+    def from_files(cls, price_path: str = "price_data.csv",
+                   shareholding_path: str = "shareholiding_pattern.csv",
+                   dividends_path: str = "dividends.csv", corp_path: str = "corporate_actions.csv",
+                   **kwargs) -> "IndexEngine":
+        """
+        Load the inputs the way total_return_index/rough03.py does, through
+        the columnar store.
+        """
+        shares = load_shareholding(shareholding_path)
+        return cls(
+            load_price_matrix(price_path, dayfirst=True),
+            shares=PointInTime.from_long(shares, "total_shares"),
+            float_factors=PointInTime.from_long(shares, "free_float_factor"),
+            corp=load_events(corp_path, date_format='%d-%b-%y'),
+            dividends=load_events(dividends_path),
+            **kwargs
+        )
+
+    # ---------------------------------------------------
+    # Cache
+    # ---------------------------------------------------
+    def _cached(self, key, depends: frozenset, build):
+        if key not in self._cache:
+            self._cache[key] = (depends, build())
+        return self._cache[key][1]
+
+    def invalidate(self, *inputs: str):
+        """
+        Drop cached values built from any of inputs (all of them when
+        called without arguments).
+        """
+        if not inputs:
+            self._cache.clear()
+            return
+        changed = set(inputs)
+        self._cache = {key: entry for key, entry in self._cache.items() if not entry[0] & changed}
+
+    def update(self, **inputs):
+        """
+        Replace inputs (any of INPUTS) and invalidate what depended on them.
+        """
+        unknown = set(inputs) - set(INPUTS)
+        if unknown:
+            raise ValueError(f"Unknown inputs {sorted(unknown)}; expected some of {INPUTS}")
+        for name, value in inputs.items():
+            setattr(self, name, value)
+        self.invalidate(*inputs)
+
+    # ---------------------------------------------------
+    # Shared matrices
+    # ---------------------------------------------------
+    @property
+    def calendar(self) -> pd.DatetimeIndex:
+        def build():
+            if self.calendar_freq is None:
+                return self.prices.index
+            return pd.date_range(self.prices.index.min(), self.prices.index.max(), freq=self.calendar_freq)
+        return self._cached("calendar", _PRICES, build)
+
+    @property
+    def price_w(self) -> pd.DataFrame:
+        """
+        Raw closes on the calendar, forward-filled.
+        """
+        return self._cached("price_w", _PRICES, lambda: self.prices.reindex(self.calendar).ffill())
+
+    @property
+    def factors(self) -> pd.DataFrame:
+        """
+        Cumulative split/bonus share multipliers.
+        """
+        def build():
+            if self.corp is None:
+                return pd.DataFrame(1.0, index=self.calendar, columns=self.price_w.columns)
+            return adjustment_factors(self.corp, self.calendar, self.price_w.columns)
+        return self._cached("factors", _ADJUSTED, build)
+
+    @property
+    def price_adj(self) -> pd.DataFrame:
+        return self._cached("price_adj", _ADJUSTED,
+                            lambda: (self.price_w / self.factors).ffill().fillna(0.0))
+
+    @property
+    def shares_w(self) -> pd.DataFrame:
+        """
+        Total shares in force on each calendar day, before split/bonus
+        adjustments (NaN before a ticker's first report).
+        """
+        def build():
+            if self.shares is None:
+                raise ValueError("IndexEngine needs shares for market caps")
+            return _aligned(self.shares, self.calendar, self.price_w.columns)
+        return self._cached("shares_w", _PRICES | {"shares"}, build)
+
+    @property
+    def float_w(self) -> pd.DataFrame:
+        """
+        Free-float factors in force on each calendar day, 1.0 where unknown.
+        """
+        def build():
+            if self.float_factors is None:
+                return pd.DataFrame(1.0, index=self.calendar, columns=self.price_w.columns)
+            return _aligned(self.float_factors, self.calendar, self.price_w.columns).fillna(1.0)
+        return self._cached("float_w", _PRICES | {"float_factors"}, build)
+
+    @property
+    def shares_adj(self) -> pd.DataFrame:
+        return self._cached("shares_adj", _CAPS - {"float_factors"},
+                            lambda: (self.shares_w * self.factors).fillna(0.0))
+
+    @property
+    def float_shares(self) -> pd.DataFrame:
+        return self._cached("float_shares", _CAPS, lambda: self.shares_adj * self.float_w)
+
+    @property
+    def market_caps(self) -> pd.DataFrame:
+        """
+        Free-float market caps before dividend adjustments.
+        """
+        return self._cached("market_caps", _CAPS, lambda: self.price_adj * self.float_shares)
+
+    def _dividend_adjusted(self):
+        def build():
+            if self.dividends is None:
+                return self.market_caps, pd.Series(0.0, index=self.calendar)
+            lookup = self._cached("price_lookup", _PRICES, lambda: self.prices.stack())
+            return process_dividends(self.dividends, self.price_adj, self.float_shares, self.market_caps,
+                                     price_lookup=lookup)
+        return self._cached("dividends", _INDEX, build)
+
+    @property
+    def index_caps(self) -> pd.DataFrame:
+        """
+        Market caps with special dividends taken out on their ex-dates.
+        """
+        return self._dividend_adjusted()[0]
+
+    @property
+    def dividend_cash(self) -> pd.Series:
+        """
+        Normal dividend cash paid on each ex-date.
+        """
+        return self._dividend_adjusted()[1]
+
+    @property
+    def base_date(self) -> pd.Timestamp:
+        """
+        First calendar day with a positive total market cap.
+        """
+        def build():
+            total = self.market_caps.sum(axis=1)
+            if not (total > 0).any():
+                raise ValueError("Market cap is zero on every day, check input data.")
+            return total.index[(total > 0).argmax()]
+        return self._cached("base_date", _CAPS, build)
+
+    @property
+    def base_mcap(self) -> float:
+        def build():
+            base = self.index_caps.sum(axis=1).loc[self.base_date]
+            if base == 0:
+                raise ValueError("Base market cap is zero after special dividend adjustments. Check data.")
+            return base
+        return self._cached("base_mcap", _INDEX, build)
+
+    # ---------------------------------------------------
+    # Per-variant results
+    # ---------------------------------------------------
+    def rebalance_dates(self, freq: str = "quarterly", pending: bool = False) -> pd.DatetimeIndex:
+        """
+        Period ends within the calendar; with pending the period end after
+        the last day is kept too (selected on the last known prices).
+        """
+        def build():
+            dates = rebalance_dates(self.calendar, freq)
+            if pending:
+                return dates
+            return dates[(dates >= self.calendar[0]) & (dates <= self.calendar[-1])]
+        return self._cached(("rebalance_dates", freq, pending), _PRICES, build)
+
+    def holdings(self, n: int = 20, freq: str = "quarterly") -> Holdings:
+        return self._cached(("holdings", n, freq), _INDEX,
+                            lambda: rebalance_holdings(self.price_adj, self.index_caps,
+                                                       self.rebalance_dates(freq), n=n,
+                                                       base_value=self.base_value))
+
+    def portfolio_value(self, n: int = 20, freq: str = "quarterly") -> pd.Series:
+        return self._cached(("portfolio_value", n, freq), _INDEX,
+                            lambda: mark_to_market(self.holdings(n, freq), self.price_adj))
+
+    def pri(self, n: int = 20, freq: str = "quarterly") -> pd.Series:
+        """
+        Price return index, base_value on base_date.
+        """
+        def build():
+            value = self.portfolio_value(n, freq)
+            if value.loc[self.base_date] == 0:
+                # Fall back to the market-cap ratio
+                return self.index_caps.sum(axis=1) / self.base_mcap * self.base_value
+            return value / value.loc[self.base_date] * self.base_value
+        return self._cached(("pri", n, freq), _INDEX, build)
+
+    def dividend_points(self, n: int = 20, freq: str = "quarterly") -> pd.Series:
+        """
+        Normal dividend cash in index points.
+        """
+        return self._cached(("dividend_points", n, freq), _INDEX,
+                            lambda: (self.dividend_cash / self.base_mcap * self.base_value)
+                            .reindex(self.pri(n, freq).index).fillna(0.0))
+
+    def tri(self, n: int = 20, freq: str = "quarterly") -> pd.Series:
+        """
+        Total return index: PRI with dividend points reinvested daily.
+        """
+        def build():
+            pri = self.pri(n, freq)
+            mult = (pri + self.dividend_points(n, freq)) / pri.shift(1)
+            mult.iloc[0] = 1.0
+            return self.base_value * mult.cumprod()
+        return self._cached(("tri", n, freq), _INDEX, build)
+
+    def result(self, n: int = 20, freq: str = "quarterly") -> pd.DataFrame:
+        """
+        The TRI_top<n> table written by rough03.py.
+        """
+        return pd.DataFrame({
+            "Index_MarketCap": self.index_caps.sum(axis=1),
+            "Portfolio_Value": self.portfolio_value(n, freq),
+            "PRI": self.pri(n, freq),
+            "Indexed_Dividend_Points": self.dividend_points(n, freq),
+            "TRI": self.tri(n, freq)
+        })
+
+    def units(self, n: int = 20, freq: str = "quarterly") -> pd.DataFrame:
+        """
+        Rebalance dates x tickers units held (0 outside the index).
+        """
+        def build():
+            h = self.holdings(n, freq)
+            units = np.zeros((len(h.dates), len(h.tickers)))
+            rebal, slot = np.nonzero(h.members >= 0)
+            units[rebal, h.members[rebal, slot]] = h.units[rebal, slot]
+            return pd.DataFrame(units, index=h.dates, columns=h.tickers)
+        return self._cached(("units", n, freq), _INDEX, build)
+
+    def weights(self, n: int = 20, freq: str = "quarterly") -> pd.DataFrame:
+        """
+        Rebalance dates x tickers weights as struck on each rebalance.
+        """
+        def build():
+            units = self.units(n, freq)
+            value = units * self.price_adj.loc[units.index, units.columns]
+            return value.div(value.sum(axis=1), axis=0).fillna(0.0)
+        return self._cached(("weights", n, freq), _INDEX, build)
+
+    def turnover(self, n: int = 20, freq: str = "quarterly") -> pd.Series:
+        """
+        One-way turnover on each rebalance: half the absolute change from
+        the drifted old weights to the new ones (the first build counts
+        as 1.0).
+        """
+        def build():
+            units = self.units(n, freq)
+            px = self.price_adj.loc[units.index, units.columns].to_numpy(dtype=float)
+            old = np.vstack([np.zeros((1, units.shape[1])), units.to_numpy()[:-1]]) * px
+            with np.errstate(invalid="ignore", divide="ignore"):
+                old = np.nan_to_num(old / old.sum(axis=1, keepdims=True))
+            new = self.weights(n, freq).to_numpy()
+            turnover = 0.5 * np.abs(new - old).sum(axis=1)
+            if len(turnover):
+                turnover[0] = 1.0
+            return pd.Series(turnover, index=units.index, name="turnover")
+        return self._cached(("turnover", n, freq), _INDEX, build)
+
+    def state(self, n: int = 20, freq: str = "quarterly") -> IndexState:
+        """
+        IndexState at the last day, for daily_update.py.
+        """
+        last = self.price_adj.index[-1]
+        return state_from_history(
+            self.price_w, self.price_adj, self.float_shares, self.holdings(n, freq).units_on(last),
+            self.pri(n, freq), self.tri(n, freq), self.base_mcap,
+            self.portfolio_value(n, freq).loc[self.base_date], corp=self.corp, n=n,
+            base_value=self.base_value
+        )
+
+    # ---------------------------------------------------
+    # Chain-linked and daily top-n variants
+    # ---------------------------------------------------
+    @property
+    def linked_prices(self) -> pd.DataFrame:
+        """
+        Split/bonus adjusted closes on the calendar for chain-linking.
+
+        Built from the raw closes, not price_w: a day without a close stays
+        NaN so the stock contributes nothing to the index that day, as the
+        per-segment scripts did, rather than holding its last price.
+        """
+        return self._cached("linked_prices", _ADJUSTED,
+                            lambda: self.prices.reindex(self.calendar) / self.factors)
+
+    def rebalance_prices(self, freq: str = "quarterly") -> pd.DataFrame:
+        """
+        Rebalance dates (pending one included) x tickers adjusted closes on
+        or before each date.
+        """
+        return self._cached(("rebalance_prices", freq), _ADJUSTED,
+                            lambda: self.linked_prices.reindex(self.rebalance_dates(freq, pending=True),
+                                                               method="ffill"))
+
+    def rebalance_caps(self, freq: str = "quarterly", weighting: str = "cap") -> pd.DataFrame:
+        """
+        Rebalance dates x tickers market caps from the shares (and, for
+        'float_cap', free-float factors) in force on each date; NaN where
+        either is unknown.
+        """
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting {weighting!r}")
+
+        def build():
+            if self.shares is None:
+                raise ValueError("IndexEngine needs shares for market caps")
+            dates = self.rebalance_dates(freq, pending=True)
+            columns = self.price_w.columns
+            shares = _aligned(self.shares, dates, columns) * self.factors.reindex(dates, method="ffill")
+            caps = shares * self.rebalance_prices(freq)
+            if weighting == "float_cap":
+                if self.float_factors is None:
+                    raise ValueError("float_cap weighting needs float_factors")
+                caps = caps * _aligned(self.float_factors, dates, columns)
+            return caps
+        return self._cached(("rebalance_caps", freq, weighting), _CAPS, build)
+
+    def selection(self, n: int = 20, freq: str = "quarterly", weighting: str = "cap", buffer: int = 0):
+        """
+        (weights, members) of the top n on each rebalance date; see
+        select_top_n.
+        """
+        return self._cached(("selection", n, freq, weighting, buffer), _CAPS,
+                            lambda: select_top_n(self.rebalance_caps(freq, weighting), n, buffer=buffer))
+
+    def chain_linked(self, n: int = 20, freq: str = "quarterly", weighting: str = "cap",
+                     buffer: int = 0) -> pd.Series:
+        """
+        Daily index chain-linked across rebalances from the selection
+        weights, base_value on the first rebalance.
+        """
+        return self._cached(("chain_linked", n, freq, weighting, buffer), _CAPS,
+                            lambda: chain_link(self.linked_prices, self.selection(n, freq, weighting, buffer)[0],
+                                               self.base_value))
+
+    def top_n_caps(self, n: int = 20) -> pd.Series:
+        """
+        Daily sum of the n largest free-float market caps.
+        """
+        return self._cached(("top_n_caps", n), _CAPS, lambda: top_n_sum(self.market_caps, n))
+
+    def top_n_pri(self, n: int = 20, base_date=None) -> pd.Series:
+        """
+        Daily top-n market cap as a price index, base_value on the trading
+        day nearest base_date (default: the engine's base_date).
+        """
+        caps = self.top_n_caps(n)
+        if base_date is None:
+            base = caps.loc[self.base_date]
+        else:
+            base = caps.iloc[caps.index.get_indexer([pd.Timestamp(base_date)], method="nearest")[0]]
+        if base == 0:
+            raise ValueError("Top-n market cap is zero on the base date, check input data.")
+        return caps / base * self.base_value
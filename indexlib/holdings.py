@@ -0,0 +1,150 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class Holdings(NamedTuple):
+    """
+    Index holdings as a step function of the rebalance dates.
+
+    Row k of members/units is the portfolio held from dates[k] until the
+    next rebalance; members holds column positions into tickers (-1 pads
+    rebalances with fewer than n names). Memory is rebalances x n rather
+    than trading days x universe.
+    """
+    dates: pd.DatetimeIndex
+    tickers: pd.Index
+    members: np.ndarray
+    units: np.ndarray
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Long table with one row per (rebalance date, ticker) held.
+        """
+        held = self.members >= 0
+        rebal, slot = np.nonzero(held)
+        return pd.DataFrame({
+            "date": self.dates[rebal],
+            "ticker": self.tickers[self.members[rebal, slot]],
+            "units": self.units[rebal, slot]
+        })
+
+    def units_on(self, date) -> pd.Series:
+        """
+        Units held on date (the latest rebalance on or before it).
+        """
+        k = self.dates.searchsorted(pd.Timestamp(date), side="right") - 1
+        k = max(k, 0)
+        held = self.members[k] >= 0
+        return pd.Series(self.units[k, held], index=self.tickers[self.members[k, held]])
+
+
+def _align(index: pd.DatetimeIndex, dates) -> np.ndarray:
+    """
+    Calendar row of each date, or of the last trading day before it.
+    """
+    rows = np.searchsorted(index.to_numpy(), pd.DatetimeIndex(dates).to_numpy(), side="right") - 1
+    return rows
+
+
+def rebalance_row(prices: np.ndarray, caps: np.ndarray, prev_cols, prev_units,
+                  n: int, base_value: float):
+    """
+    Re-strike one rebalance from a row of prices and market caps.
+
+    prev_cols/prev_units are the holdings being replaced (None on the
+    first rebalance). Returns (cols, units) for the new top n, or None
+    when no stock has a positive market cap.
+    """
+    caps = np.nan_to_num(caps)
+    candidates = np.flatnonzero(caps > 0)
+    if not len(candidates):
+        return None
+    top = candidates[np.argsort(-caps[candidates], kind="stable")[:n]]
+    weights = caps[top] / caps[top].sum()
+
+    value = 0.0
+    if prev_cols is not None and len(prev_cols):
+        value = np.nansum(prev_units * prices[prev_cols])
+    if value == 0 or np.isnan(value):
+        value = base_value
+    return top, weights * value / prices[top]
+
+
+def rebalance_holdings(prices: pd.DataFrame, market_caps: pd.DataFrame, rebal_dates,
+                       n: int = 20, base_value: float = 1000.0) -> Holdings:
+    """
+    Market-cap weighted top-n holdings, re-struck on each rebalance date.
+
+    On each rebalance the current holdings are marked at that day's prices
+    and the proceeds are spread over the new top n (positive market cap
+    only); names that drop out are sold entirely. The first rebalance, or
+    any rebalance where the old portfolio is worth nothing, starts again
+    from base_value.
+
+    Parameters
+    ----------
+    prices, market_caps : pd.DataFrame
+        Calendar x tickers matrices with the same index and columns.
+    rebal_dates : iterable of dates
+        Aligned to the last trading day on or before each date; dates
+        before the calendar or without any investable stock are skipped.
+    n : int
+    base_value : float
+
+    Returns
+    -------
+    Holdings
+    """
+    px = prices.to_numpy(dtype=float)
+    caps = np.nan_to_num(market_caps.to_numpy(dtype=float))
+    rows = _align(prices.index, rebal_dates)
+    rows = np.unique(rows[rows >= 0])
+
+    dates, members, units = [], [], []
+    prev_cols = prev_units = None
+    for row in rows:
+        struck = rebalance_row(px[row], caps[row], prev_cols, prev_units, n, base_value)
+        if struck is None:
+            continue
+        prev_cols, prev_units = struck
+        padded_cols = np.full(n, -1)
+        padded_units = np.zeros(n)
+        padded_cols[:len(prev_cols)] = prev_cols
+        padded_units[:len(prev_cols)] = prev_units
+        dates.append(prices.index[row])
+        members.append(padded_cols)
+        units.append(padded_units)
+
+    return Holdings(
+        dates=pd.DatetimeIndex(dates),
+        tickers=prices.columns,
+        members=np.array(members, dtype=int).reshape(-1, n),
+        units=np.array(units, dtype=float).reshape(-1, n)
+    )
+
+
+def mark_to_market(holdings: Holdings, prices: pd.DataFrame) -> pd.Series:
+    """
+    Daily portfolio value of holdings at prices, one segment at a time.
+
+    Each segment only touches the columns it holds, so the full
+    dates x tickers units matrix is never built. Days before the first
+    rebalance are valued with the first holdings.
+    """
+    prices = prices.reindex(columns=holdings.tickers)
+    px = prices.to_numpy(dtype=float)
+    value = np.zeros(len(prices.index))
+    if not len(holdings.dates):
+        return pd.Series(value, index=prices.index)
+
+    starts = np.clip(_align(prices.index, holdings.dates), 0, None)
+    starts[0] = 0
+    ends = np.append(starts[1:], len(value))
+    for k, (start, end) in enumerate(zip(starts, ends)):
+        held = holdings.members[k] >= 0
+        cols = holdings.members[k, held]
+        value[start:end] = np.nan_to_num(px[start:end, cols]) @ holdings.units[k, held]
+
+    return pd.Series(value, index=prices.index)
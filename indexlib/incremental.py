@@ -0,0 +1,212 @@
+import json
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from indexlib.corporate_actions import ADJUSTING_EVENTS, parse_ratios
+from indexlib.dividends import process_dividends
+from indexlib.holdings import rebalance_row
+
+
+@dataclass
+class IndexState:
+    """
+    Everything needed to extend a published PRI/TRI by one day.
+
+    Per-ticker values are plain dicts so the state round-trips through
+    JSON. factors are the cumulative split/bonus multipliers (adjusted
+    price = raw close / factor), float_shares are already adjusted, and
+    last_prices are raw closes used to carry forward missing quotes.
+    pending_actions holds announced split/bonus events not yet ex.
+    """
+    date: str
+    base_value: float
+    base_mcap: float
+    portfolio_base: float
+    pri: float
+    tri: float
+    n: int = 20
+    units: dict = field(default_factory=dict)
+    factors: dict = field(default_factory=dict)
+    float_shares: dict = field(default_factory=dict)
+    last_prices: dict = field(default_factory=dict)
+    pending_actions: list = field(default_factory=list)
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> "IndexState":
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+
+def _floats(series: pd.Series) -> dict:
+    series = series.dropna()
+    return {str(k): float(v) for k, v in series.items()}
+
+
+def _action_records(actions: pd.DataFrame) -> list:
+    if actions is None or actions.empty:
+        return []
+    actions = actions.dropna(subset=["ex_date"])
+    actions = actions[actions["event_type"].astype(str).str.upper().isin(ADJUSTING_EVENTS)]
+    return [
+        {"ticker": str(t), "ex_date": pd.Timestamp(d).strftime("%Y-%m-%d"), "ratio": str(r)}
+        for t, d, r in zip(actions["ticker"], actions["ex_date"], actions["ratio"])
+    ]
+
+
+def state_from_history(price_w: pd.DataFrame, price_adj: pd.DataFrame, float_shares: pd.DataFrame,
+                       units: pd.Series, pri: pd.Series, tri: pd.Series, base_mcap: float,
+                       portfolio_base: float, corp: pd.DataFrame = None, n: int = 20,
+                       base_value: float = 1000.0) -> IndexState:
+    """
+    Snapshot the end of a full recomputation as an IndexState.
+
+    price_w are the raw (forward-filled) closes and price_adj the adjusted
+    ones, so the split/bonus factors are recovered as their ratio. Events
+    in corp with an ex-date after the last day are kept as pending.
+    """
+    last = price_w.index[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = price_w.loc[last] / price_adj.loc[last]
+    factors = factors.where(np.isfinite(factors), 1.0)
+
+    pending = []
+    if corp is not None:
+        pending = _action_records(corp[corp["ex_date"] > last])
+
+    return IndexState(
+        date=last.strftime("%Y-%m-%d"),
+        base_value=float(base_value),
+        base_mcap=float(base_mcap),
+        portfolio_base=float(portfolio_base),
+        pri=float(pri.iloc[-1]),
+        tri=float(tri.iloc[-1]),
+        n=n,
+        units=_floats(units[units != 0]),
+        factors=_floats(factors),
+        float_shares=_floats(float_shares.loc[last]),
+        last_prices=_floats(price_w.loc[last]),
+        pending_actions=pending
+    )
+
+
+def update(state: IndexState, date, prices, dividends: pd.DataFrame = None,
+           actions: pd.DataFrame = None, float_shares=None, rebalance: bool = None):
+    """
+    Advance state by one trading day.
+
+    Work is proportional to the universe size for that one day, never to
+    the length of the history.
+
+    Parameters
+    ----------
+    state : IndexState
+        Updated in place.
+    date : date-like
+        The new trading day; must be after state.date.
+    prices : mapping or pd.Series
+        Raw closes for the day, ticker -> price; missing tickers keep
+        their last price.
+    dividends : pd.DataFrame, optional
+        Dividends ('ticker', 'ex_date', payout column); those whose ex-date
+        falls on date, or on following non-business days, are applied.
+        Without price history the special test uses today's adjusted close.
+    actions : pd.DataFrame, optional
+        Corporate actions ('ticker', 'ex_date', 'event_type', 'ratio');
+        split/bonus rows not yet applied are queued until due, so passing
+        the full table every day is fine.
+    float_shares : mapping, optional
+        Fresh unadjusted float share counts (e.g. from a new filing).
+    rebalance : bool, optional
+        Force or suppress a rebalance; by default the index rebalances on
+        the last business day of each quarter.
+
+    Returns
+    -------
+    dict
+        The new result row: Index_MarketCap, Portfolio_Value, PRI,
+        Indexed_Dividend_Points and TRI.
+    """
+    date = pd.Timestamp(date)
+    if date <= pd.Timestamp(state.date):
+        raise ValueError(f"{date.date()} is not after the last update {state.date}")
+
+    # Like the full run, an event belongs to the last business day on or
+    # before its ex-date: today covers ex-dates in [start, end)
+    start = pd.Timestamp(state.date) + pd.offsets.BDay(1)
+    end = date + pd.offsets.BDay(1)
+
+    # Queue actions not handled by earlier updates, once each; split/bonus
+    # events due today then scale factors and float shares
+    if actions is not None:
+        actions = actions[pd.to_datetime(actions["ex_date"], errors="coerce") >= start]
+    for action in _action_records(actions):
+        if action not in state.pending_actions:
+            state.pending_actions.append(action)
+    due = [a for a in state.pending_actions if pd.Timestamp(a["ex_date"]) < end]
+    state.pending_actions = [a for a in state.pending_actions if pd.Timestamp(a["ex_date"]) >= end]
+    if due:
+        ratios = parse_ratios(pd.Series([a["ratio"] for a in due]))
+        for action, ratio in zip(due, ratios):
+            t = action["ticker"]
+            state.factors[t] = state.factors.get(t, 1.0) * ratio
+            if t in state.float_shares:
+                state.float_shares[t] *= ratio
+
+    if float_shares is not None:
+        for t, shares in dict(float_shares).items():
+            state.float_shares[str(t)] = float(shares) * state.factors.get(str(t), 1.0)
+
+    state.last_prices.update(_floats(pd.Series(prices, dtype=float)))
+    tickers = pd.Index(sorted(state.last_prices), name="ticker")
+    raw = pd.Series(state.last_prices).reindex(tickers)
+    factors = pd.Series(state.factors, dtype=float).reindex(tickers).fillna(1.0)
+    px = (raw / factors).fillna(0.0)
+    shares = pd.Series(state.float_shares, dtype=float).reindex(tickers)
+
+    # One-row matrices so dividends go through the same batch processor
+    day = pd.DatetimeIndex([date])
+    px_row = pd.DataFrame([px.to_numpy()], index=day, columns=tickers)
+    shares_row = pd.DataFrame([shares.to_numpy()], index=day, columns=tickers)
+    mcap_row = px_row * shares_row
+    div_cash = 0.0
+    if dividends is not None and not dividends.empty:
+        ex = pd.to_datetime(dividends["ex_date"], errors="coerce")
+        todays = dividends[(ex >= start) & (ex < end)].assign(ex_date=date)
+        mcap_row, cash = process_dividends(todays, px_row, shares_row, mcap_row)
+        div_cash = float(cash.iloc[0])
+    index_mcap = float(mcap_row.sum(axis=1).iloc[0])
+
+    units = pd.Series(state.units, dtype=float).reindex(tickers).fillna(0.0)
+    portfolio_value = float((units * px).sum())
+    if state.portfolio_base:
+        pri = portfolio_value / state.portfolio_base * state.base_value
+    else:
+        pri = index_mcap / state.base_mcap * state.base_value
+    div_points = div_cash / state.base_mcap * state.base_value
+    tri = state.tri * (pri + div_points) / state.pri
+
+    if rebalance is None:
+        rebalance = pd.offsets.BQuarterEnd().is_on_offset(date)
+    if rebalance:
+        held = tickers.get_indexer(list(state.units))
+        struck = rebalance_row(px.to_numpy(), mcap_row.to_numpy()[0], held,
+                               np.array(list(state.units.values())), state.n, state.base_value)
+        if struck is not None:
+            cols, new_units = struck
+            state.units = {str(tickers[c]): float(u) for c, u in zip(cols, new_units)}
+
+    state.date = date.strftime("%Y-%m-%d")
+    state.pri, state.tri = pri, tri
+    return {
+        "Index_MarketCap": index_mcap,
+        "Portfolio_Value": portfolio_value,
+        "PRI": pri,
+        "Indexed_Dividend_Points": div_points,
+        "TRI": tri
+    }
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+
+def _segment_bounds(dates: np.ndarray, rebal_dates: np.ndarray):
+    """
+    First and last trading-day positions covered by each rebalance segment.
+
+    Segment k starts on the first trading day on/after rebal_dates[k] and
+    runs to the last trading day on/before rebal_dates[k+1] (the final
+    segment runs to the end of the data).
+    """
+    starts = np.searchsorted(dates, rebal_dates, side="left")
+    ends = np.empty_like(starts)
+    ends[:-1] = np.searchsorted(dates, rebal_dates[1:], side="right") - 1
+    ends[-1] = len(dates) - 1
+    return starts, ends
+
+
+def chain_link(prices: pd.DataFrame, weights: pd.DataFrame, base_value: float = 1000.0) -> pd.Series:
+    """
+    Stitch a rebalanced index from daily prices and rebalance weights in one
+    pass, without concatenating per-segment series.
+
+    Within each segment the index moves with the weighted sum of price
+    relatives to the segment's first day; each segment is scaled so it
+    starts where the previous one ended.
+
+    Parameters
+    ----------
+    prices : pd.DataFrame
+        Daily dates x tickers prices.
+    weights : pd.DataFrame
+        Rebalance dates x tickers weights, 0 (or NaN) outside the index,
+        e.g. from select_top_n.
+    base_value : float
+        Index level on the first day of the first segment.
+
+    Returns
+    -------
+    pd.Series
+        Daily index levels from the first rebalance onwards.
+    """
+    weights = weights.reindex(columns=prices.columns)
+    dates = prices.index.to_numpy()
+    px = prices.to_numpy(dtype=float)
+    w = np.nan_to_num(weights.to_numpy(dtype=float))
+
+    starts, ends = _segment_bounds(dates, weights.index.to_numpy())
+    # Skip segments with no trading days or no constituents yet
+    live = (starts < len(dates)) & (starts <= ends) & (w.sum(axis=1) > 0)
+    starts, ends, w = starts[live], ends[live], w[live]
+    if not len(starts):
+        return pd.Series(dtype=float)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Segment value at its start and end, relative to its start prices
+        base_px = px[starts]
+        start_val = np.nansum(w * (base_px / base_px), axis=1)
+        end_val = np.nansum(w * (px[ends] / base_px), axis=1)
+
+        # Level each segment starts from = cumulative product of prior segment returns
+        seg_return = end_val / start_val
+        levels = base_value * np.concatenate(([1.0], np.cumprod(seg_return[:-1])))
+
+        # Each day belongs to the latest segment that has started by then
+        days = np.arange(starts[0], len(dates))
+        owner = np.searchsorted(starts, days, side="right") - 1
+        covered = days <= ends[owner]
+        days, owner = days[covered], owner[covered]
+
+        daily = np.nansum(w[owner] * (px[days] / base_px[owner]), axis=1)
+        values = levels[owner] * daily / start_val[owner]
+
+    return pd.Series(values, index=prices.index[days])
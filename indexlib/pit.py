@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+
+class PointInTime:
+    """
+    Per-ticker reference data stored as change points.
+
+    Ticker k's history lives in dates[offsets[k]:offsets[k + 1]] and the
+    matching values; each value holds from its date until the next change.
+    Repeated values are dropped on construction, so storage is one entry
+    per actual change rather than per report. Queries are as-of: the last
+    known value on or before each date, and NaN before the first one (no
+    backward filling, so nothing leaks from the future).
+    """
+
+    def __init__(self, tickers, offsets: np.ndarray, dates: np.ndarray, values: np.ndarray):
+        self.tickers = pd.Index(tickers, name="ticker")
+        self.offsets = offsets
+        self.dates = dates
+        self.values = values
+
+    @classmethod
+    def from_long(cls, frame: pd.DataFrame, value_column: str, date_column: str = "date",
+                  ticker_column: str = "ticker") -> "PointInTime":
+        """
+        Build from a long table with one row per (date, ticker) report;
+        rows with a missing date or value are ignored.
+        """
+        long = frame[[ticker_column, date_column, value_column]].dropna()
+        long = long.sort_values([ticker_column, date_column], kind="stable")
+        ticker = long[ticker_column].astype(str).to_numpy()
+        dates = long[date_column].to_numpy(dtype="datetime64[ns]")
+        values = long[value_column].to_numpy(dtype=float)
+
+        # Keep the first row of each ticker and every row whose value changed
+        new_ticker = np.r_[True, ticker[1:] != ticker[:-1]]
+        changed = new_ticker | np.r_[True, values[1:] != values[:-1]]
+        ticker, dates, values = ticker[changed], dates[changed], values[changed]
+
+        starts = np.flatnonzero(np.r_[True, ticker[1:] != ticker[:-1]]) if len(ticker) else np.array([], int)
+        offsets = np.append(starts, len(ticker))
+        return cls(ticker[starts], offsets, dates, values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def history(self, ticker: str) -> pd.Series:
+        """
+        Change points of one ticker as a date-indexed Series.
+        """
+        k = self.tickers.get_loc(ticker)
+        lo, hi = self.offsets[k], self.offsets[k + 1]
+        return pd.Series(self.values[lo:hi], index=pd.DatetimeIndex(self.dates[lo:hi], name="date"))
+
+    def as_of(self, dates, tickers=None) -> pd.DataFrame:
+        """
+        dates x tickers matrix of the value in force on each date.
+
+        Parameters
+        ----------
+        dates : array-like of dates
+        tickers : iterable of str, optional
+            Columns of the result (default: every ticker with data);
+            tickers without data come back all-NaN.
+        """
+        dates = pd.DatetimeIndex(dates)
+        columns = self.tickers if tickers is None else pd.Index(tickers, name="ticker")
+        query = dates.to_numpy(dtype="datetime64[ns]")
+        out = np.full((len(dates), len(columns)), np.nan)
+
+        for j, k in enumerate(self.tickers.get_indexer(columns)):
+            if k < 0:
+                continue
+            lo, hi = self.offsets[k], self.offsets[k + 1]
+            pos = np.searchsorted(self.dates[lo:hi], query, side="right") - 1
+            known = pos >= 0
+            out[known, j] = self.values[lo:hi][pos[known]]
+
+        return pd.DataFrame(out, index=dates, columns=columns)
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+
+def top_n_mask(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Boolean mask of the n largest finite values in every row of a
+    dates x tickers array, using argpartition instead of a per-row sort.
+    """
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    mask = np.zeros(values.shape, dtype=bool)
+    n_cols = values.shape[1]
+    if n <= 0 or n_cols == 0:
+        return mask
+    if n >= n_cols:
+        return finite
+
+    ranked = np.where(finite, values, -np.inf)
+    top = np.argpartition(-ranked, n - 1, axis=1)[:, :n]
+    np.put_along_axis(mask, top, True, axis=1)
+    # Rows with fewer than n finite values would otherwise pick up NaNs
+    return mask & finite
+
+
+def _buffered_mask(values: np.ndarray, n: int, buffer: int) -> np.ndarray:
+    """
+    Top-n selection where incumbents survive while they rank within n + buffer.
+    """
+    ranked = np.where(np.isfinite(values), values, -np.inf)
+    order = np.argsort(-ranked, axis=1, kind="stable")
+    mask = np.zeros(values.shape, dtype=bool)
+    members = np.zeros(values.shape[1], dtype=bool)
+
+    for i in range(values.shape[0]):
+        row_order = order[i][np.isfinite(values[i, order[i]])]
+        candidates = row_order[:n + buffer]
+        keep = candidates[members[candidates]][:n]
+        fill = row_order[~np.isin(row_order, keep)][:n - len(keep)]
+        members = np.zeros(values.shape[1], dtype=bool)
+        members[keep] = True
+        members[fill] = True
+        mask[i] = members
+    return mask
+
+
+def select_top_n(market_caps: pd.DataFrame, n: int, buffer: int = 0):
+    """
+    Pick the n largest stocks on every date and market-cap weight them.
+
+    Parameters
+    ----------
+    market_caps : pd.DataFrame
+        dates x tickers market capitalisation; NaN means not investable.
+    n : int
+        Number of constituents.
+    buffer : int
+        Incumbents stay in the index while they rank within n + buffer,
+        which damps turnover around the cut-off. 0 gives plain top-n.
+
+    Returns
+    -------
+    (weights, members) : (pd.DataFrame, pd.DataFrame)
+        Dense weights (0 outside the index, rows sum to 1) and the boolean
+        membership mask, both shaped like market_caps.
+    """
+    values = market_caps.to_numpy(dtype=float)
+    if buffer > 0:
+        mask = _buffered_mask(values, n, buffer)
+    else:
+        mask = top_n_mask(values, n)
+
+    selected = np.where(mask, values, 0.0)
+    totals = selected.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weights = np.where(totals > 0, selected / totals, 0.0)
+
+    weights = pd.DataFrame(weights, index=market_caps.index, columns=market_caps.columns)
+    members = pd.DataFrame(mask, index=market_caps.index, columns=market_caps.columns)
+    return weights, members
+
+
+def top_n_sum(market_caps: pd.DataFrame, n: int) -> pd.Series:
+    """
+    Sum of the n largest market caps on every date, i.e. the index market cap.
+    """
+    values = market_caps.to_numpy(dtype=float)
+    mask = top_n_mask(values, n)
+    return pd.Series(np.where(mask, values, 0.0).sum(axis=1), index=market_caps.index)
@@ -0,0 +1,120 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from typing import NamedTuple
+
+import pandas as pd
+
+from indexlib.datastore import load_outstanding_shares, load_price_matrix
+from indexlib.linking import chain_link
+from indexlib.selection import select_top_n
+
+REBALANCE_FREQS = ("monthly", "quarterly", "semiannual")
+WEIGHTINGS = ("cap", "float_cap")
+
+
+class Variant(NamedTuple):
+    n: int
+    freq: str
+    weighting: str
+
+    @property
+    def name(self) -> str:
+        return f"top{self.n}_{self.freq}_{self.weighting}"
+
+
+def load_inputs(price_path="price_data.csv", shares_path="outstanding_shares.csv"):
+    """
+    Load the pivoted price and outstanding-shares matrices once (through
+    the columnar store).
+
+    Returns
+    -------
+    (price_w, shares_w) : daily dates x tickers close prices and
+    report-date x tickers share counts.
+    """
+    price_w = load_price_matrix(price_path)
+    shares_w = load_outstanding_shares(shares_path)
+    return price_w, shares_w
+
+
+def rebalance_dates(index: pd.DatetimeIndex, freq: str) -> pd.DatetimeIndex:
+    """
+    Period-end rebalance dates covering index; freq is one of
+    REBALANCE_FREQS or any pandas resample alias.
+    """
+    marker = pd.Series(0, index=index)
+    if freq == "monthly":
+        return marker.resample("ME").last().index
+    quarters = marker.resample("QE").last().index
+    if freq == "quarterly":
+        return quarters
+    if freq == "semiannual":
+        return quarters[quarters.month.isin([6, 12])]
+    return marker.resample(freq).last().index
+
+
+def _as_of(frame: pd.DataFrame, dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Last known row of frame on or before each of dates.
+    """
+    return frame.reindex(frame.index.union(dates)).ffill().reindex(dates)
+
+
+def run_sweep(price_w, shares_w, float_factors=None, n_values=(10, 20, 30, 50),
+              freqs=("quarterly",), weightings=("cap",), base_value=1000.0,
+              max_workers=None) -> dict:
+    """
+    Compute a grid of index variants from one set of loaded matrices.
+
+    Rebalance prices, aligned shares and market caps are built once per
+    frequency/weighting and shared by every N; the per-variant selection
+    and chain-linking run in a thread pool.
+
+    Parameters
+    ----------
+    price_w : pd.DataFrame
+        Daily dates x tickers prices.
+    shares_w : pd.DataFrame
+        Dates x tickers shares outstanding (as of each report date).
+    float_factors : pd.DataFrame, optional
+        Dates x tickers free-float factors; required for 'float_cap'.
+    n_values, freqs, weightings : iterables
+        Grid to evaluate; see REBALANCE_FREQS and WEIGHTINGS.
+    base_value : float
+    max_workers : int, optional
+
+    Returns
+    -------
+    dict
+        Variant -> daily index pd.Series.
+    """
+    if "float_cap" in weightings and float_factors is None:
+        raise ValueError("float_cap weighting needs float_factors")
+
+    market_caps = {}
+    for freq in freqs:
+        rebal = rebalance_dates(price_w.index, freq)
+        rebal_price = price_w.reindex(rebal, method='ffill')
+        caps = _as_of(shares_w, rebal) * rebal_price
+        for weighting in weightings:
+            if weighting == "cap":
+                market_caps[freq, weighting] = caps
+            elif weighting == "float_cap":
+                market_caps[freq, weighting] = caps * _as_of(float_factors, rebal)
+            else:
+                raise ValueError(f"Unknown weighting {weighting!r}")
+
+    def build(variant):
+        weights, _ = select_top_n(market_caps[variant.freq, variant.weighting], variant.n)
+        return chain_link(price_w, weights, base_value)
+
+    variants = [Variant(n, f, w) for n, f, w in product(n_values, freqs, weightings)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(variants, executor.map(build, variants)))
+
+
+def sweep_frame(results: dict) -> pd.DataFrame:
+    """
+    One column per variant, named like 'top20_quarterly_cap'.
+    """
+    return pd.DataFrame({variant.name: series for variant, series in results.items()})
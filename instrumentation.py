@@ -0,0 +1,144 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from logger_config import setup_logger
+
+METRICS_FILE = "run_metrics.json"
+PERCENTILES = (50, 90, 99)
+
+
+class StageMetrics:
+    """
+    Wall-clock timings for named stages (fetch, parse, pivot, select,
+    adjust, link ...), aggregated per stage.
+
+    Time a block with ``with metrics.stage("pivot"):`` or a function with
+    ``@metrics.timed("parse")``; both work from any thread, and timed also
+    wraps coroutines. At the end of a run, report() logs a summary table
+    and writes the same numbers as JSON.
+
+    Every finished stage is logged at DEBUG with %-style arguments, so
+    nothing is formatted unless DEBUG is actually enabled.
+    """
+
+    def __init__(self, logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger("instrumentation")
+        self.started = datetime.now()
+        self._durations = {}
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, failed: bool = False):
+        with self._lock:
+            self._durations.setdefault(name, []).append(seconds)
+            if failed:
+                self._failures[name] = self._failures.get(name, 0) + 1
+        self.logger.debug("stage %s took %.4fs%s", name, seconds, " (failed)" if failed else "")
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.record(name, time.perf_counter() - start, failed)
+
+    def timed(self, name: str = None):
+        """
+        Decorator timing every call of a function (or coroutine function)
+        as stage name, defaulting to the function's name.
+        """
+        def decorate(func):
+            label = name or func.__name__
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.stage(label):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._failures.clear()
+        self.started = datetime.now()
+
+    def summary(self) -> pd.DataFrame:
+        """
+        One row per stage: count, failures, total seconds, share of the
+        summed stage time, mean/percentile/max latency in milliseconds.
+        """
+        with self._lock:
+            durations = {name: np.array(values) for name, values in self._durations.items()}
+            failures = dict(self._failures)
+        rows = {}
+        for name, values in durations.items():
+            row = {"count": len(values), "failed": failures.get(name, 0), "total_s": values.sum(),
+                   "mean_ms": values.mean() * 1000}
+            for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                row[f"p{p}_ms"] = value * 1000
+            row["max_ms"] = values.max() * 1000
+            rows[name] = row
+        table = pd.DataFrame.from_dict(rows, orient="index")
+        if not table.empty:
+            table.insert(3, "share", table["total_s"] / table["total_s"].sum())
+            table = table.sort_values("total_s", ascending=False)
+        return table
+
+    def to_dict(self) -> dict:
+        finished = datetime.now()
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "finished": finished.isoformat(timespec="seconds"),
+            "wall_s": (finished - self.started).total_seconds(),
+            "stages": self.summary().to_dict(orient="index")
+        }
+
+    def report(self, path: str = METRICS_FILE) -> pd.DataFrame:
+        """
+        Log the summary table at INFO and write the metrics JSON to path
+        (skipped when path is None).
+        """
+        table = self.summary()
+        if table.empty:
+            self.logger.info("no stages were timed")
+        else:
+            self.logger.info("stage timings:\n%s", table.to_string(float_format="{:.3f}".format))
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=2, default=float)
+            self.logger.info("metrics written to %s", path)
+        return table
+
+
+def instrumented_logger(name="logs", log_file="log_data.log", level=logging.DEBUG, **options):
+    """
+    setup_logger (options are passed through, e.g. use_queue) plus a
+    StageMetrics reporting through the same logger.
+    """
+    logger = setup_logger(name, log_file, level, **options)
+    return logger, StageMetrics(logger)
+
+
+# Process-wide default, for library code that has no run-specific metrics
+METRICS = StageMetrics()
+stage = METRICS.stage
+timed = METRICS.timed
@@ -1,6 +1,89 @@
+import atexit
+import gzip
+import itertools
 import logging
+import os
+import queue
+import shutil
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-def setup_logger(name="logs", log_file="log_data.log", level=logging.DEBUG):
+_listeners = []
+
+
+class SampleFilter(logging.Filter):
+    """
+    Thin out high-volume messages (one line per URL and the like).
+
+    Records are grouped by their unformatted message template, so
+    'Processed %d/%d URLs' is one stream however many URLs there are.
+    The first `first` records of every template pass, then one in
+    `every`. Records above max_level (warnings and errors by default)
+    always pass. dropped counts what was suppressed per template.
+    """
+
+    def __init__(self, first: int = 20, every: int = 100, max_level: int = logging.INFO):
+        super().__init__()
+        self.first = first
+        self.every = max(1, every)
+        self.max_level = max_level
+        self._seen = defaultdict(itertools.count)
+        self.dropped = defaultdict(int)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        n = next(self._seen[record.msg])
+        if n < self.first or (n - self.first) % self.every == 0:
+            return True
+        self.dropped[record.msg] += 1
+        return False
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _file_handler(log_file, max_bytes, backup_count, compress):
+    if not max_bytes:
+        return logging.FileHandler(log_file)
+    handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+    if compress:
+        handler.namer = lambda name: f"{name}.gz"
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def _stop_listener(listener, logger, sampler):
+    # Drain the queue first, then say what sampling left out
+    listener.stop()
+    if sampler is not None and sampler.dropped:
+        for handler in listener.handlers:
+            for msg, count in sampler.dropped.items():
+                handler.handle(logger.makeRecord(
+                    logger.name, logging.INFO, __file__, 0,
+                    "sampled out %d more %r messages", (count, msg), None
+                ))
+            handler.flush()
+
+
+def setup_logger(name="logs", log_file="log_data.log", level=logging.DEBUG, use_queue=False,
+                 max_bytes=0, backup_count=5, compress=False, sample=None):
+    """
+    File + console logger.
+
+    With use_queue the logger only gets a QueueHandler: callers (worker
+    threads included) put records on an in-memory queue and a single
+    QueueListener thread writes them out, so file and console I/O never
+    hold a lock in the callers. The listener is stopped, and the queue
+    drained, by stop_logging() or at interpreter exit.
+
+    max_bytes > 0 rotates the file at that size keeping backup_count old
+    files (gzip-compressed with compress). sample is a SampleFilter (or
+    True for the defaults) applied before records are queued/written.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
@@ -11,15 +94,41 @@ def setup_logger(name="logs", log_file="log_data.log", level=logging.DEBUG):
         )
 
         # File handler
-        file_handler = logging.FileHandler(log_file)
+        file_handler = _file_handler(log_file, max_bytes, backup_count, compress)
         file_handler.setFormatter(formatter)
 
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
 
-        # Add both
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        if sample is True:
+            sample = SampleFilter()
+
+        if use_queue:
+            records = queue.SimpleQueue()
+            queue_handler = QueueHandler(records)
+            if sample is not None:
+                queue_handler.addFilter(sample)
+            listener = QueueListener(records, file_handler, console_handler, respect_handler_level=True)
+            listener.start()
+            _listeners.append((listener, logger, sample))
+            logger.addHandler(queue_handler)
+        else:
+            if sample is not None:
+                logger.addFilter(sample)
+            # Add both
+            logger.addHandler(file_handler)
+            logger.addHandler(console_handler)
 
     return logger
+
+
+def stop_logging():
+    """
+    Drain and stop every queue listener started by setup_logger.
+    """
+    while _listeners:
+        _stop_listener(*_listeners.pop())
+
+
+atexit.register(stop_logging)
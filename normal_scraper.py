@@ -1,42 +1,82 @@
-from xbrl_parese_02 import parse_xbrl_shareholding, extract_summary_values
+from xbrl_parse import PARSER_VERSION, iterparse_shareholding, shareholding_record
+from filing_cache import FilingCache
+from filing_manifest import FILING_ORDER, FilingManifest, read_link_files, upsert_csv
+from xbrl_fetch import fetch_all
 import pandas as pd
-from logger_config import setup_logger
-import glob
+from instrumentation import instrumented_logger
+from run_ledger import RETRY_CONFIG, RunLedger
 
-logger = setup_logger('logs','log_files')
+# Queued, size-rotated log; per-URL lines are sampled after the first few
+logger, metrics = instrumented_logger('logs', 'log_files', use_queue=True, max_bytes=5 * 1024 ** 2,
+                                      compress=True, sample=True)
 
-
-files = glob.glob('link2/*.csv')
-logger.debug(f'total files {len(files)}')
-logger.debug(f'{files[:5]}')
+# flags
+OFFLINE = False      # parse only what is already in the filing cache
+INCREMENTAL = False  # True: only fetch filings missing from the manifest and upsert them
+RESUME = True        # extend the run ledger instead of starting it over
+RETRY_PASS = True    # re-fetch transient failures with RETRY_CONFIG after the main pass
+RETRY_PARSE_ERRORS = False  # re-admit every earlier parse error (bumping PARSER_VERSION does it too)
+cache = FilingCache('xbrl_cache')
+manifest = FilingManifest('filing_manifest_link2.csv')
+ledger = RunLedger('run_ledger_link2.jsonl', resume=RESUME, parser_version=PARSER_VERSION,
+                   retry_parse_errors=RETRY_PARSE_ERRORS)
 
 
+links = read_link_files('link2/*.csv')
+logger.debug('total filings %d', len(links))
+if INCREMENTAL:
+    links = manifest.pending(links)
+    logger.info('%d new or revised filings since last run', len(links))
 
 
 collected_data = []
-failed_url = []
-for _,file in enumerate(files):  
-    logger.info(f'file name - {file}')
-    symbol = file.split('-')[4]
-    logger.info(f'symbol is {symbol}')
-    excel = pd.read_csv(file)
-    logger.debug(f'excel df.head {excel.head()}')
-    urls = excel['ACTION']
-    logger.debug(f'total urls - {urls.shape}')
-    for _,url in enumerate(urls):
-        try:
-            logger.info(f'fetching data for url {url}')
-            data = parse_xbrl_shareholding(url)
-            report_date = data['ReportDate'].iloc[0]
-            summary = extract_summary_values(data)
-            summary['ticker'] = symbol
-            summary['report_date'] = report_date
-            collected_data.append(summary)
-            logger.info(f'adding dict to list - {summary}')
-        except Exception as e:
-            logger.debug(f'failed to extract this url {url}')
-            failed_url.append(url)
-logger.info('all data collected')
+url_symbols = dict(zip(links['url'], links['symbol']))
+# Revision/submission dates travel with each summary so the save keeps the
+# latest revision of a filing, not whichever response finished last
+url_dates = links.drop_duplicates('url').set_index('url')[FILING_ORDER].to_dict('index')
+
+
+def parse_content(url, content):
+    # "shp" marker accepts both NSE & BSE taxonomies
+    record = shareholding_record(iterparse_shareholding(content, ns_marker="shp"))
+    summary = record.summary()
+    summary['ticker'] = url_symbols[url]
+    summary['report_date'] = record.report_date
+    summary.update(url_dates[url])
+    return summary
+
+
+def collect(i, total, result):
+    ledger.record(result)
+    if result.error is None:
+        collected_data.append(result.value)
+        logger.info('adding dict to list - %s', result.value)
+    else:
+        logger.debug('failed to extract this url %s', result.url)
+
+
+# URLs that already failed for good in an earlier (interrupted) run are skipped
+urls = list(ledger.pending(url_symbols))
+logger.info('fetching data for %d urls', len(urls))
+fetch_all(urls, handle=parse_content, cache=cache, offline=OFFLINE, metrics=metrics,
+          on_result=collect, keep_results=False)
+
+# Retry pass: transient failures only, fewer connections and longer backoff
+retry = [entry['url'] for entry in ledger.failures() if entry['url'] in url_symbols]
+if RETRY_PASS and retry and not OFFLINE:
+    logger.info('retrying %d failed urls', len(retry))
+    fetch_all(retry, handle=parse_content, config=RETRY_CONFIG, cache=cache, metrics=metrics,
+              on_result=collect, keep_results=False)
+ledger.close()
+failed_url = ledger.failed_urls()
+logger.info('all data collected, ledger: %s', dict(ledger.counts()))
 
 final_df = pd.DataFrame(collected_data)
-final_df.to_csv('shareholiding_pattern_02.csv')
\ No newline at end of file
+with metrics.stage('save'):
+    if INCREMENTAL:
+        upsert_csv('shareholiding_pattern_02.csv', final_df, keys=['ticker', 'report_date'], index=True,
+                   order=FILING_ORDER)
+        manifest.record(links[~links['url'].isin(failed_url)])
+    else:
+        final_df.to_csv('shareholiding_pattern_02.csv')
+metrics.report('normal_scraper_metrics.json')
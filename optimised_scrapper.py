@@ -1,61 +1,96 @@
-import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import glob
-from xbrl_parse import parse_xbrl_shareholding
-from logger_config import setup_logger
-
-logger = setup_logger("ShareholdingLogger")
-
-# --- Load all URLs efficiently ---
-files = glob.glob('links/*.csv')
-logger.info(f"Found {len(files)} CSV files")
-
-# Merge all CSVs
-dfs = [pd.read_csv(f) for f in files]
-all_urls = pd.concat(dfs, ignore_index=True)
-logger.info(f"Total URLs to process: {len(all_urls)}")
-all_urls = all_urls[~(all_urls['ACTION'].str.contains('/null'))]
-# --- Prepare containers ---
-collected_data = []
-failed_url = []
-
-# --- Define processing function ---
-def process_url(row):
-    url = row['ACTION']
-    symbol = row.get('COMPANY', 'UNKNOWN')
-    try:
-        data = parse_xbrl_shareholding(url)
-        data = data[data['category'] == 'ShareholdingPattern'][['ReportDate','NumberOfShares']]
-        row_data = data.iloc[0]
-        result = {
-            'symbol': symbol,
-            'report_date': row_data['ReportDate'],
-            'total_shares': row_data['NumberOfShares']
-        }
-        return result
-    except Exception as e:
-        logger.debug(f"Failed: {url} | {e}")
-        return None
-
-# --- Run concurrent threads ---
-MAX_WORKERS = 10  # adjust based on system + network
-logger.info(f"Starting parallel fetch with {MAX_WORKERS} threads...")
-
-with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-    futures = [executor.submit(process_url, row) for _, row in all_urls.iterrows()]
-
-    for i, future in enumerate(as_completed(futures), 1):
-        result = future.result()
-        if result:
-            collected_data.append(result)
+import os
+from dataclasses import replace
+from xbrl_parse import PARSER_VERSION, parse_filing
+from filing_cache import FilingCache
+from filing_manifest import FILING_ORDER, BatchWriter, FilingManifest, LinkJob, iter_link_jobs
+from xbrl_fetch import FetchConfig, fetch_all
+from instrumentation import instrumented_logger
+from run_ledger import PARSE_ERROR, RETRY_CONFIG, RunLedger
+
+# Queued, size-rotated log; per-URL lines are sampled after the first few
+logger, metrics = instrumented_logger("ShareholdingLogger", use_queue=True, max_bytes=5 * 1024 ** 2,
+                                      compress=True, sample=True)
+
+# --- Flags ---
+OFFLINE = False      # parse only what is already in the filing cache
+INCREMENTAL = False  # True: only fetch filings missing from the manifest and upsert them
+PARSE_PROCESSES = os.cpu_count() or 1
+BATCH_SIZE = 200     # rows per append to final_df.csv (and manifest checkpoint)
+RESUME = True        # extend the run ledger instead of starting it over
+RETRY_PASS = True    # re-fetch transient failures with RETRY_CONFIG after the main pass
+RETRY_PARSE_ERRORS = False  # re-admit every earlier parse error (bumping PARSER_VERSION does it too)
+
+
+def main():
+    cache = FilingCache('xbrl_cache')
+    manifest = FilingManifest('filing_manifest_links.csv')
+    ledger = RunLedger('run_ledger_links.jsonl', resume=RESUME, parser_version=PARSER_VERSION,
+                       retry_parse_errors=RETRY_PARSE_ERRORS)
+
+    # --- Stream filings from the link files (deduplicated, already-ingested ones skipped) ---
+    jobs = iter_link_jobs('links/*.csv', skip=manifest if INCREMENTAL else None)
+    jobs = ledger.pending(jobs)
+    logger.info("%d filings already ingested, %d URLs in the run ledger", len(manifest), len(ledger))
+
+    # --- Results go to disk in batches as they complete; the filing dates
+    # let close() keep the latest revision rather than the last to finish ---
+    writer = BatchWriter('final_df.csv',
+                         columns=['symbol', 'report_date', 'total_shares', *FILING_ORDER],
+                         keys=['symbol', 'report_date'], order=FILING_ORDER, batch_size=BATCH_SIZE,
+                         manifest=manifest if INCREMENTAL else None, fresh=not INCREMENTAL)
+    failed = 0
+
+    # --- Collect parsed records (parsing itself runs in worker processes) ---
+    def on_result(i, total, result):
+        nonlocal failed
+        record = result.value
+        if result.error is None and record.total_shares is not None:
+            writer.add({
+                'symbol': result.job.company or 'UNKNOWN',
+                'report_date': record.report_date,
+                'total_shares': record.total_shares,
+                'revision_date': result.job.revision_date,
+                'submission_date': result.job.submission_date
+            }, result.job)
+            ledger.record(result)
+        elif result.error is None:
+            logger.debug("Failed: %s | no ShareholdingPattern total in filing", result.url)
+            ledger.record(result, status=PARSE_ERROR, error="no ShareholdingPattern total in filing")
+            failed += 1
         else:
-            failed_url.append(i)
+            logger.debug("Failed: %s | %s", result.url, result.error)
+            ledger.record(result)
+            failed += 1
         if i % 10 == 0:
-            logger.info(f"Processed {i}/{len(futures)} URLs")
+            logger.info("Processed %d URLs (%d failed attempts)", i, failed)
+
+    # --- Run async fetch (I/O) feeding a process pool (CPU) ---
+    config = FetchConfig(per_host_concurrency=10,  # adjust based on system + network
+                         parse_processes=PARSE_PROCESSES)
+    logger.info("Starting async fetch with %d connections per host, %d parse processes...",
+                config.per_host_concurrency, config.parse_processes)
+
+    fetch_all(jobs, handle=parse_filing, config=config, on_result=on_result,
+              cache=cache, offline=OFFLINE, metrics=metrics, keep_results=False)
+    ledger.checkpoint()
+
+    # --- Retry pass: only transient failures, fewer connections and longer backoff ---
+    retry = [LinkJob(**entry["job"]) for entry in ledger.failures() if entry["job"]]
+    if RETRY_PASS and retry and not OFFLINE:
+        logger.info("Retrying %d failed filings with %d connections per host", len(retry),
+                    RETRY_CONFIG.per_host_concurrency)
+        fetch_all(retry, handle=parse_filing, config=replace(RETRY_CONFIG, parse_processes=PARSE_PROCESSES),
+                  on_result=on_result, cache=cache, metrics=metrics, keep_results=False)
+    ledger.close()
+
+    logger.info("✅ All data fetched. Ledger: %s", dict(ledger.counts()))
+
+    # --- Final flush, then drop rows superseded by revised filings ---
+    with metrics.stage("save"):
+        final_df = writer.close()
+    logger.info("Wrote %d new rows, final_df.csv has %d rows", writer.written, len(final_df))
+    metrics.report("optimised_scrapper_metrics.json")
 
-logger.info("✅ All data fetched.")
 
-# --- Save results ---
-final_df = pd.DataFrame(collected_data)
-final_df.to_csv('final_df.csv', index=False)
-logger.info(f"Saved {len(final_df)} rows to final_df.csv")
+if __name__ == "__main__":
+    main()
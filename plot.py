@@ -1,58 +1,94 @@
+import json
+
+import numpy as np
 import pandas as pd
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 
+# label -> (index series csv, weights per quarter csv)
+VARIANTS = {
+    "Index 20": ("index_series_20.csv", "weights_per_quater_20.csv"),
+    "Index 50": ("index_series_50.csv", "weights_per_quater_50.csv"),
+}
+MAX_LINE_POINTS = 1500
+
+
 # -------------------------------------------------------------------
 # LOAD DATA
 # -------------------------------------------------------------------
-df20 = pd.read_csv('index_series_20.csv', names=['date','index'], parse_dates=['date'], skiprows=1)
-df50 = pd.read_csv('index_series_50.csv', names=['date','index'], parse_dates=['date'], skiprows=1)
-
-w20 = pd.read_csv('weights_per_quater_20.csv')
-w50 = pd.read_csv('weights_per_quater_50.csv')
-
-quarters = [c for c in w20.columns if c != "Unnamed: 0"]
+def load_series(path):
+    return pd.read_csv(path, names=['date', 'index'], parse_dates=['date'], skiprows=1)
+
+
+def weights_long(paths: dict) -> pd.DataFrame:
+    """
+    Every variant's quarter x ticker weights as one long table
+    (quarter, ticker, variant, weight), dropping non-members.
+    """
+    frames = []
+    for label, path in paths.items():
+        wide = pd.read_csv(path, index_col=0)
+        wide.index.name = 'ticker'
+        wide.columns.name = 'quarter'
+        long = wide.stack().rename('weight').reset_index()
+        frames.append(long.assign(variant=label))
+    long = pd.concat(frames, ignore_index=True)
+    return long[long['weight'] > 0]
+
+
+def weights_tables(long: pd.DataFrame, variants) -> dict:
+    """
+    quarter -> (tickers, [weights in % per variant]) for all quarters from
+    a single pivot; 0 where a ticker is not in that variant.
+    """
+    wide = long.pivot_table(index=['quarter', 'ticker'], columns='variant', values='weight',
+                            aggfunc='sum', fill_value=0.0)
+    wide = (wide.reindex(columns=list(variants), fill_value=0.0) * 100).round(2).sort_index()
+    tables = {}
+    for quarter, rows in wide.groupby(level='quarter', sort=True):
+        tickers = rows.index.get_level_values('ticker').tolist()
+        tables[quarter] = (tickers, [rows[v].tolist() for v in variants])
+    return tables
+
+
+def format_weights(values):
+    return [f"{v:.2f}%" if v else "" for v in values]
+
+
+# -------------------------------------------------------------------
+# LINE DOWNSAMPLING
+# -------------------------------------------------------------------
+def downsample(df: pd.DataFrame, max_points: int = MAX_LINE_POINTS) -> pd.DataFrame:
+    """
+    Keep the low and high of every bucket (plus the last point) so the
+    overview chart stays under ~max_points without flattening drawdowns.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    bucket = int(np.ceil(2 * n / max_points))
+    values = df['index'].to_numpy(dtype=float)
+    padded = np.pad(values, (0, -n % bucket), constant_values=np.nan).reshape(-1, bucket)
+    offsets = np.arange(padded.shape[0]) * bucket
+    keep = np.concatenate([offsets + np.nanargmin(padded, axis=1),
+                           offsets + np.nanargmax(padded, axis=1), [0, n - 1]])
+    return df.iloc[np.unique(keep)]
+
+
+series = {label: load_series(s) for label, (s, _) in VARIANTS.items()}
+labels = list(VARIANTS)
+tables = weights_tables(weights_long({label: w for label, (_, w) in VARIANTS.items()}), labels)
+quarters = list(tables)
 
 # -------------------------------------------------------------------
 # TOTAL RETURN CALCULATION
 # -------------------------------------------------------------------
-tr20 = (df20['index'].iloc[-1] / df20['index'].iloc[0] - 1) * 100
-tr50 = (df50['index'].iloc[-1] / df50['index'].iloc[0] - 1) * 100
-
 total_return_table = pd.DataFrame({
-    "Index": ["Index 20", "Index 50"],
-    "Total Return": [f"{tr20:.2f}%", f"{tr50:.2f}%"]
+    "Index": labels,
+    "Total Return": [f"{(df['index'].iloc[-1] / df['index'].iloc[0] - 1) * 100:.2f}%"
+                     for df in series.values()]
 })
 
-# -------------------------------------------------------------------
-# WEIGHTS TABLE CREATION FUNCTION
-# -------------------------------------------------------------------
-def build_weights(q):
-    w20_q = w20[['Unnamed: 0', q]].rename(columns={'Unnamed: 0': 'Ticker', q: 'Weight 20'})
-    w50_q = w50[['Unnamed: 0', q]].rename(columns={'Unnamed: 0': 'Ticker', q: 'Weight 50'})
-    
-    merged = pd.merge(w20_q, w50_q, on='Ticker', how='outer').sort_values('Ticker')
-
-    # Replace NaN with 0 before percentage conversion
-    merged[['Weight 20', 'Weight 50']] = merged[['Weight 20', 'Weight 50']].fillna(0)
-
-    # Convert to %
-    for col in ["Weight 20", "Weight 50"]:
-        merged[col] = merged[col].astype(float) * 100
-        merged[col] = merged[col].round(2).astype(str) + "%"
-
-    # Replace 0% with blank
-    merged.replace({"0.0%": "", "0%": ""}, inplace=True)
-
-    # Convert to list-of-strings for Plotly
-    for col in merged.columns:
-        merged[col] = merged[col].astype(str).tolist()
-
-    return merged
-
-default_q = quarters[-1]
-weights = build_weights(default_q)
-
 # -------------------------------------------------------------------
 # FIGURE SETUP (3 ROWS)
 # -------------------------------------------------------------------
@@ -69,20 +105,14 @@ fig = make_subplots(
 )
 
 # -------------------------------------------------------------------
-# ROW 1 — LINE CHART
+# ROW 1 — LINE CHART (downsampled)
 # -------------------------------------------------------------------
-fig.add_trace(go.Scatter(
-    x=df20['date'], y=df20['index'], mode='lines', name='Index 20'),
-    row=1, col=1
-)
-
-fig.add_trace(go.Scatter(
-    x=df50['date'], y=df50['index'], mode='lines', name='Index 50'),
-    row=1, col=1
-)
+for label, df in series.items():
+    line = downsample(df)
+    fig.add_trace(go.Scatter(x=line['date'], y=line['index'], mode='lines', name=label), row=1, col=1)
 
 # -------------------------------------------------------------------
-# ROW 2 — TOTAL RETURN TABLE (TRACE INDEX 2)
+# ROW 2 — TOTAL RETURN TABLE
 # -------------------------------------------------------------------
 fig.add_trace(
     go.Table(
@@ -93,59 +123,52 @@ fig.add_trace(
 )
 
 # -------------------------------------------------------------------
-# ROW 3 — WEIGHTS TABLE (TRACE INDEX 3)
+# ROW 3 — WEIGHTS TABLE (latest quarter; others restyled from JSON)
 # -------------------------------------------------------------------
+header = ["Ticker"] + [f"Weight {label.split()[-1]}" for label in labels]
+default_q = quarters[-1]
+tickers, weights = tables[default_q]
 fig.add_trace(
     go.Table(
-        header=dict(values=list(weights.columns), fill_color='lightgrey', align='left'),
-        cells=dict(values=[weights[col] for col in weights.columns], align='left'),
-        columnwidth=[120, 60, 60]
+        header=dict(values=header, fill_color='lightgrey', align='left'),
+        cells=dict(values=[tickers] + [format_weights(w) for w in weights], align='left'),
+        columnwidth=[120] + [60] * len(labels)
     ),
     row=3, col=1
 )
 
 # Weight table trace index (0-based)
-table_trace_index = 3
-
-# -------------------------------------------------------------------
-# DROPDOWN BUTTONS
-# -------------------------------------------------------------------
-dropdown_buttons = []
-
-for q in quarters:
-    new_weights = build_weights(q)
-    header_vals = list(new_weights.columns)
-    cell_vals = [new_weights[col] for col in new_weights.columns]
-
-    dropdown_buttons.append(
-        dict(
-            label=q,
-            method="restyle",
-            args=[
-                {
-                    "header.values": [header_vals],
-                    "cells.values": [cell_vals]
-                },
-                [table_trace_index]
-            ]
-        )
-    )
+table_trace_index = len(series) + 1
 
 fig.update_layout(
     height=1000,
-    title="Index 20 vs Index 50 + Total Returns + Weights by Quarter",
-    showlegend=True,
-    updatemenus=[
-        dict(
-            buttons=dropdown_buttons,
-            direction="down",
-            x=1.05,
-            y=0.72,
-            xanchor="left",
-            yanchor="middle"
-        )
-    ]
+    title=" vs ".join(labels) + " + Total Returns + Weights by Quarter",
+    showlegend=True
 )
 
+# -------------------------------------------------------------------
+# QUARTER SELECTOR
+# -------------------------------------------------------------------
+# All quarters go into the page once as compact JSON (numbers, not
+# formatted strings); a <select> restyles the weights table on change.
+weights_json = json.dumps({q: [t, *w] for q, (t, w) in tables.items()}, separators=(",", ":"))
+quarter_selector = """
+var gd = document.getElementById('{plot_id}');
+var tables = %s;
+var select = document.createElement('select');
+select.style.margin = '8px';
+Object.keys(tables).forEach(function (q) {
+    select.add(new Option(q, q, false, q === %s));
+});
+select.onchange = function () {
+    var t = tables[select.value];
+    var cells = [t[0]].concat(t.slice(1).map(function (col) {
+        return col.map(function (v) { return v ? v.toFixed(2) + '%%' : ''; });
+    }));
+    Plotly.restyle(gd, {'cells.values': [cells]}, [%d]);
+};
+gd.parentNode.insertBefore(select, gd);
+""" % (weights_json, json.dumps(default_q), table_trace_index)
+
 fig.show()
-fig.write_html("index_comparison.html")
+fig.write_html("index_comparison.html", post_script=quarter_selector)
@@ -0,0 +1,222 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Protocol
+
+import pandas as pd
+
+PRICE_COLUMNS = ["date", "ticker", "close"]
+
+
+class PriceSource(Protocol):
+    def history(self, tickers: list, start, end=None) -> pd.DataFrame:
+        """
+        Daily closes for tickers from start to end (inclusive) as a long
+        date/ticker/close frame.
+        """
+
+
+def _empty_prices() -> pd.DataFrame:
+    return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"),
+                         "ticker": pd.Series(dtype=str),
+                         "close": pd.Series(dtype=float)})
+
+
+class YFinanceSource:
+    """
+    Yahoo Finance closes, one multi-ticker yf.download call per batch.
+
+    Tickers are plain NSE symbols; suffix is appended for Yahoo and
+    stripped again from the result.
+    """
+
+    def __init__(self, suffix: str = ".NS", auto_adjust: bool = True):
+        import yfinance
+        self._yf = yfinance
+        self.suffix = suffix
+        self.auto_adjust = auto_adjust
+
+    def history(self, tickers, start, end=None) -> pd.DataFrame:
+        symbols = [f"{t}{self.suffix}" for t in tickers]
+        # yfinance treats end as exclusive
+        end = pd.Timestamp(end) + pd.Timedelta(days=1) if end is not None else None
+        raw = self._yf.download(symbols, start=start, end=end, auto_adjust=self.auto_adjust,
+                                group_by="ticker", threads=False, progress=False)
+        if raw is None or raw.empty:
+            return _empty_prices()
+
+        if isinstance(raw.columns, pd.MultiIndex):
+            close = raw.xs("Close", axis=1, level=1)
+        else:
+            close = raw[["Close"]].set_axis(symbols[:1], axis=1)
+        close.columns = [c[:-len(self.suffix)] if self.suffix and c.endswith(self.suffix) else c
+                         for c in close.columns]
+        close.index.name = "date"
+        close.columns.name = "ticker"
+        # pandas 3 keeps NaN rows in stack(): days before a ticker listed or
+        # when it did not trade must not reach the cache
+        long = close.stack().dropna().rename("close").reset_index()
+        return long[PRICE_COLUMNS]
+
+
+class FakeSource:
+    """
+    In-memory source over a long date/ticker/close frame, for tests and
+    offline runs. calls records every (tickers, start, end) request.
+    """
+
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices.assign(date=pd.to_datetime(prices["date"]))
+        self.calls = []
+
+    def history(self, tickers, start, end=None) -> pd.DataFrame:
+        self.calls.append((tuple(tickers), pd.Timestamp(start), end))
+        rows = self.prices["ticker"].isin(tickers) & (self.prices["date"] >= pd.Timestamp(start))
+        if end is not None:
+            rows &= self.prices["date"] <= pd.Timestamp(end)
+        return self.prices.loc[rows, PRICE_COLUMNS].reset_index(drop=True)
+
+
+class PriceCache:
+    """
+    One CSV of date/close per ticker under root.
+
+    Layout::
+
+        <root>/INFY.csv
+        <root>/M&M.csv
+    """
+
+    def __init__(self, root: str = "price_cache"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker}.csv")
+
+    def load(self, ticker: str) -> pd.DataFrame:
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"),
+                                 "close": pd.Series(dtype=float)})
+        return pd.read_csv(path, parse_dates=["date"])
+
+    def span(self, ticker: str):
+        """
+        (first, last) cached date, or None when nothing is cached.
+        """
+        dates = self.load(ticker)["date"]
+        return (dates.min(), dates.max()) if len(dates) else None
+
+    def merge(self, ticker: str, rows: pd.DataFrame, replace: bool = False) -> pd.DataFrame:
+        """
+        Add date/close rows to the ticker's file, newer rows winning on
+        overlapping dates; with replace the file is rewritten from rows.
+        """
+        rows = rows[["date", "close"]]
+        if not replace:
+            rows = pd.concat([self.load(ticker), rows], ignore_index=True)
+        rows = rows.drop_duplicates(subset="date", keep="last").sort_values("date")
+        tmp = f"{self._path(ticker)}.tmp"
+        rows.to_csv(tmp, index=False)
+        os.replace(tmp, self._path(ticker))
+        return rows
+
+
+def _batches(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def refresh_prices(tickers, start, end=None, source: PriceSource = None, cache: PriceCache = None,
+                   batch_size: int = 20, workers: int = 4, tolerance: float = 1e-4):
+    """
+    Bring the per-ticker cache up to date and return the requested prices.
+
+    Only the missing range is requested for each ticker: everything from
+    start for new tickers, otherwise from the last cached day (kept as an
+    overlap check) onwards. Tickers that need the same range are grouped
+    into multi-ticker batches of batch_size, and batches run on workers
+    threads. Adjusted closes move when a split or dividend happens, so if
+    the overlap day no longer matches the cache within tolerance the
+    ticker's full history is fetched again.
+
+    Parameters
+    ----------
+    tickers : iterable of str
+        Plain NSE symbols.
+    start, end : date-like
+        Inclusive range to return; end defaults to today.
+    source : PriceSource, optional
+        Defaults to YFinanceSource().
+    cache : PriceCache, optional
+        Defaults to PriceCache('price_cache').
+    batch_size, workers : int
+    tolerance : float
+        Relative difference on the overlap day that triggers a re-download.
+
+    Returns
+    -------
+    (prices, failed) : long date/ticker/close frame for [start, end] and
+    a dict ticker -> exception for batches that could not be fetched.
+    """
+    source = source or YFinanceSource()
+    cache = cache or PriceCache()
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+    tickers = list(dict.fromkeys(tickers))
+
+    # Group tickers by the first date each one needs
+    needs = {}
+    for ticker in tickers:
+        span = cache.span(ticker)
+        if span is None or span[0] > start:
+            needs.setdefault(start, []).append(ticker)
+        elif span[1] < end:
+            needs.setdefault(span[1], []).append(ticker)
+
+    failed = {}
+    stale = []
+
+    def fetch(batch, batch_start):
+        return batch, batch_start, source.history(batch, batch_start, end)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(fetch, batch, batch_start): batch
+            for batch_start, group in needs.items()
+            for batch in _batches(group, batch_size)
+        }
+        for future in as_completed(futures):
+            try:
+                batch, batch_start, rows = future.result()
+            except Exception as e:
+                failed.update(dict.fromkeys(futures[future], e))
+                continue
+            full = batch_start == start
+            for ticker, ticker_rows in rows.groupby("ticker"):
+                if not full:
+                    cached = cache.load(ticker).set_index("date")["close"]
+                    overlap = ticker_rows.set_index("date")["close"].reindex(cached.index).dropna()
+                    drift = (overlap / cached.reindex(overlap.index) - 1).abs()
+                    if (drift > tolerance).any():
+                        stale.append(ticker)
+                        continue
+                cache.merge(ticker, ticker_rows)
+
+    # Re-adjusted history: replace those tickers' files wholesale
+    for batch in _batches(stale, batch_size):
+        try:
+            rows = source.history(batch, start, end)
+        except Exception as e:
+            failed.update(dict.fromkeys(batch, e))
+            continue
+        for ticker, ticker_rows in rows.groupby("ticker"):
+            cache.merge(ticker, ticker_rows, replace=True)
+
+    frames = []
+    for ticker in tickers:
+        rows = cache.load(ticker)
+        rows = rows[(rows["date"] >= start) & (rows["date"] <= end)]
+        frames.append(rows.assign(ticker=ticker)[PRICE_COLUMNS])
+    prices = pd.concat(frames, ignore_index=True) if frames else _empty_prices()
+    return prices, failed
@@ -3,6 +3,8 @@ import numpy as np
 import yfinance as yf
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
+from indexlib import IndexEngine
+from indexlib.datastore import load_outstanding_shares, load_price_matrix
 
 NO_STOCKS = 20
 BASE_INDEX_VALUE = 1000.0     # initial investment
@@ -14,110 +16,46 @@ make_csv = False
 # -----------------------------
 # 1) Load & prepare price data
 # -----------------------------
-price = pd.read_csv('price_data.csv', parse_dates=['date'])
-price.drop_duplicates(subset=['date', 'ticker'], inplace=True)
-price_w = price.pivot(index='date', columns='ticker', values='close')
-
-# Rebalance dates from price data
-rebal_dates = price_w.resample(REBALANCE_FREQ).last().index
+price_w = load_price_matrix('price_data.csv')
 
 # -----------------------------
 # 2) Load outstanding shares
 # -----------------------------
-shareholding_pattern_w = pd.read_csv(
-    'outstanding_shares.csv',
-    parse_dates=['date'],
-    index_col='date'
-)
-
-# Align shareholding to quarter ends
-shareholding_q = shareholding_pattern_w.reindex(rebal_dates).ffill()
-
-# -----------------------------
-# 3) Quarterly prices
-# -----------------------------
-quaterly_price = price_w.reindex(rebal_dates, method='ffill')
+shareholding_pattern_w = load_outstanding_shares('outstanding_shares.csv')
 
 # -----------------------------
-# 4) Market caps & weights
+# 3) Quarterly prices, market caps & weights
 # -----------------------------
-market_caps = shareholding_q * quaterly_price
+# Shares as of each quarter end times the price on/before it, top N by cap
+engine = IndexEngine(price_w, shares=shareholding_pattern_w, calendar=None, base_value=BASE_INDEX_VALUE)
+rebal_dates = engine.rebalance_dates(REBALANCE_FREQ, pending=True)
+quaterly_price = engine.rebalance_prices(REBALANCE_FREQ)
+market_caps = engine.rebalance_caps(REBALANCE_FREQ)
 
-weights_per_quarter = {}
-
-for date, row in market_caps.iterrows():
-    top20 = row.nlargest(NO_STOCKS)
-    weights = top20 / top20.sum()
-    weights_per_quarter[date] = weights
+weights_w, members = engine.selection(NO_STOCKS, REBALANCE_FREQ)
 
 if make_csv:
-    pd.DataFrame(weights_per_quarter).to_csv(f'weights_per_quarter_{NO_STOCKS}.csv')
+    weights_w.where(members).T.dropna(how='all').to_csv(f'weights_per_quarter_{NO_STOCKS}.csv')
 
 # -----------------------------
-# 5) Dynamic index + shares
+# 4) Dynamic index + shares
 # -----------------------------
-index_series = pd.Series(dtype=float)
-portfolio_value = BASE_INDEX_VALUE
-
-shares_held_per_quarter = {}
-
-for i, date in enumerate(rebal_dates):
-    try:
-        print(f"Processing quarter: {date.date()}")
-
-        # Find next rebalance or final date
-        start = date
-        end = rebal_dates[i+1] if i < len(rebal_dates)-1 else price_w.index[-1]
-
-        # Weight selection
-        weights = weights_per_quarter[date]
-        active_stocks = weights.index
+# All quarterly segments are chain-linked in one pass
+index_series = engine.chain_linked(NO_STOCKS, REBALANCE_FREQ)
 
-        # -----------------------------
-        # (A) Compute number of shares at this rebalance
-        # -----------------------------
-        prices_at_rebalance = quaterly_price.loc[date, active_stocks]
-        money_alloc = weights * portfolio_value
-        shares = money_alloc / prices_at_rebalance
-
-        # Save shares for reporting
-        shares_held_per_quarter[date] = shares
-
-        # -----------------------------
-        # (B) Compute index movement inside this quarter
-        # -----------------------------
-        sub_price = price_w.loc[start:end, active_stocks].dropna(how='all', axis=1)
-        normalized = sub_price / sub_price.iloc[0]
-
-        segment_index = (normalized * weights).sum(axis=1)
-        segment_index = segment_index / segment_index.iloc[0] * portfolio_value
-
-        # Smooth stitching to previous period
-        if not index_series.empty:
-            scale_factor = index_series.iloc[-1] / segment_index.iloc[0]
-            segment_index = segment_index * scale_factor
-
-        index_series = pd.concat([index_series, segment_index])
-
-        # -----------------------------
-        # (C) Update portfolio for next quarter
-        # -----------------------------
-        portfolio_value = index_series.iloc[-1]
-
-    except Exception as e:
-        print(f"Error at {date}: {e}")
-
-# ---------------------------------
-# 6) Cleanup duplicate dates
-# ---------------------------------
-index_series = index_series[~index_series.index.duplicated(keep="last")]
+# Portfolio value carried into each rebalance = index level on its first trading day
+portfolio_value = (
+    index_series.reindex(rebal_dates, method='bfill')
+                .fillna(index_series.iloc[-1])
+)
+shares_held = (weights_w.mul(portfolio_value, axis=0) / quaterly_price).where(members)
 
 if make_csv:
     index_series.to_csv(f'index_series_{NO_STOCKS}.csv')
-    pd.DataFrame(shares_held_per_quarter).to_csv("shares_held_dynamic.csv")
+    shares_held.T.dropna(how='all').to_csv("shares_held_dynamic.csv")
 
 # ---------------------------------
-# 7) Plot final index
+# 5) Plot final index
 # ---------------------------------
 plt.figure(figsize=(10,5))
 plt.plot(index_series, label="Custom Quarterly Market-Cap Index")
@@ -0,0 +1,170 @@
+import json
+import os
+from collections import Counter
+from datetime import datetime
+
+from xbrl_fetch import FetchConfig, FetchError
+
+OK = "ok"
+HTTP_ERROR = "http_error"
+FETCH_ERROR = "fetch_error"
+PARSE_ERROR = "parse_error"
+
+# HTTP statuses worth another try; anything else (404, 410 ...) is final
+RETRY_HTTP_STATUSES = (403, 408, 429, 500, 502, 503, 504)
+
+# Gentler profile for the retry pass: few connections, slow rate, long backoff
+RETRY_CONFIG = FetchConfig(per_host_concurrency=2, rate_limit=1.0, max_retries=6, backoff_base=2.0,
+                           backoff_max=120.0, timeout=60.0, max_in_flight=8)
+
+
+def classify(result) -> tuple:
+    """
+    (status, http_code) for a FetchResult.
+    """
+    if result.error is None:
+        return OK, None
+    if isinstance(result.error, FetchError):
+        return HTTP_ERROR, result.error.status
+    if result.stage == "parse":
+        return PARSE_ERROR, None
+    return FETCH_ERROR, None
+
+
+class RunLedger:
+    """
+    Append-only record of what happened to every URL of a scrape.
+
+    One JSON line per finished URL (status, HTTP code, error, seconds,
+    attempt number and the job it came from); the latest line for a URL
+    wins. Lines are flushed and fsync'd every checkpoint_every records, so
+    after a crash the ledger is at most that many URLs behind.
+
+    Layout::
+
+        <path>        {"url": ..., "status": "ok", "code": null, ...}
+                      {"url": ..., "status": "http_error", "code": 503, ...}
+
+    With resume the existing file is read back and extended; otherwise it
+    is started over.
+
+    Parse errors are final for the parser that produced them. Each entry
+    records parser_version, and on resume parse errors from another
+    version, or all of them with retry_parse_errors, are admitted again
+    without discarding the rest of the ledger.
+    """
+
+    def __init__(self, path: str = "run_ledger.jsonl", checkpoint_every: int = 50, resume: bool = True,
+                 parser_version=None, retry_parse_errors: bool = False):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.parser_version = parser_version
+        self.latest = {}
+        if resume and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn last line from an interrupted run
+                        continue
+                    self.latest[entry["url"]] = entry
+        # Parse failures of an earlier parser get another go this run
+        self._readmitted = {
+            url for url, entry in self.latest.items()
+            if entry["status"] == PARSE_ERROR
+            and (retry_parse_errors or entry.get("parser") != parser_version)
+        }
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        self._unsynced = 0
+
+    def __len__(self):
+        return len(self.latest)
+
+    def record(self, result, status: str = None, error: str = None):
+        """
+        Add a FetchResult. status/error override the classification, e.g.
+        for a filing that parsed but held no usable data.
+        """
+        auto_status, code = classify(result)
+        previous = self.latest.get(result.url)
+        job = result.job._asdict() if hasattr(result.job, "_asdict") else None
+        entry = {
+            "url": result.url,
+            "status": status or auto_status,
+            "code": code,
+            "error": error or (str(result.error) if result.error is not None else None),
+            "seconds": round(result.seconds, 4) if result.seconds is not None else None,
+            "attempt": previous["attempt"] + 1 if previous else 1,
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "parser": self.parser_version,
+            "job": job
+        }
+        self.latest[result.url] = entry
+        self._readmitted.discard(result.url)
+        self._file.write(json.dumps(entry) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------------------------------------------
+    # Queries
+    # ---------------------------------------------------
+    def gave_up(self, url: str) -> bool:
+        """
+        Whether url last failed in a way a retry will not fix (404, parse
+        error of the current parser ...).
+        """
+        entry = self.latest.get(url)
+        if entry is None or url in self._readmitted:
+            return False
+        return entry["status"] != OK and not is_retryable(entry)
+
+    def pending(self, jobs):
+        """
+        Lazily drop jobs (URLs or objects with .url) that already failed for
+        good, so a resumed run does not hammer them again.
+
+        Filings that finished OK are not skipped here: their rows may not
+        have reached the output yet when a run dies. The manifest, which is
+        only written after the rows, skips those, and the filing cache
+        makes re-parsing the rest cheap.
+        """
+        for job in jobs:
+            if not self.gave_up(getattr(job, "url", job)):
+                yield job
+
+    def failures(self, retryable_only: bool = True) -> list:
+        """
+        Latest entries of URLs that did not finish OK.
+        """
+        return [e for e in self.latest.values()
+                if e["status"] != OK and (is_retryable(e) or not retryable_only)]
+
+    def failed_urls(self) -> list:
+        return [e["url"] for e in self.failures(retryable_only=False)]
+
+    def counts(self) -> Counter:
+        return Counter(e["status"] for e in self.latest.values())
+
+
+def is_retryable(entry: dict) -> bool:
+    if entry["status"] == FETCH_ERROR:
+        return True
+    return entry["status"] == HTTP_ERROR and entry["code"] in RETRY_HTTP_STATUSES
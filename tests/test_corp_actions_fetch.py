@@ -0,0 +1,73 @@
+import csv
+import os
+
+import pandas as pd
+
+from corp_actions_fetch import (CorpActionsClient, LocalActionsServer, actions_file, fetch_corporate_actions,
+                                update_event_store, write_actions_csv)
+from indexlib.datastore import read_events
+
+INFY = [
+    {"symbol": "INFY", "comp": "Infosys Limited", "series": "EQ", "subject": "Bonus 1:1",
+     "faceVal": "5", "exDate": "04-Sep-2018", "recDate": "05-Sep-2018"},
+    {"symbol": "INFY", "comp": "Infosys Limited", "series": "EQ", "subject": "Dividend - Rs 21 Per Share",
+     "faceVal": "5", "exDate": "30-May-2025", "recDate": "30-May-2025"}
+]
+TCS = [
+    {"symbol": "TCS", "comp": "Tata Consultancy Services Limited", "series": "EQ",
+     "subject": "Interim Dividend - Rs 11 Per Share", "faceVal": "1", "exDate": "16-Jul-2025",
+     "recDate": "16-Jul-2025"}
+]
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def test_client_fetches_actions_after_cookie_warm_up():
+    with LocalActionsServer({"INFY": INFY}) as server:
+        client = CorpActionsClient(base_url=server.base_url, retries=0)
+        assert client.actions("INFY") == INFY
+        assert client.actions("UNKNOWN") == []
+        # One page visit for the cookie, then only API calls
+        assert server.requests == 3
+
+
+def test_refetch_replaces_previous_files(tmp_path):
+    out_dir = str(tmp_path)
+    # A dated page download from an earlier run, plus a symbol sharing the prefix
+    write_actions_csv(INFY, os.path.join(out_dir, "CF-CA-equities-INFY-15-Nov-2025.csv"))
+    write_actions_csv([], os.path.join(out_dir, "CF-CA-equities-INFY-X-15-Nov-2025.csv"))
+
+    with LocalActionsServer({"INFY": INFY, "TCS": TCS}) as server:
+        client = CorpActionsClient(base_url=server.base_url, retries=0)
+        for _ in range(2):
+            results = fetch_corporate_actions(["INFY", "TCS", "INFY"], out_dir, client=client, workers=2)
+            assert sorted(r.symbol for r in results) == ["INFY", "TCS"]
+            assert all(r.error is None for r in results)
+
+    assert sorted(os.listdir(out_dir)) == ["CF-CA-equities-INFY-X-15-Nov-2025.csv",
+                                           "CF-CA-equities-INFY.csv", "CF-CA-equities-TCS.csv"]
+    rows = read_rows(actions_file("INFY", out_dir))
+    assert [r["PURPOSE"] for r in rows] == ["Bonus 1:1", "Dividend - Rs 21 Per Share"]
+
+
+def test_update_event_store_writes_index_inputs(tmp_path):
+    out_dir = str(tmp_path / "corp_event")
+    dividends_path = str(tmp_path / "dividends.csv")
+    corp_path = str(tmp_path / "corporate_actions.csv")
+
+    with LocalActionsServer({"INFY": INFY, "TCS": TCS}) as server:
+        client = CorpActionsClient(base_url=server.base_url, retries=0)
+        for _ in range(2):
+            update_event_store(["INFY", "TCS"], out_dir, dividends_path, corp_path, client=client)
+
+    divs = read_events(dividends_path)
+    assert sorted(zip(divs["ticker"], divs["payout_per_s"])) == [("INFY", 21.0), ("TCS", 11.0)]
+
+    corp = read_events(corp_path, date_format="%d-%b-%y")
+    assert len(corp) == 1
+    assert corp.iloc[0]["ticker"] == "INFY"
+    assert corp.iloc[0]["ratio"] == "1:2"
+    assert corp.iloc[0]["ex_date"] == pd.Timestamp("2018-09-04")
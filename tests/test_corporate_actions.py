@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from indexlib import adjustment_factors, apply_adjustments, parse_ratios
+
+DATES = pd.bdate_range("2024-01-01", "2024-01-31")
+TICKERS = pd.Index(["A", "B", "C"])
+
+
+def events(*rows):
+    corp = pd.DataFrame(rows, columns=["ticker", "ex_date", "event_type", "ratio"])
+    corp["ex_date"] = pd.to_datetime(corp["ex_date"])
+    return corp
+
+
+def test_parse_ratios():
+    ratios = pd.Series(["1:2", " 2 : 5 ", "5", "1:0", "0:1", "n/a", None])
+
+    assert parse_ratios(ratios).tolist() == [2.0, 2.5, 5.0, 0.0, 1.0, 1.0, 1.0]
+
+
+def test_factors_compound_from_each_ex_date():
+    corp = events(("A", "2024-01-10", "SPLIT", "1:5"),
+                  ("A", "2024-01-20", "bonus", "1:2"),       # Saturday: from Friday the 19th
+                  ("B", "2024-01-15", "DIVIDEND", "10"),
+                  ("B", "2024-02-15", "SPLIT", "1:2"),       # after the calendar
+                  ("Z", "2024-01-15", "SPLIT", "1:2"))       # not in the universe
+
+    factors = adjustment_factors(corp, DATES, TICKERS)
+
+    a = factors["A"]
+    assert (a[:"2024-01-09"] == 1.0).all()
+    assert (a["2024-01-10":"2024-01-18"] == 5.0).all()
+    assert (a["2024-01-19":] == 10.0).all()
+    assert (factors[["B", "C"]] == 1.0).all().all()
+
+
+def test_apply_adjustments_matches_the_event_loop_and_keeps_market_cap():
+    rng = np.random.default_rng(5)
+    price = pd.DataFrame(rng.uniform(10, 100, (len(DATES), 3)), index=DATES, columns=TICKERS)
+    shares = pd.DataFrame(rng.uniform(1e6, 1e7, (len(DATES), 3)), index=DATES, columns=TICKERS)
+    corp = events(("A", "2024-01-10", "SPLIT", "1:5"), ("A", "2024-01-20", "BONUS", "1:1"),
+                  ("C", "2024-01-03", "SPLIT", "2:1"))
+
+    price_adj, shares_adj = apply_adjustments(price, shares, corp)
+
+    # The row-by-row loop the scripts used: scale from the ex-date (or the
+    # trading day before it) onwards
+    expected_price, expected_shares = price.copy(), shares.copy()
+    for t, ex, _, ratio in corp.itertuples(index=False):
+        old, new = ratio.split(":")
+        ex = DATES[DATES.get_indexer([ex], method="ffill")[0]]
+        expected_shares.loc[ex:, t] *= float(new) / float(old)
+        expected_price.loc[ex:, t] /= float(new) / float(old)
+    pd.testing.assert_frame_equal(price_adj, expected_price, check_freq=False)
+    pd.testing.assert_frame_equal(shares_adj, expected_shares, check_freq=False)
+    pd.testing.assert_frame_equal(price_adj * shares_adj, price * shares, check_freq=False)
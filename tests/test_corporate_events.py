@@ -0,0 +1,38 @@
+import logging
+
+import pandas as pd
+
+from indexlib.corporate_events import build_events
+
+
+def actions(*rows):
+    return pd.DataFrame([
+        {"SYMBOL": symbol, "COMPANY NAME": symbol, "SERIES": "EQ", "PURPOSE": purpose, "FACE VALUE": "1",
+         "EX-DATE": ex_date, "RECORD DATE": "-"}
+        for symbol, purpose, ex_date in rows
+    ])
+
+
+def test_overlapping_downloads_are_counted_once():
+    rows = [("INFY", "Bonus 1:1", "04-Sep-2018"), ("INFY", "Dividend - Rs 21 Per Share", "30-May-2025")]
+    events = build_events(actions(*rows, *rows))
+    assert list(events["event_type"]) == ["bonus", "dividend"]
+    assert events["ratio"].iloc[0] == "1:2"
+
+
+def test_included_special_dividend_is_not_added_on_top():
+    events = build_events(actions(
+        ("ITC", "Dividend-Rs.8.50 Per Share (Including Special Dividend Of Rs.2/- Per Share).", "30-May-2016")
+    ))
+    assert list(events["event_type"]) == ["dividend", "special"]
+    assert list(events["payout_per_share"]) == [6.5, 2.0]
+
+
+def test_unmatched_event_purposes_are_logged(caplog):
+    with caplog.at_level(logging.DEBUG, logger="indexlib.corporate_events"):
+        events = build_events(actions(("VEDL", "Interim Dividend", "09-Mar-2022"),
+                                      ("VEDL", "Annual General Meeting", "10-Jul-2022")))
+    assert events.empty
+    warnings = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert "Interim Dividend" in warnings[0].getMessage()
@@ -0,0 +1,14 @@
+import logging
+
+from indexlib.datastore import read_price_matrix
+
+
+def test_read_price_matrix_logs_rows_with_bad_dates(tmp_path, caplog):
+    path = tmp_path / "price_data.csv"
+    path.write_text("date,ticker,close\n2024-01-02,A,1\n02/30/2024,A,2\n2024-01-03,A,3\n2024-01-03,B,4\n")
+
+    with caplog.at_level(logging.WARNING, logger="indexlib.datastore"):
+        prices = read_price_matrix(str(path), date_format="%Y-%m-%d")
+
+    assert prices.shape == (2, 2) and prices.loc["2024-01-03", "B"] == 4
+    assert "dropped 1 of 4 rows" in caplog.text and "02/30/2024" in caplog.text
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from indexlib import process_dividends
+
+DATES = pd.bdate_range("2024-01-01", "2024-01-31")
+TICKERS = ["A", "B"]
+
+
+def matrices():
+    price_adj = pd.DataFrame({"A": 100.0, "B": 50.0}, index=DATES)
+    float_shares = pd.DataFrame({"A": 10.0, "B": 20.0}, index=DATES)
+    return price_adj, float_shares, price_adj * float_shares
+
+
+def dividends(*rows, **extra):
+    divs = pd.DataFrame(rows, columns=["ticker", "ex_date", "payout_per_share"])
+    divs["ex_date"] = pd.to_datetime(divs["ex_date"])
+    for name, values in extra.items():
+        divs[name] = values
+    return divs
+
+
+def test_normal_dividends_become_index_cash_on_the_ex_date():
+    price_adj, float_shares, mcap = matrices()
+    divs = dividends(("A", "2024-01-10", 1.0), ("B", "2024-01-10", 0.5), ("A", "2024-01-13", 1.0))
+
+    new_mcap, cash = process_dividends(divs, price_adj, float_shares, mcap)
+
+    pd.testing.assert_frame_equal(new_mcap, mcap)
+    assert cash["2024-01-10"] == 1.0 * 10 + 0.5 * 20
+    assert cash["2024-01-12"] == 10.0      # Saturday ex-date lands on Friday
+    assert cash.sum() == 30.0
+
+
+def test_special_dividends_cut_market_cap_instead():
+    price_adj, float_shares, _ = matrices()
+    price_adj["B"] = 100.0
+    mcap = price_adj * float_shares
+    divs = dividends(("A", "2024-01-10", 5.0),                 # 5% of the price
+                     ("B", "2024-01-11", 0.1),                 # small but short notice
+                     ("B", "2024-01-15", 1.0),                 # 2% of the announcement close, 1% of the ex-date one
+                     ("B", "2024-03-01", 9.0),                 # after the calendar
+                     ("Z", "2024-01-10", 9.0),                 # not in the universe
+                     short_notice_flag=[False, True, None, False, False],
+                     announcement_date=pd.to_datetime(["2024-01-02"] * 5))
+    lookup = pd.Series([50.0], index=pd.MultiIndex.from_tuples([(pd.Timestamp("2024-01-02"), "B")]))
+
+    new_mcap, cash = process_dividends(divs, price_adj, float_shares, mcap, price_lookup=lookup)
+
+    assert cash.sum() == 0.0
+    removed = mcap - new_mcap
+    assert removed.loc["2024-01-10", "A"] == 50.0
+    assert removed.loc["2024-01-11", "B"] == 2.0
+    assert removed.loc["2024-01-15", "B"] == 20.0
+    assert np.count_nonzero(removed.to_numpy()) == 3
+
+
+def test_a_ticker_not_held_contributes_nothing():
+    price_adj, float_shares, mcap = matrices()
+    float_shares.loc[:, "B"] = 0.0
+    divs = dividends(("B", "2024-01-10", 0.5), ("B", "2024-01-11", 10.0))
+
+    new_mcap, cash = process_dividends(divs, price_adj, float_shares, mcap)
+
+    assert cash.sum() == 0.0
+    pd.testing.assert_frame_equal(new_mcap, mcap)
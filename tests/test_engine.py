@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indexlib import IndexEngine, chain_link, select_top_n, top_n_sum
+from indexlib.sweep import _as_of
+
+DATES = pd.bdate_range("2019-01-01", "2020-12-31")
+TICKERS = [f"T{i}" for i in range(8)]
+QUARTERS = pd.date_range("2018-12-31", "2020-12-31", freq="QE")
+
+
+@pytest.fixture
+def inputs():
+    rng = np.random.default_rng(7)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(DATES), len(TICKERS))), axis=0)),
+                          index=DATES, columns=TICKERS)
+    prices.iloc[:120, 0] = np.nan   # lists late
+    shares = pd.DataFrame(rng.integers(10 ** 6, 10 ** 7, (len(QUARTERS), len(TICKERS))).astype(float),
+                          index=QUARTERS, columns=TICKERS)
+    float_factors = pd.DataFrame(rng.uniform(0.3, 0.9, shares.shape), index=QUARTERS, columns=TICKERS)
+    return prices, shares, float_factors
+
+
+def test_chain_linked_matches_select_and_link(inputs):
+    prices, shares, _ = inputs
+    engine = IndexEngine(prices, shares=shares, calendar=None)
+    rebal = prices.resample("QE").last().index
+    weights, members = select_top_n(shares.reindex(rebal) * prices.reindex(rebal, method="ffill"), 5)
+
+    assert engine.selection(5, "QE")[0].equals(weights)
+    assert engine.selection(5, "QE")[1].equals(members)
+    pd.testing.assert_series_equal(engine.chain_linked(5, "QE"), chain_link(prices, weights, 1000.0))
+
+
+def test_chain_linked_leaves_missing_closes_out(inputs):
+    prices, shares, _ = inputs
+    prices = prices.copy()
+    engine = IndexEngine(prices, shares=shares, calendar=None)
+    weights = engine.selection(5, "QE")[0]
+    member = weights.loc["2019-06-30"].idxmax()
+    prices.loc["2019-08-01":"2019-08-14", member] = np.nan
+    engine.update(prices=prices)
+
+    # The per-segment loop the scripts used: a missing close adds nothing
+    levels, level = [], 1000.0
+    for start, end in zip(weights.index[:-1], weights.index[1:]):
+        segment = prices.loc[start:end]
+        if segment.empty:
+            continue
+        value = (segment / segment.iloc[0] * weights.loc[start]).sum(axis=1)
+        levels.append(value / value.iloc[0] * level)
+        level = levels[-1].iloc[-1]
+    expected = pd.concat(levels)
+    expected = expected[~expected.index.duplicated(keep="last")]
+
+    linked = engine.chain_linked(5, "QE")
+    pd.testing.assert_series_equal(linked, expected.loc[linked.index[0]:], check_names=False, check_freq=False)
+    assert linked.loc["2019-08-01"] < linked.loc["2019-07-31"] * 0.9
+
+
+def test_top_n_pri_uses_shares_as_of_each_day(inputs):
+    prices, shares, float_factors = inputs
+    engine = IndexEngine(prices, shares=shares, float_factors=float_factors, calendar=None)
+    caps = top_n_sum(prices.ffill().fillna(0.0) * _as_of(shares, DATES) * _as_of(float_factors, DATES), 5)
+    base = caps.loc["2019-07-01"]
+
+    pd.testing.assert_series_equal(engine.top_n_pri(5, base_date="2019-06-30"), caps / base * 1000.0)
+
+
+def test_update_invalidates_only_dependents(inputs):
+    prices, shares, float_factors = inputs
+    engine = IndexEngine(prices, shares=shares, float_factors=float_factors)
+    pri, tri = engine.pri(5), engine.tri(5)
+    linked = engine.chain_linked(5)
+    factors = engine.factors
+
+    # A normal dividend (1% of the price) only moves the TRI
+    ex_date = pd.Timestamp("2020-06-01")
+    engine.update(dividends=pd.DataFrame({"ticker": ["T1"], "ex_date": [ex_date],
+                                          "payout_per_share": [prices.loc[ex_date, "T1"] * 0.01]}))
+    assert engine.factors is factors
+    assert engine.chain_linked(5) is linked
+    pd.testing.assert_series_equal(engine.pri(5), pri)
+    assert engine.tri(5).iloc[-1] > tri.iloc[-1]
+
+    engine.update(shares=shares * 2)
+    assert engine.chain_linked(5) is not linked
+    with pytest.raises(ValueError):
+        engine.update(volumes=None)
+
+
+def test_turnover_and_weights(inputs):
+    prices, shares, float_factors = inputs
+    engine = IndexEngine(prices, shares=shares, float_factors=float_factors)
+    weights = engine.weights(5)
+    assert np.allclose(weights.sum(axis=1), 1.0)
+    assert ((weights > 0).sum(axis=1) == 5).all()
+    turnover = engine.turnover(5)
+    assert turnover.iloc[0] == 1.0
+    assert ((turnover >= 0) & (turnover <= 1)).all()
@@ -0,0 +1,78 @@
+import os
+
+from filing_cache import FilingCache
+
+
+def url(i):
+    return f"https://nsearchives.nseindia.com/corporate/xbrl/SHP_{i}_1.xml"
+
+
+def body(i, size=4000):
+    # Incompressible enough that every blob has a distinct, sizeable footprint
+    return os.urandom(size) + str(i).encode()
+
+
+def test_shared_blobs_are_counted_once_and_kept_while_referenced(tmp_path):
+    cache = FilingCache(str(tmp_path))
+    cache.put(url(1), b"same body")
+    cache.put(url(2), b"same body")
+    blob = cache._blob_path(cache.index["SHP_1_1"]["sha256"])
+
+    assert cache.total_bytes == os.path.getsize(blob)
+    cache._drop("SHP_1_1")
+    assert os.path.exists(blob) and cache.get(url(2)) == b"same body"
+    cache._drop("SHP_2_1")
+    assert not os.path.exists(blob) and cache.total_bytes == 0
+
+
+def test_replacing_an_entry_with_the_same_body_keeps_the_blob(tmp_path):
+    cache = FilingCache(str(tmp_path))
+    cache.put(url(1), b"body")
+    cache.put(url(1), b"body")
+
+    assert cache.get(url(1)) == b"body"
+    assert cache._refs[cache.index["SHP_1_1"]["sha256"]] == 1
+
+
+def test_eviction_drops_least_recently_used_down_to_low_water(tmp_path):
+    cache = FilingCache(str(tmp_path), max_bytes=10 ** 9)
+    for i in range(10):
+        cache.put(url(i), body(i))
+        cache.index[f"SHP_{i}_1"]["last_access"] = i
+    size = cache.total_bytes // 10
+    cache.get(url(0))  # most recently used now
+
+    cache.max_bytes = 9 * size
+    cache.put(url(10), body(10))
+
+    assert cache.total_bytes <= cache.max_bytes * cache.low_water
+    assert url(0) in cache and url(10) in cache
+    assert url(1) not in cache and url(2) not in cache and url(3) not in cache
+    # The running total matches what is on disk, and reloading agrees
+    blobs = {cache._blob_path(e["sha256"]) for e in cache.index.values()}
+    assert cache.total_bytes == sum(os.path.getsize(b) for b in blobs)
+    cache.flush()
+    assert FilingCache(str(tmp_path)).total_bytes == cache.total_bytes
+
+
+def test_put_restores_a_blob_evicted_before_it_was_indexed(tmp_path):
+    cache = FilingCache(str(tmp_path))
+    cache.put(url(1), b"same body")
+    lock = cache._lock
+
+    class EvictFirst:
+        # Another thread drops the only other reference just before put
+        # takes the lock
+        def __enter__(self):
+            with lock:
+                cache._drop("SHP_1_1")
+            cache._lock = lock
+            return lock.__enter__()
+
+        def __exit__(self, *exc):
+            return lock.__exit__(*exc)
+
+    cache._lock = EvictFirst()
+    cache.put(url(2), b"same body")
+
+    assert cache.get(url(2)) == b"same body"
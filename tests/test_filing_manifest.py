@@ -0,0 +1,65 @@
+import pandas as pd
+
+from filing_manifest import FILING_ORDER, MANIFEST_COLUMNS, BatchWriter, FilingManifest, LinkJob, upsert_csv
+
+COLUMNS = ["symbol", "report_date", "total_shares", *FILING_ORDER]
+
+ORIGINAL = LinkJob("ABC", "30-SEP-2025", "https://x/SHP_1.xml", "ABC Ltd", "10-OCT-2025", "")
+REVISION = LinkJob("ABC", "30-SEP-2025", "https://x/SHP_2.xml", "ABC Ltd", "10-OCT-2025", "02-NOV-2025")
+
+
+def row(job, total_shares):
+    return {"symbol": job.company, "report_date": "2025-09-30", "total_shares": total_shares,
+            "revision_date": job.revision_date, "submission_date": job.submission_date}
+
+
+def test_batch_writer_keeps_latest_revision_whatever_the_completion_order(tmp_path):
+    writer = BatchWriter(str(tmp_path / "out.csv"), COLUMNS, keys=["symbol", "report_date"],
+                         order=FILING_ORDER, batch_size=1)
+    writer.add(row(REVISION, 200), REVISION)
+    writer.add(row(ORIGINAL, 100), ORIGINAL)
+    writer.add({**row(ORIGINAL, 7), "symbol": "XYZ Ltd"})
+
+    final = writer.close()
+
+    assert writer.written == 3
+    assert final[["symbol", "total_shares"]].values.tolist() == [["ABC Ltd", 200], ["XYZ Ltd", 7]]
+
+
+def test_batch_writer_without_order_keeps_last_row(tmp_path):
+    writer = BatchWriter(str(tmp_path / "out.csv"), COLUMNS, keys=["symbol", "report_date"])
+    writer.add(row(REVISION, 200))
+    writer.add(row(ORIGINAL, 100))
+
+    assert writer.close()["total_shares"].tolist() == [100]
+
+
+def test_upsert_csv_keeps_latest_revision_across_file_and_new_rows(tmp_path):
+    path = str(tmp_path / "store.csv")
+    pd.DataFrame([row(REVISION, 200)]).to_csv(path, index=True)
+
+    late_original = pd.DataFrame([row(ORIGINAL, 100), {**row(ORIGINAL, 5), "report_date": "2025-06-30"}])
+    merged = upsert_csv(path, late_original, keys=["symbol", "report_date"], index=True, order=FILING_ORDER)
+
+    assert merged[["report_date", "total_shares"]].values.tolist() == [["2025-09-30", 200], ["2025-06-30", 5]]
+    assert pd.read_csv(path, index_col=0)["total_shares"].tolist() == [200, 5]
+
+
+def test_upsert_csv_new_rows_win_without_order(tmp_path):
+    path = str(tmp_path / "store.csv")
+    pd.DataFrame([row(REVISION, 200)]).to_csv(path, index=False)
+
+    merged = upsert_csv(path, pd.DataFrame([row(ORIGINAL, 100)]), keys=["symbol", "report_date"])
+
+    assert merged["total_shares"].tolist() == [100]
+
+
+def test_manifest_pending_returns_new_and_revised_filings(tmp_path):
+    links = pd.DataFrame([ORIGINAL.key, REVISION.key], columns=MANIFEST_COLUMNS)
+    manifest = FilingManifest(str(tmp_path / "manifest.csv"))
+    manifest.record(links.iloc[:1])
+
+    reloaded = FilingManifest(str(tmp_path / "manifest.csv"))
+
+    assert reloaded.pending(links)["url"].tolist() == [REVISION.url]
+    assert ORIGINAL.key in reloaded and REVISION.key not in reloaded
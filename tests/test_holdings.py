@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from indexlib import mark_to_market, rebalance_holdings
+
+DATES = pd.bdate_range("2020-01-01", "2021-12-31")
+TICKERS = [f"T{i}" for i in range(8)]
+
+
+def dense_units(prices, caps, rebal_dates, n, base_value=1000.0):
+    # The dates x tickers index_units loop Holdings replaced
+    units = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
+    for date in rebal_dates:
+        date = prices.index[prices.index.searchsorted(date, side="right") - 1]
+        value = (units.loc[date] * prices.loc[date]).sum()
+        top = caps.loc[date].nlargest(n)
+        units.loc[date:] = 0.0
+        units.loc[date:, top.index] = (top / top.sum() * (value or base_value) / prices.loc[date, top.index]).values
+    return units
+
+
+def inputs():
+    rng = np.random.default_rng(11)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(DATES), 8)), axis=0)),
+                          index=DATES, columns=TICKERS)
+    caps = prices * rng.uniform(1e6, 1e7, 8)
+    return prices, caps
+
+
+def test_holdings_value_matches_the_dense_units_matrix():
+    prices, caps = inputs()
+    rebal = pd.date_range("2020-03-31", "2021-12-31", freq="QE")
+
+    holdings = rebalance_holdings(prices, caps, rebal, n=3)
+    units = dense_units(prices, caps, rebal, 3)
+
+    value = mark_to_market(holdings, prices)
+    expected = (units * prices).sum(axis=1)
+    start = holdings.dates[0]
+    pd.testing.assert_series_equal(value[start:], expected[start:], check_freq=False)
+    for date in ["2020-05-15", "2021-01-04", "2021-12-31"]:
+        held = holdings.units_on(date)
+        pd.testing.assert_series_equal(held.sort_index(), units.loc[date][lambda s: s > 0].sort_index(),
+                                       check_names=False)
+
+
+def test_holdings_shape_and_long_table():
+    prices, caps = inputs()
+    caps.loc[:"2020-06-30", ["T0", "T1", "T2", "T3", "T4", "T5"]] = np.nan   # two names investable at first
+    rebal = pd.to_datetime(["2019-12-31", "2020-03-31", "2020-09-30"])
+
+    holdings = rebalance_holdings(prices, caps, rebal, n=3)
+
+    # The date before the calendar is skipped; the first rebalance is padded
+    assert list(holdings.dates) == [pd.Timestamp("2020-03-31"), pd.Timestamp("2020-09-30")]
+    assert holdings.members.shape == (2, 3) and holdings.members[0, 2] == -1
+    frame = holdings.to_frame()
+    assert len(frame) == 5 and set(frame.loc[frame["date"] == "2020-03-31", "ticker"]) == {"T6", "T7"}
+    first = frame[frame["date"] == "2020-03-31"]
+    assert np.isclose((first["units"].to_numpy() * prices.loc["2020-03-31", first["ticker"]].to_numpy()).sum(),
+                      1000.0)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indexlib import IndexEngine, IndexState, update
+
+DATES = pd.bdate_range("2020-01-01", "2020-12-31")
+TICKERS = [f"T{i}" for i in range(6)]
+QUARTERS = pd.date_range("2019-12-31", "2020-12-31", freq="QE")
+CUT = pd.Timestamp("2020-09-01")
+
+
+@pytest.fixture
+def inputs():
+    rng = np.random.default_rng(2)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(DATES), 6)), axis=0)),
+                          index=DATES, columns=TICKERS)
+    shares = pd.DataFrame(rng.uniform(1e6, 1e7, (len(QUARTERS), 6)), index=QUARTERS, columns=TICKERS)
+    float_factors = pd.DataFrame(rng.uniform(0.3, 0.9, (len(QUARTERS), 6)), index=QUARTERS, columns=TICKERS)
+    # A split after the cut-off and a bonus going ex on a Saturday (applied from the Friday)
+    corp = pd.DataFrame({"ticker": ["T1", "T2"], "ex_date": pd.to_datetime(["2020-10-15", "2020-11-21"]),
+                         "event_type": ["SPLIT", "BONUS"], "ratio": ["1:2", "1:1"]})
+    prices.loc["2020-10-15":, "T1"] /= 2
+    prices.loc["2020-11-20":, "T2"] /= 2
+    # Two normal dividends after the cut-off and a special one on a Saturday
+    dividends = pd.DataFrame({"ticker": ["T0", "T3", "T4"],
+                              "ex_date": pd.to_datetime(["2020-09-10", "2020-10-20", "2020-11-14"]),
+                              "payout_per_share": [0.5, 0.4, 5.0]})
+    return prices, shares, float_factors, corp, dividends
+
+
+def test_daily_updates_match_a_full_recompute(inputs, tmp_path):
+    prices, shares, float_factors, corp, dividends = inputs
+    full = IndexEngine(prices, shares=shares, float_factors=float_factors, corp=corp, dividends=dividends)
+    history = IndexEngine(prices[:CUT], shares=shares, float_factors=float_factors, corp=corp,
+                          dividends=dividends)
+    state = history.state(3)
+
+    rows, last = {}, CUT
+    for date in prices.index[prices.index > CUT]:
+        # A shareholding filing takes effect on its report date
+        filed = [q for q in QUARTERS if last < q <= date]
+        float_shares = (shares.loc[filed[-1]] * float_factors.loc[filed[-1]]).to_dict() if filed else None
+        rows[date] = update(state, date, prices.loc[date], dividends=dividends, actions=corp,
+                            float_shares=float_shares)
+        last = date
+        if date == pd.Timestamp("2020-10-30"):
+            # The state survives a save/load between days
+            state.save(str(tmp_path / "state.json"))
+            state = IndexState.load(str(tmp_path / "state.json"))
+
+    incremental = pd.DataFrame(rows).T
+    expected = full.result(3).loc[incremental.index]
+    pd.testing.assert_frame_equal(incremental, expected, check_freq=False, check_names=False)
+    assert incremental["Indexed_Dividend_Points"].gt(0).sum() == 2
+
+
+def test_update_rejects_a_date_already_covered(inputs):
+    prices, shares, float_factors, corp, dividends = inputs
+    state = IndexEngine(prices[:CUT], shares=shares, float_factors=float_factors).state(3)
+
+    with pytest.raises(ValueError, match="not after"):
+        update(state, CUT, prices.loc[CUT])
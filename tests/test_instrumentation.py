@@ -0,0 +1,58 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+from instrumentation import StageMetrics
+
+
+def test_stages_are_counted_and_failures_recorded():
+    metrics = StageMetrics()
+    for _ in range(3):
+        with metrics.stage("pivot"):
+            pass
+    with pytest.raises(KeyError):
+        with metrics.stage("pivot"):
+            raise KeyError("x")
+    metrics.record("fetch", 2.0)
+    metrics.record("fetch", 4.0, failed=True)
+
+    table = metrics.summary()
+
+    assert list(table.index) == ["fetch", "pivot"]
+    assert table.loc["pivot", ["count", "failed"]].tolist() == [4, 1]
+    fetch = table.loc["fetch", ["count", "failed", "total_s", "mean_ms", "max_ms"]]
+    assert fetch.tolist() == [2, 1, 6.0, 3000.0, 4000.0]
+    assert table["share"].sum() == pytest.approx(1.0)
+
+
+def test_timed_wraps_functions_and_coroutines():
+    metrics = StageMetrics()
+
+    @metrics.timed()
+    def parse(x):
+        return x + 1
+
+    @metrics.timed("fetch")
+    async def fetch(x):
+        return x * 2
+
+    assert parse(1) == 2 and parse.__name__ == "parse"
+    assert asyncio.run(fetch(2)) == 4
+    assert metrics.summary()["count"].to_dict() == {"parse": 1, "fetch": 1}
+
+
+def test_report_writes_json(tmp_path, caplog):
+    metrics = StageMetrics(logging.getLogger("test_metrics"))
+    metrics.record("save", 0.5)
+    path = tmp_path / "metrics.json"
+
+    with caplog.at_level(logging.INFO, logger="test_metrics"):
+        metrics.report(str(path))
+
+    written = json.loads(path.read_text())
+    assert written["stages"]["save"]["total_s"] == 0.5
+    assert "stage timings" in caplog.text
+    metrics.reset()
+    assert metrics.summary().empty
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from indexlib import chain_link
+
+DATES = pd.bdate_range("2020-01-01", "2021-12-31")
+TICKERS = list("ABCDEF")
+
+
+def concat_loop(prices, weights, base_value=1000.0):
+    # The per-segment pd.concat loop chain_link replaced
+    index_series, index_value = pd.Series(dtype=float), base_value
+    rebal = weights.index
+    for i, start in enumerate(rebal):
+        end = rebal[i + 1] if i < len(rebal) - 1 else prices.index[-1]
+        w = weights.loc[start]
+        sub = prices.loc[start:end, w.index].dropna(how="all", axis=1)
+        if sub.empty:
+            continue
+        segment = (sub / sub.iloc[0] * w).sum(axis=1)
+        segment = segment / segment.iloc[0] * index_value
+        if not index_series.empty:
+            segment = segment * (index_series.iloc[-1] / segment.iloc[0])
+        index_series = pd.concat([index_series, segment])
+        index_value = index_series.iloc[-1]
+    return index_series[~index_series.index.duplicated(keep="last")]
+
+
+def test_chain_link_matches_the_concat_loop():
+    rng = np.random.default_rng(3)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(DATES), 6)), axis=0)),
+                          index=DATES, columns=TICKERS)
+    prices.iloc[:200, 0] = np.nan         # listed part way through
+    prices.iloc[300:310, 1] = np.nan      # gap inside a segment
+    # Quarter ends, some of them weekends, so segments start on the next trading day
+    rebal = pd.date_range("2020-03-31", "2021-09-30", freq="QE")
+    weights = pd.DataFrame(rng.uniform(0, 1, (len(rebal), 6)), index=rebal, columns=TICKERS)
+    weights = weights.where(rng.random(weights.shape) < 0.7, 0.0)
+    weights = weights.div(weights.sum(axis=1), axis=0)
+
+    linked = chain_link(prices, weights)
+
+    pd.testing.assert_series_equal(linked, concat_loop(prices, weights), check_freq=False)
+    assert linked.iloc[0] == 1000.0
+
+
+def test_chain_link_skips_rebalances_without_constituents():
+    prices = pd.DataFrame({"A": np.linspace(100, 200, len(DATES))}, index=DATES)
+    weights = pd.DataFrame({"A": [0.0, 1.0]}, index=pd.to_datetime(["2020-03-31", "2020-06-30"]))
+
+    linked = chain_link(prices, weights, base_value=100.0)
+
+    assert linked.index[0] == pd.Timestamp("2020-06-30")
+    assert np.isclose(linked.iloc[-1], 100.0 * prices["A"].iloc[-1] / prices.loc["2020-06-30", "A"])
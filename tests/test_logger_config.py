@@ -0,0 +1,42 @@
+import logging
+
+from logger_config import SampleFilter, setup_logger, stop_logging
+
+
+def record(msg, level=logging.INFO):
+    return logging.LogRecord("x", level, __file__, 0, msg, (1,), None)
+
+
+def test_sample_filter_passes_first_then_one_in_every():
+    sample = SampleFilter(first=3, every=4)
+
+    passed = [i for i in range(15) if sample.filter(record("Processed %d URLs"))]
+
+    assert passed == [0, 1, 2, 3, 7, 11]
+    assert sample.dropped == {"Processed %d URLs": 9}
+
+
+def test_sample_filter_counts_each_template_and_keeps_warnings():
+    sample = SampleFilter(first=1, every=100)
+
+    assert [sample.filter(record("a %d")) for _ in range(3)] == [True, True, False]
+    assert sample.filter(record("b %d"))
+    assert all(sample.filter(record("a %d", logging.WARNING)) for _ in range(5))
+    assert sample.dropped == {"a %d": 1}
+
+
+def test_queued_logger_writes_everything_and_reports_sampling(tmp_path):
+    log_file = tmp_path / "run.log"
+    logger = setup_logger("test_queued", str(log_file), use_queue=True, sample=SampleFilter(first=2, every=10))
+    logger.propagate = False
+
+    for i in range(25):
+        logger.debug("url %d done", i)
+    logger.error("boom")
+    stop_logging()
+
+    lines = log_file.read_text().splitlines()
+    assert [line.split(" | ")[-1] for line in lines] == [
+        "url 0 done", "url 1 done", "url 2 done", "url 12 done", "url 22 done", "boom",
+        "sampled out 20 more 'url %d done' messages"
+    ]
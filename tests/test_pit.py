@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from indexlib import PointInTime
+
+REPORTS = pd.DataFrame({
+    "ticker": ["A", "A", "A", "A", "B", "B", "C"],
+    "date": pd.to_datetime(["2020-03-31", "2020-06-30", "2020-09-30", "2020-12-31",
+                            "2020-06-30", "2020-12-31", None]),
+    "total_shares": [100.0, 100.0, 150.0, 150.0, 10.0, 20.0, 5.0],
+})
+
+
+def test_from_long_keeps_only_change_points():
+    pit = PointInTime.from_long(REPORTS, "total_shares")
+
+    assert list(pit.tickers) == ["A", "B"]
+    assert len(pit) == 4
+    assert pit.history("A").to_dict() == {pd.Timestamp("2020-03-31"): 100.0, pd.Timestamp("2020-09-30"): 150.0}
+
+
+def test_as_of_returns_the_last_value_on_or_before_each_date():
+    pit = PointInTime.from_long(REPORTS.sample(frac=1, random_state=0), "total_shares")
+    dates = pd.to_datetime(["2020-01-01", "2020-03-31", "2020-07-15", "2020-09-29", "2021-01-04"])
+
+    frame = pit.as_of(dates, ["B", "A", "Z"])
+
+    assert list(frame.columns) == ["B", "A", "Z"]
+    np.testing.assert_array_equal(frame["A"], [np.nan, 100.0, 100.0, 100.0, 150.0])
+    np.testing.assert_array_equal(frame["B"], [np.nan, np.nan, 10.0, 10.0, 20.0])
+    assert frame["Z"].isna().all()
+
+
+def test_as_of_matches_a_forward_filled_pivot():
+    rng = np.random.default_rng(4)
+    reports = pd.DataFrame({
+        "ticker": rng.choice(list("ABCDE"), 200),
+        "date": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1000, 200), unit="D"),
+        "total_shares": rng.integers(1, 4, 200).astype(float),
+    }).drop_duplicates(["ticker", "date"])
+    days = pd.bdate_range("2019-12-01", "2023-01-31")
+
+    pivot = reports.pivot(index="date", columns="ticker", values="total_shares")
+    expected = pivot.reindex(pivot.index.union(days)).ffill().reindex(days)
+    pit = PointInTime.from_long(reports, "total_shares")
+
+    pd.testing.assert_frame_equal(pit.as_of(days, expected.columns), expected,
+                                  check_names=False, check_freq=False)
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from price_ingest import FakeSource, PriceCache, YFinanceSource, refresh_prices
+
+
+def fake_prices(tickers, start="2024-01-01", end="2024-03-29"):
+    dates = pd.bdate_range(start, end)
+    return pd.DataFrame([
+        {"date": d, "ticker": t, "close": 100.0 + i + k}
+        for k, t in enumerate(tickers) for i, d in enumerate(dates)
+    ])
+
+
+def test_tickers_needing_the_same_range_are_batched(tmp_path):
+    tickers = [f"T{i}" for i in range(5)]
+    source = FakeSource(fake_prices(tickers))
+    prices, failed = refresh_prices(tickers, "2024-01-01", "2024-03-29", source=source,
+                                    cache=PriceCache(str(tmp_path)), batch_size=2, workers=2)
+    assert not failed
+    assert sorted(len(call[0]) for call in source.calls) == [1, 2, 2]
+    assert sorted({t for call in source.calls for t in call[0]}) == tickers
+    assert len(prices) == 5 * len(pd.bdate_range("2024-01-01", "2024-03-29"))
+
+
+def test_only_the_missing_range_is_requested(tmp_path):
+    cache = PriceCache(str(tmp_path))
+    source = FakeSource(fake_prices(["INFY", "TCS"]))
+    refresh_prices(["INFY", "TCS"], "2024-01-01", "2024-02-29", source=source, cache=cache)
+    source.calls.clear()
+
+    prices, _ = refresh_prices(["INFY", "TCS"], "2024-01-01", "2024-03-29", source=source, cache=cache)
+    # Both resume from the last cached day (kept as the overlap check), in one batch
+    assert source.calls == [(("INFY", "TCS"), pd.Timestamp("2024-02-29"), pd.Timestamp("2024-03-29"))]
+    assert cache.span("INFY") == (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-29"))
+    assert prices.groupby("ticker").size().to_dict() == {"INFY": 65, "TCS": 65}
+
+    source.calls.clear()
+    refresh_prices(["INFY", "TCS"], "2024-01-01", "2024-03-29", source=source, cache=cache)
+    assert source.calls == []
+
+
+def test_overlap_drift_redownloads_full_history(tmp_path):
+    cache = PriceCache(str(tmp_path))
+    prices = fake_prices(["INFY", "TCS"])
+    refresh_prices(["INFY", "TCS"], "2024-01-01", "2024-02-29", source=FakeSource(prices), cache=cache)
+
+    # INFY splits 1:2 in March; adjusted closes before it halve
+    adjusted = prices.copy()
+    infy = adjusted["ticker"] == "INFY"
+    adjusted.loc[infy & (adjusted["date"] < "2024-03-15"), "close"] /= 2
+    source = FakeSource(adjusted)
+    refresh_prices(["INFY", "TCS"], "2024-01-01", "2024-03-29", source=source, cache=cache)
+
+    assert (("INFY",), pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-29")) in source.calls
+    expected = adjusted[infy].set_index("date")["close"]
+    assert cache.load("INFY").set_index("date")["close"].equals(expected)
+    # TCS did not drift and keeps its incremental update
+    assert len(cache.load("TCS")) == 65
+
+
+def test_yfinance_batch_drops_missing_closes():
+    dates = pd.bdate_range("2024-01-01", periods=3)
+    columns = pd.MultiIndex.from_product([["INFY.NS", "NEW.NS"], ["Open", "Close"]])
+    raw = pd.DataFrame([[1.0, 10.0, np.nan, np.nan],
+                        [1.0, 11.0, np.nan, np.nan],
+                        [1.0, 12.0, 2.0, 20.0]], index=dates, columns=columns)
+    source = YFinanceSource.__new__(YFinanceSource)
+    source._yf = SimpleNamespace(download=lambda *args, **kwargs: raw)
+    source.suffix = ".NS"
+    source.auto_adjust = True
+
+    long = source.history(["INFY", "NEW"], dates[0], dates[-1])
+    assert long["close"].notna().all()
+    assert long.groupby("ticker").size().to_dict() == {"INFY": 3, "NEW": 1}
@@ -0,0 +1,43 @@
+from run_ledger import OK, PARSE_ERROR, RunLedger
+from xbrl_fetch import FetchError, FetchResult
+
+GOOD = FetchResult("u/good", 1, None, stage="parse", seconds=0.1)
+GONE = FetchResult("u/gone", None, FetchError("u/gone", 404), stage="fetch", seconds=0.1)
+BUSY = FetchResult("u/busy", None, FetchError("u/busy", 503), stage="fetch", seconds=0.1)
+BROKEN = FetchResult("u/broken", None, ValueError("no total"), stage="parse", seconds=0.1)
+URLS = ["u/good", "u/gone", "u/busy", "u/broken", "u/new"]
+
+
+def write_ledger(path, parser_version=1):
+    with RunLedger(path, resume=False, parser_version=parser_version) as ledger:
+        for result in (GOOD, GONE, BUSY, BROKEN):
+            ledger.record(result)
+
+
+def test_resume_skips_final_failures_only(tmp_path):
+    path = str(tmp_path / "ledger.jsonl")
+    write_ledger(path)
+    ledger = RunLedger(path, parser_version=1)
+    assert list(ledger.pending(URLS)) == ["u/good", "u/busy", "u/new"]
+    assert [e["url"] for e in ledger.failures()] == ["u/busy"]
+    assert ledger.counts()[PARSE_ERROR] == 1
+    ledger.close()
+
+
+def test_parse_errors_are_readmitted_for_a_new_parser(tmp_path):
+    path = str(tmp_path / "ledger.jsonl")
+    write_ledger(path, parser_version=1)
+    for ledger in (RunLedger(path, parser_version=2), RunLedger(path, parser_version=1, retry_parse_errors=True)):
+        assert list(ledger.pending(URLS)) == ["u/good", "u/busy", "u/broken", "u/new"]
+        ledger.close()
+
+    # Once re-parsed, the new outcome counts
+    with RunLedger(path, parser_version=2) as ledger:
+        ledger.record(BROKEN._replace(value=1, error=None))
+        assert ledger.latest["u/broken"]["status"] == OK
+        assert ledger.latest["u/broken"]["attempt"] == 2
+    with RunLedger(path, parser_version=2) as ledger:
+        ledger.record(BROKEN)
+    ledger = RunLedger(path, parser_version=2)
+    assert "u/broken" not in list(ledger.pending(URLS))
+    ledger.close()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from indexlib import select_top_n, top_n_sum
+
+DATES = pd.date_range("2020-03-31", periods=40, freq="QE")
+
+
+def nlargest_weights(market_caps, n):
+    # The per-row loop the scripts used before select_top_n
+    rows = {}
+    for date, row in market_caps.iterrows():
+        top = row.nlargest(n)
+        rows[date] = top / top.sum()
+    return pd.DataFrame(rows).T.reindex(index=market_caps.index, columns=market_caps.columns).fillna(0.0)
+
+
+def test_select_top_n_matches_the_nlargest_loop():
+    rng = np.random.default_rng(7)
+    caps = pd.DataFrame(rng.uniform(1, 100, (len(DATES), 12)), index=DATES, columns=[f"T{i}" for i in range(12)])
+    caps = caps.mask(rng.random(caps.shape) < 0.2)
+
+    weights, members = select_top_n(caps, 5)
+
+    pd.testing.assert_frame_equal(weights, nlargest_weights(caps, 5), check_freq=False)
+    assert members.sum(axis=1).equals(caps.notna().sum(axis=1).clip(upper=5))
+    assert not (members & caps.isna()).any().any()
+    pd.testing.assert_series_equal(top_n_sum(caps, 5), (caps * members).sum(axis=1), check_freq=False)
+
+
+def test_rows_with_fewer_than_n_stocks_take_what_is_there():
+    caps = pd.DataFrame([[3.0, np.nan, 1.0], [np.nan, np.nan, np.nan]], index=DATES[:2], columns=list("ABC"))
+
+    weights, members = select_top_n(caps, 2)
+
+    assert weights.iloc[0].tolist() == [0.75, 0.0, 0.25]
+    assert weights.iloc[1].tolist() == [0.0, 0.0, 0.0] and not members.iloc[1].any()
+
+
+def test_buffer_keeps_incumbents_ranked_within_n_plus_buffer():
+    caps = pd.DataFrame([[10.0, 9.0, 8.0, 1.0],
+                         [10.0, 8.0, 9.0, 1.0],    # B slips to 3rd: stays with a buffer of 1
+                         [10.0, 1.0, 9.0, 8.0]],   # B slips to 4th: replaced
+                        index=DATES[:3], columns=list("ABCD"))
+
+    plain = select_top_n(caps, 2)[1]
+    buffered = select_top_n(caps, 2, buffer=1)[1]
+
+    assert plain.iloc[1].tolist() == [True, False, True, False]
+    assert buffered.iloc[1].tolist() == [True, True, False, False]
+    assert buffered.iloc[2].tolist() == [True, False, True, False]
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from filing_cache import FilingCache
+from xbrl_fetch import FetchConfig, run_pipeline
+
+URLS = [f"https://nsearchives.nseindia.com/corporate/xbrl/SHP_{i}_1.xml" for i in range(20)]
+
+
+def cached(tmp_path):
+    cache = FilingCache(str(tmp_path / "cache"))
+    for url in URLS:
+        cache.put(url, url.encode())
+    return cache
+
+
+def test_callback_error_stops_the_run_and_is_raised(tmp_path):
+    seen = []
+
+    def on_result(done, total, result):
+        seen.append(result.url)
+        if done == 3:
+            raise RuntimeError("bad row")
+
+    config = FetchConfig(max_in_flight=2, queue_size=2, parse_workers=2)
+    with pytest.raises(RuntimeError, match="bad row"):
+        asyncio.run(asyncio.wait_for(
+            run_pipeline(URLS, config=config, on_result=on_result, cache=cached(tmp_path), offline=True),
+            timeout=10))
+
+    # No callbacks after the failing one, and no new URLs started
+    assert len(seen) == 3
+
+
+def test_offline_run_serves_every_url_from_cache(tmp_path):
+    results = asyncio.run(run_pipeline(URLS, config=FetchConfig(max_in_flight=4), cache=cached(tmp_path),
+                                       offline=True))
+
+    assert sorted(r.value for r in results) == sorted(url.encode() for url in URLS)
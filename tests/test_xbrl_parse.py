@@ -0,0 +1,76 @@
+import pytest
+
+from xbrl_parse import iterparse_shareholding, parse_filing
+
+SHP = "http://www.bseindia.com/xbrl/shp/2023-03-31/in-bse-shp"
+
+FILING = f"""<?xml version="1.0" encoding="UTF-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance"
+            xmlns:xbrldi="http://xbrl.org/2006/xbrldi"
+            xmlns:in-bse-shp="{SHP}"
+            xmlns:other="http://example.com/other">
+  <in-bse-shp:NameOfTheCompany contextRef="D">ABC Limited</in-bse-shp:NameOfTheCompany>
+  <in-bse-shp:ISIN contextRef="D">INE000A01010</in-bse-shp:ISIN>
+  <in-bse-shp:DateOfReport contextRef="D">2025-09-30</in-bse-shp:DateOfReport>
+  <!-- a fact before its context -->
+  <in-bse-shp:NumberOfShares contextRef="Promoter">600</in-bse-shp:NumberOfShares>
+  <xbrli:context id="Promoter">
+    <xbrli:entity>
+      <xbrli:segment>
+        <xbrldi:explicitMember dimension="in-bse-shp:CategoryAxis">in-bse-shp:ShareholdingOfPromoterAndPromoterGroupMember</xbrldi:explicitMember>
+      </xbrli:segment>
+    </xbrli:entity>
+  </xbrli:context>
+  <xbrli:context id="Public">
+    <xbrli:entity><xbrli:segment>
+      <xbrldi:explicitMember dimension="in-bse-shp:CategoryAxis">in-bse-shp:PublicShareholdingMember</xbrldi:explicitMember>
+    </xbrli:segment></xbrli:entity>
+  </xbrli:context>
+  <xbrli:context id="Total">
+    <xbrli:entity><xbrli:segment>
+      <xbrldi:explicitMember dimension="in-bse-shp:CategoryAxis">in-bse-shp:ShareholdingPatternMember</xbrldi:explicitMember>
+    </xbrli:segment></xbrli:entity>
+  </xbrli:context>
+  <xbrli:context id="D"><xbrli:entity/></xbrli:context>
+  <in-bse-shp:NumberOfShares contextRef="Public">400.0</in-bse-shp:NumberOfShares>
+  <in-bse-shp:NumberOfShares contextRef="Total">1000</in-bse-shp:NumberOfShares>
+  <in-bse-shp:NumberOfShares contextRef="Total">999</in-bse-shp:NumberOfShares>
+  <in-bse-shp:NumberOfShareholders contextRef="Public">25</in-bse-shp:NumberOfShareholders>
+  <other:NumberOfShares contextRef="Total">1</other:NumberOfShares>
+  <in-bse-shp:NumberOfShares contextRef="Unknown">5</in-bse-shp:NumberOfShares>
+</xbrli:xbrl>
+""".encode()
+
+
+def test_iterparse_collects_metadata_and_facts_by_category():
+    parsed = iterparse_shareholding(FILING)
+
+    assert (parsed["Company"], parsed["ISIN"], parsed["ReportDate"]) == ("ABC Limited", "INE000A01010", "2025-09-30")
+    assert parsed["facts"] == {
+        "ShareholdingOfPromoterAndPromoterGroup": {"NumberOfShares": "600"},
+        "PublicShareholding": {"NumberOfShares": "400.0", "NumberOfShareholders": "25"},
+        # First fact for a category/metric wins; other namespaces are ignored
+        "ShareholdingPattern": {"NumberOfShares": "1000"},
+    }
+
+
+def test_ns_marker_selects_the_taxonomy():
+    assert iterparse_shareholding(FILING, ns_marker="in-nse-shp")["facts"] == {}
+    assert iterparse_shareholding(FILING, ns_marker="shp")["Company"] == "ABC Limited"
+
+
+def test_parse_filing_builds_a_typed_record():
+    record = parse_filing("https://x/SHP_1_1.xml", FILING)
+
+    assert (record.promoter_shares, record.public_shares, record.total_shares) == (600, 400, 1000)
+    assert record.free_float_factor == 0.4
+    assert record.summary()["total_shares"] == 1000
+    assert record.to_frame()["category"].tolist() == sorted(record.facts)
+
+
+def test_summary_rejects_an_incomplete_filing():
+    record = parse_filing("https://x/SHP_1_1.xml", FILING.replace(b'contextRef="Public">400.0', b'contextRef="X">400.0'))
+
+    assert record.public_shares is None
+    with pytest.raises(ValueError, match="INE000A01010"):
+        record.summary()
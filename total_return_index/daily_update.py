@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+# indexlib lives in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from indexlib import IndexState, update
+from indexlib.datastore import load_events, read_price_matrix
+
+STATE_FILE = "index_state_top20.json"
+RESULT_FILE = "TRI_top20_quarterly_rebalanced.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Append new days to the top-20 PRI/TRI from the state saved by rough03.py"
+    )
+    parser.add_argument("prices", help="date,ticker,close CSV with the new day(s) of closes")
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--result", default=RESULT_FILE)
+    args = parser.parse_args()
+
+    state = IndexState.load(args.state)
+    prices = read_price_matrix(args.prices, dayfirst=True)
+    prices = prices[prices.index > pd.Timestamp(state.date)]
+    if prices.empty:
+        print(f"No prices after {state.date}, nothing to do")
+        return
+
+    divs = load_events('dividends.csv')
+    corp = load_events('corporate_actions.csv', date_format='%d-%b-%y')
+
+    rows = {date: update(state, date, closes, dividends=divs, actions=corp)
+            for date, closes in prices.iterrows()}
+    pd.DataFrame.from_dict(rows, orient="index").to_csv(args.result, mode="a", header=False)
+    state.save(args.state)
+    print(f"Appended {len(rows)} day(s) to {args.result}, index now at {state.date}")
+
+
+if __name__ == "__main__":
+    main()
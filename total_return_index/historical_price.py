@@ -1,5 +1,9 @@
-import yfinance as yf
-import pandas as pd
+import os
+import sys
+# price_ingest lives in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from price_ingest import PriceCache, YFinanceSource, refresh_prices
+
 nifty50_union = [
     "ADANIENT.NS", "ADANIPORTS.NS", "APOLLOHOSP.NS", "ASIANPAINT.NS",
     "AXISBANK.NS", "BAJAJ-AUTO.NS", "BAJFINANCE.NS", "BAJAJFINSV.NS",
@@ -24,41 +28,15 @@ nifty50_union = [
     "INDUSINDBK.NS"
 ]
 
-failed_list =[]
-collected_data = []
-
-
-for s in nifty50_since_2018:
-    try:
-        df = yf.download(f'{s}.NS', start='2018-01-01', auto_adjust=True, multi_level_index=False)[['Close']]
-        df = df.reset_index()
-        df['ticker'] = s
-        df = df.rename(columns={'Close': 'close', 'Date': 'date'})
-        collected_data.append(df[['date', 'ticker', 'close']])
-    except Exception as e:
-        print(e)
-# Concatenate vertically to create the final long-format DataFrame
-#data = pd.concat(collected_data, )
-
+# Plain NSE symbols; YFinanceSource adds the .NS suffix
+symbols = [s.removesuffix('.NS') for s in nifty50_union]
 
+# Batched multi-ticker downloads, cached per ticker under price_cache/;
+# later runs only request the days after the last cached close
+data, failed = refresh_prices(symbols, start='2018-01-01', source=YFinanceSource(),
+                              cache=PriceCache('price_cache'), batch_size=20, workers=4)
+for ticker, error in failed.items():
+    print(ticker, error)
 
-
-data = pd.concat(collected_data,axis=0,ignore_index=True)
 data.head()
 data.to_csv('price_data_02.csv')
-
-
-df = pd.read_csv('price_data.csv',parse_dates=True,usecols=['date','ticker','close'])
-
-df[df.duplicated(subset=['date','ticker','close'])]
-
-df.drop_duplicates(keep="first",inplace=True)
-
-np.where((df['ticker']=='ADANIENT'))
-
-df.pivot(index='date',columns='ticker',values='close')
-
-# collecting data for shares
-
-
-
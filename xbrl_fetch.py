@@ -0,0 +1,279 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from instrumentation import METRICS, StageMetrics
+from xbrl_parse import HEADERS
+
+
+@dataclass
+class FetchConfig:
+    """
+    Tuning knobs for the async fetch pipeline.
+
+    per_host_concurrency caps in-flight requests to any one host,
+    rate_limit is requests/second across all hosts (0 disables it) and
+    retries back off exponentially on the statuses in retry_statuses.
+
+    Parsing runs on parse_workers threads, or on a pool of parse_processes
+    worker processes when that is non-zero.
+
+    URLs are pulled from the input iterable by a fixed pool of
+    max_in_flight download tasks, and downloaded bodies wait for a parser
+    in a queue of queue_size. A downloader whose put blocks on a full queue
+    stops pulling URLs, so when parsing falls behind at most
+    max_in_flight + queue_size + workers bodies are held in memory and a
+    lazy job source is only read as fast as work completes.
+    """
+    per_host_concurrency: int = 8
+    rate_limit: float = 5.0
+    max_retries: int = 4
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    timeout: float = 30.0
+    parse_workers: int = 4
+    parse_processes: int = 0
+    queue_size: int = 64
+    max_in_flight: int = 64
+    retry_statuses: tuple = (403, 429, 500, 502, 503, 504)
+
+
+class FetchError(Exception):
+    def __init__(self, url, status):
+        super().__init__(f"Failed to fetch XML. HTTP {status}")
+        self.url = url
+        self.status = status
+
+
+class FetchResult(NamedTuple):
+    url: str
+    value: object
+    error: Optional[BaseException]
+    job: object = None
+    stage: str = None       # 'fetch' or 'parse': where the URL finished
+    seconds: float = None   # from picking up the URL to finishing it
+
+
+class RateLimiter:
+    """
+    Spaces request starts at least 1/rate seconds apart.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _backoff(config: FetchConfig, attempt: int) -> float:
+    delay = min(config.backoff_max, config.backoff_base * 2 ** attempt)
+    return delay * (0.5 + random.random() / 2)
+
+
+async def fetch_bytes(session, url, config, host_limits, limiter, metrics: StageMetrics = None) -> bytes:
+    """
+    GET one URL through the shared session, retrying transient failures.
+
+    metrics receives 'fetch' for each request/response round trip only;
+    time spent waiting for the host's semaphore and the rate limiter goes
+    to 'fetch_wait' and retry sleeps to 'fetch_backoff'.
+    """
+    metrics = metrics or METRICS
+    host = urlsplit(url).netloc
+    semaphore = host_limits.setdefault(host, asyncio.Semaphore(config.per_host_concurrency))
+
+    for attempt in range(config.max_retries + 1):
+        last_attempt = attempt == config.max_retries
+        waited = time.perf_counter()
+        try:
+            async with semaphore:
+                await limiter.acquire()
+                metrics.record("fetch_wait", time.perf_counter() - waited)
+                with metrics.stage("fetch"):
+                    async with session.get(url) as res:
+                        if res.status == 200:
+                            return await res.read()
+                        status = res.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if last_attempt:
+                raise
+        else:
+            if status not in config.retry_statuses or last_attempt:
+                raise FetchError(url, status)
+        with metrics.stage("fetch_backoff"):
+            await asyncio.sleep(_backoff(config, attempt))
+
+
+def _timed_handle(handle, url, content):
+    """
+    Run handle in a parse worker and time only the work itself, so the
+    wait for a free worker is not counted as parsing.
+
+    Returns
+    -------
+    (value, error, seconds)
+    """
+    start = time.perf_counter()
+    try:
+        return handle(url, content), None, time.perf_counter() - start
+    except Exception as e:
+        return None, e, time.perf_counter() - start
+
+
+async def run_pipeline(urls, handle: Callable[[str, bytes], object] = None,
+                       config: FetchConfig = None, on_result=None,
+                       cache=None, offline=False, metrics: StageMetrics = None,
+                       keep_results: bool = True) -> list:
+    """
+    Download urls concurrently and hand each body to parse workers.
+
+    Parameters
+    ----------
+    urls : iterable of str or of jobs with a .url attribute
+        Consumed lazily. A job is handed back as FetchResult.job.
+    handle : callable(url, content) -> object, optional
+        Run in a worker thread (or worker process, see FetchConfig) for every
+        downloaded document; defaults to returning the raw bytes. With
+        processes it must be a picklable module-level function.
+    config : FetchConfig, optional
+    on_result : callable(done, total, FetchResult), optional
+        Progress hook called as each URL finishes; total is None when urls
+        has no length (e.g. a generator). If it raises, no new URLs are
+        started, work already in flight is drained without further calls,
+        and the first exception is re-raised once the pipeline has stopped.
+    cache : FilingCache, optional
+        Serve bodies from disk when present and store new downloads.
+    offline : bool
+        With a cache, never touch the network; misses become errors.
+    metrics : StageMetrics, optional
+        Receives 'fetch' (one network round trip) and 'parse' (the handle
+        call inside its worker) timings, with the queueing around them
+        reported separately as 'fetch_wait', 'fetch_backoff' and
+        'parse_wait'; defaults to instrumentation.METRICS.
+    keep_results : bool
+        Collect results for the return value. Streaming callers that
+        consume on_result pass False so memory stays flat.
+
+    Returns
+    -------
+    list of FetchResult, in completion order (empty without keep_results).
+    """
+    config = config or FetchConfig()
+    metrics = metrics or METRICS
+    total = len(urls) if hasattr(urls, "__len__") else None
+    items = iter(urls)
+    results = []
+    done = 0
+    callback_error = None
+    queue = asyncio.Queue(maxsize=config.queue_size)
+    host_limits = {}
+    limiter = RateLimiter(config.rate_limit)
+    loop = asyncio.get_running_loop()
+    executor = None
+    n_workers = config.parse_workers
+    if config.parse_processes and handle is not None:
+        executor = ProcessPoolExecutor(max_workers=config.parse_processes)
+        n_workers = config.parse_processes
+
+    def finish(result):
+        nonlocal done, callback_error
+        done += 1
+        if keep_results:
+            results.append(result)
+        if on_result and callback_error is None:
+            # Raising here would kill the parse worker and leave queue.join()
+            # waiting forever; keep the error for after shutdown instead
+            try:
+                on_result(done, total, result)
+            except Exception as e:
+                callback_error = e
+
+    async def download(session, item):
+        url = getattr(item, "url", item)
+        job = None if item is url else item
+        started = loop.time()
+        # Cache reads/writes (gzip, disk, index saves) run off the event loop
+        content = await loop.run_in_executor(None, cache.get, url) if cache is not None else None
+        if content is None:
+            try:
+                if offline:
+                    raise LookupError(f"{url} not in filing cache")
+                content = await fetch_bytes(session, url, config, host_limits, limiter, metrics)
+            except Exception as e:
+                finish(FetchResult(url, None, e, job, "fetch", loop.time() - started))
+                return
+            if cache is not None:
+                await loop.run_in_executor(None, cache.put, url, content)
+        await queue.put((url, job, content, started))
+
+    async def downloader(session):
+        # The shared iterator is only advanced between awaits, so tasks
+        # never step it concurrently
+        for item in items:
+            await download(session, item)
+            if callback_error is not None:
+                return
+
+    async def parse_worker():
+        while True:
+            url, job, content, started = await queue.get()
+            try:
+                if handle is None:
+                    value, error = content, None
+                else:
+                    submitted = time.perf_counter()
+                    value, error, seconds = await loop.run_in_executor(executor, _timed_handle,
+                                                                       handle, url, content)
+                    metrics.record("parse", seconds, failed=error is not None)
+                    metrics.record("parse_wait", max(time.perf_counter() - submitted - seconds, 0.0))
+            except Exception as e:
+                # The worker itself failed (e.g. the result did not pickle)
+                value, error = None, e
+            finish(FetchResult(url, value, error, job, "parse", loop.time() - started))
+            queue.task_done()
+
+    connector = aiohttp.TCPConnector(limit=0, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=config.timeout)
+    try:
+        async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout) as session:
+            workers = [asyncio.create_task(parse_worker()) for _ in range(n_workers)]
+            await asyncio.gather(*(downloader(session) for _ in range(config.max_in_flight)))
+            await queue.join()
+            for w in workers:
+                w.cancel()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if cache is not None:
+        cache.flush()
+    if callback_error is not None:
+        raise callback_error
+    return results
+
+
+def fetch_all(urls, handle=None, config=None, on_result=None, cache=None, offline=False,
+              metrics=None, keep_results=True) -> list:
+    """
+    Blocking entry point for scripts; see run_pipeline.
+    """
+    return asyncio.run(run_pipeline(urls, handle=handle, config=config, on_result=on_result,
+                                    cache=cache, offline=offline, metrics=metrics,
+                                    keep_results=keep_results))
@@ -1,9 +1,211 @@
-from bs4 import BeautifulSoup
+from typing import NamedTuple, Optional
 import requests
 import pandas as pd
 from lxml import etree
 from io import BytesIO
 
+# Bump when a parser fix should re-admit filings a run ledger recorded as
+# parse errors under the previous version
+PARSER_VERSION = 1
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Referer": "https://www.nseindia.com"
+}
+
+XBRLI_CONTEXT = "{http://www.xbrl.org/2003/instance}context"
+XBRLDI_MEMBER = ".//{http://xbrl.org/2006/xbrldi}explicitMember"
+
+METADATA_TAGS = ("NameOfTheCompany", "ISIN", "DateOfReport")
+KEY_METRICS = (
+    "NumberOfShareholders",
+    "NumberOfShares",
+    "ShareholdingAsAPercentageOfTotalNumberOfShares"
+)
+
+
+def fetch_xbrl(url: str) -> bytes:
+    """
+    Download a raw XBRL document and return its bytes.
+    """
+    res = requests.get(url, headers=HEADERS)
+    if res.status_code != 200:
+        raise Exception(f"Failed to fetch XML. HTTP {res.status_code}")
+    return res.content
+
+
+def iterparse_shareholding(content: bytes, ns_marker: str = "in-bse-shp") -> dict:
+    """
+    Stream through an XBRL Shareholding Pattern document once and collect
+    only what the scrapers need.
+
+    Top-level elements are cleared as soon as they are handled, so memory
+    stays flat regardless of document size.
+
+    Parameters
+    ----------
+    content : bytes
+        Raw XBRL XML.
+    ns_marker : str
+        Substring identifying the shareholding taxonomy namespace
+        ('in-bse-shp' for NSE filings, 'shp' to accept NSE & BSE).
+
+    Returns
+    -------
+    dict
+        {'Company', 'ISIN', 'ReportDate', 'facts'} where 'facts' maps
+        category -> {metric: value} for the KEY_METRICS.
+    """
+    metadata = dict.fromkeys(METADATA_TAGS)
+    contexts = {}
+    raw_facts = []
+
+    for _, elem in etree.iterparse(BytesIO(content), events=("end",), recover=True):
+        parent = elem.getparent()
+        # Contexts and facts are direct children of the root; anything
+        # deeper is read through its top-level ancestor.
+        if parent is None or parent.getparent() is not None:
+            continue
+
+        tag = elem.tag
+        if tag == XBRLI_CONTEXT:
+            member = elem.find(XBRLDI_MEMBER)
+            if member is not None and member.text:
+                category = member.text.split(":")[-1].replace("Member", "")
+                contexts[elem.get("id")] = category
+        elif isinstance(tag, str) and tag.startswith("{"):
+            ns_uri, _, local = tag[1:].partition("}")
+            if ns_marker in ns_uri and elem.text:
+                if local in KEY_METRICS:
+                    context = elem.get("contextRef") or elem.get("contextref")
+                    raw_facts.append((local, context, elem.text.strip()))
+                elif local in metadata and metadata[local] is None:
+                    metadata[local] = elem.text.strip()
+
+        elem.clear()
+        while elem.getprevious() is not None:
+            del parent[0]
+
+    # Facts may precede their context, so resolve categories at the end
+    facts = {}
+    for tag, context, value in raw_facts:
+        category = contexts.get(context)
+        if category is not None:
+            facts.setdefault(category, {}).setdefault(tag, value)
+
+    return {
+        "Company": metadata["NameOfTheCompany"],
+        "ISIN": metadata["ISIN"],
+        "ReportDate": metadata["DateOfReport"],
+        "facts": facts
+    }
+
+
+PROMOTER_CATEGORY = "ShareholdingOfPromoterAndPromoterGroup"
+PUBLIC_CATEGORY = "PublicShareholding"
+TOTAL_CATEGORY = "ShareholdingPattern"
+
+
+def _to_int(value):
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+class ShareholdingRecord(NamedTuple):
+    """
+    Summary of one SHP filing, built straight from the parsed facts.
+
+    The category-wise DataFrame is only materialised on demand via
+    to_frame(); scrapers that need three numbers never touch pandas.
+    """
+    company: Optional[str]
+    isin: Optional[str]
+    report_date: Optional[str]
+    promoter_shares: Optional[int]
+    public_shares: Optional[int]
+    total_shares: Optional[int]
+    free_float_factor: Optional[float]
+    facts: dict
+
+    def summary(self) -> dict:
+        """
+        Return the summary dict written by the scrapers; raises if the
+        filing is missing any of the three share counts.
+        """
+        if None in (self.promoter_shares, self.public_shares, self.total_shares):
+            raise ValueError(f"Incomplete shareholding facts for {self.isin}")
+        return {
+            "promoter_shares": self.promoter_shares,
+            "public_shares": self.public_shares,
+            "total_shares": self.total_shares,
+            "free_float_factor": self.free_float_factor
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        return shareholding_frame(self._parsed())
+
+    def _parsed(self) -> dict:
+        return {
+            "Company": self.company,
+            "ISIN": self.isin,
+            "ReportDate": self.report_date,
+            "facts": self.facts
+        }
+
+
+def shareholding_record(parsed: dict) -> ShareholdingRecord:
+    """
+    Build a ShareholdingRecord from the output of iterparse_shareholding.
+    """
+    facts = parsed["facts"]
+
+    def shares(category):
+        return _to_int(facts.get(category, {}).get("NumberOfShares"))
+
+    promoter_shares = shares(PROMOTER_CATEGORY)
+    public_shares = shares(PUBLIC_CATEGORY)
+    total_shares = shares(TOTAL_CATEGORY)
+
+    free_float_factor = None
+    if public_shares is not None and total_shares:
+        free_float_factor = round(public_shares / total_shares, 4)
+
+    return ShareholdingRecord(
+        company=parsed["Company"],
+        isin=parsed["ISIN"],
+        report_date=parsed["ReportDate"],
+        promoter_shares=promoter_shares,
+        public_shares=public_shares,
+        total_shares=total_shares,
+        free_float_factor=free_float_factor,
+        facts=facts
+    )
+
+
+def shareholding_frame(parsed: dict) -> pd.DataFrame:
+    """
+    Lay out the output of iterparse_shareholding as one row per category.
+    """
+    rows = [
+        {
+            "Company": parsed["Company"],
+            "ISIN": parsed["ISIN"],
+            "ReportDate": parsed["ReportDate"],
+            "category": category,
+            **{metric: values.get(metric) for metric in KEY_METRICS}
+        }
+        for category, values in sorted(parsed["facts"].items())
+    ]
+    return pd.DataFrame(
+        rows,
+        columns=["Company", "ISIN", "ReportDate", "category", *KEY_METRICS]
+    )
+
+
 def parse_xbrl_shareholding(url: str) -> pd.DataFrame:
     """
     Parse NSE XBRL Shareholding Pattern XML and return a clean DataFrame
@@ -21,91 +223,21 @@ def parse_xbrl_shareholding(url: str) -> pd.DataFrame:
         ['Company', 'ISIN', 'ReportDate', 'category',
          'NumberOfShareholders', 'NumberOfShares', 'ShareholdingAsAPercentageOfTotalNumberOfShares']
     """
+    content = fetch_xbrl(url)
+    return shareholding_frame(iterparse_shareholding(content))
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        "Referer": "https://www.nseindia.com"
-    }
-
-    # Fetch XML content
-    res = requests.get(url, headers=headers)
-    if res.status_code != 200:
-        raise Exception(f"Failed to fetch XML. HTTP {res.status_code}")
 
-    # --- Extract metadata (Company, ISIN, Date) using BeautifulSoup ---
-    soup = BeautifulSoup(res.text, "lxml-xml")
-
-    def get_tag_value(tag_name):
-        tag = soup.find(tag_name)
-        return tag.text.strip() if tag else None
-
-    company = get_tag_value("NameOfTheCompany")
-    isin = get_tag_value("ISIN")
-    report_date = get_tag_value("DateOfReport")
-
-    # --- Parse detailed shareholding data using lxml ---
-    parser = etree.XMLParser(recover=True)
-    tree = etree.parse(BytesIO(res.content), parser)
-    root = tree.getroot()
-
-    ns = root.nsmap
-    if None in ns:
-        ns["default"] = ns.pop(None)
-
-    # Extract all shareholding tags
-    data = []
-    for element in root.iter():
-        tag_name = etree.QName(element).localname
-        ns_uri = etree.QName(element).namespace
-        if ns_uri and "in-bse-shp" in ns_uri:
-            context = element.attrib.get("contextRef") or element.attrib.get("contextref")
-            value = element.text.strip() if element.text else None
-            data.append({
-                "tag": tag_name,
-                "contextref": context,
-                "value": value
-            })
-
-    df = pd.DataFrame(data)
-
-    # Extract context-category mapping
-    contexts = []
-    for ctx in root.findall(".//xbrli:context", namespaces=ns):
-        ctx_id = ctx.attrib.get("id")
-        member = ctx.find(".//xbrldi:explicitMember", namespaces=ns)
-        if member is not None:
-            category = member.text.split(":")[-1].replace("Member", "")
-            contexts.append({"context_id": ctx_id, "category": category})
-
-    context_df = pd.DataFrame(contexts)
-
-    # Merge facts with category info
-    merged_df = pd.merge(df, context_df, left_on="contextref", right_on="context_id", how="left")
-
-    # Filter relevant metrics
-    key_metrics = [
-        "NumberOfShareholders",
-        "NumberOfShares",
-        "ShareholdingAsAPercentageOfTotalNumberOfShares"
-    ]
-    filtered_df = merged_df[merged_df["tag"].isin(key_metrics)]
-
-    # Pivot to table form
-    final_df = (
-        filtered_df
-        .pivot_table(index="category", columns="tag", values="value", aggfunc="first")
-        .reset_index()
-    )
-
-    # Add metadata
-    final_df["Company"] = company
-    final_df["ISIN"] = isin
-    final_df["ReportDate"] = report_date
+def parse_filing(url: str, content: bytes, ns_marker: str = "in-bse-shp") -> ShareholdingRecord:
+    """
+    Parse an already-downloaded filing; module-level so the fetch
+    pipeline can ship it to worker processes.
+    """
+    return shareholding_record(iterparse_shareholding(content, ns_marker=ns_marker))
 
-    # Arrange columns neatly
-    final_df = final_df[
-        ["Company", "ISIN", "ReportDate", "category",
-         "NumberOfShareholders", "NumberOfShares", "ShareholdingAsAPercentageOfTotalNumberOfShares"]
-    ]
 
-    return final_df
+def parse_shareholding_record(url: str, ns_marker: str = "in-bse-shp") -> ShareholdingRecord:
+    """
+    Fetch and parse an XBRL Shareholding Pattern filing into a
+    ShareholdingRecord without building any DataFrame.
+    """
+    return parse_filing(url, fetch_xbrl(url), ns_marker=ns_marker)